@@ -116,8 +116,10 @@ class FFTransformerDecoder(nn.Module):
 
     def forward(self, x, x_mask=None, g=None):  # pylint: disable=unused-argument
         # TODO: handle multi-speaker
+        # pass the mask so padded frames of a batch are not attended to
+        o = self.transformer_block(x, mask=x_mask)
         x_mask = 1 if x_mask is None else x_mask
-        o = self.transformer_block(x) * x_mask
+        o = o * x_mask
         o = self.postnet(o) * x_mask
         return o
 
@@ -26,7 +26,13 @@ class FFTransformer(nn.Module):
         src = self.norm1(src + src2)
         # T x B x D -> B x D x T
         src = src.permute(1, 2, 0)
-        src2 = self.conv2(F.relu(self.conv1(src)))
+        if src_key_padding_mask is not None:
+            # zero padded steps so the conv FFN sees the same context as an unpadded sequence
+            pad_mask = src_key_padding_mask.unsqueeze(1)
+            src = src.masked_fill(pad_mask, 0.0)
+            src2 = self.conv2(F.relu(self.conv1(src)).masked_fill(pad_mask, 0.0))
+        else:
+            src2 = self.conv2(F.relu(self.conv1(src)))
         src2 = self.dropout2(src2)
         src = src + src2
         src = src.transpose(1, 2)
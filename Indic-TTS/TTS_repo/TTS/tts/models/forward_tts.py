@@ -16,7 +16,7 @@ from TTS.tts.utils.helpers import average_over_durations, generate_path, maximum
 from TTS.tts.utils.speakers import SpeakerManager
 from TTS.tts.utils.text.tokenizer import TTSTokenizer
 from TTS.tts.utils.visual import plot_alignment, plot_avg_energy, plot_avg_pitch, plot_spectrogram
-from TTS.utils.io import load_fsspec
+from TTS.utils.io import load_fsspec, load_safetensors
 
 
 @dataclass
@@ -349,25 +349,33 @@ class ForwardTTS(BaseTTS):
         o_en_ex = torch.matmul(attn.squeeze(1).transpose(1, 2).to(en.dtype), en.transpose(1, 2)).transpose(1, 2)
         return o_en_ex, attn
 
-    def format_durations(self, o_dr_log, x_mask):
+    def format_durations(self, o_dr_log, x_mask, length_scale=None):
         """Format predicted durations.
         1. Convert to linear scale from log scale
         2. Apply the length scale for speed adjustment
         3. Apply masking.
         4. Cast 0 durations to 1.
         5. Round the duration values.
+        6. Zero the durations of padded input steps.
 
         Args:
             o_dr_log: Log scale durations.
             x_mask: Input text mask.
+            length_scale (Union[float, torch.FloatTensor], optional): Length scale, one for the batch or one
+                per batch item. Defaults to None, meaning `self.length_scale`.
 
         Shapes:
             - o_dr_log: :math:`(B, T_{de})`
             - x_mask: :math:`(B, T_{en})`
+            - length_scale: :math:`(B,)`
         """
-        o_dr = (torch.exp(o_dr_log) - 1) * x_mask * self.length_scale
+        if length_scale is None:
+            length_scale = self.length_scale
+        elif torch.is_tensor(length_scale):
+            length_scale = length_scale.reshape(-1, 1, 1).to(o_dr_log.dtype)
+        o_dr = (torch.exp(o_dr_log) - 1) * x_mask * length_scale
         o_dr[o_dr < 1] = 1.0
-        o_dr = torch.round(o_dr)
+        o_dr = torch.round(o_dr) * x_mask
         return o_dr
 
     def _forward_encoder(
@@ -451,18 +459,22 @@ class ForwardTTS(BaseTTS):
         x_mask: torch.IntTensor,
         pitch: torch.FloatTensor = None,
         dr: torch.IntTensor = None,
+        pitch_shift=None,
     ) -> Tuple[torch.FloatTensor, torch.FloatTensor]:
         """Pitch predictor forward pass.
 
         1. Predict pitch from encoder outputs.
         2. In training - Compute average pitch values for each input character from the ground truth pitch values.
-        3. Embed average pitch values.
+        3. In inference - Shift the predicted pitch by `pitch_shift`.
+        4. Embed average pitch values.
 
         Args:
             o_en (torch.FloatTensor): Encoder output.
             x_mask (torch.IntTensor): Input sequence mask.
             pitch (torch.FloatTensor, optional): Ground truth pitch values. Defaults to None.
             dr (torch.IntTensor, optional): Ground truth durations. Defaults to None.
+            pitch_shift (Union[float, torch.FloatTensor], optional): Offset added to the predicted pitch, in the
+                normalized pitch units of the training data, for the batch or per batch item. Defaults to None.
 
         Returns:
             Tuple[torch.FloatTensor, torch.FloatTensor]: Pitch embedding, pitch prediction.
@@ -472,12 +484,17 @@ class ForwardTTS(BaseTTS):
             - x_mask: :math:`(B, 1, T_{en})`
             - pitch: :math:`(B, 1, T_{de})`
             - dr: :math:`(B, T_{en})`
+            - pitch_shift: :math:`(B,)`
         """
         o_pitch = self.pitch_predictor(o_en, x_mask)
         if pitch is not None:
             avg_pitch = average_over_durations(pitch, dr)
             o_pitch_emb = self.pitch_emb(avg_pitch)
             return o_pitch_emb, o_pitch, avg_pitch
+        if pitch_shift is not None:
+            if torch.is_tensor(pitch_shift):
+                pitch_shift = pitch_shift.reshape(-1, 1, 1).to(o_pitch.dtype)
+            o_pitch = o_pitch + pitch_shift * x_mask
         o_pitch_emb = self.pitch_emb(o_pitch)
         return o_pitch_emb, o_pitch
 
@@ -671,31 +688,41 @@ class ForwardTTS(BaseTTS):
         Args:
             x (torch.LongTensor): Input character sequence.
             aux_input (Dict): Auxiliary model inputs. Defaults to `{"d_vectors": None, "speaker_ids": None}`.
+                Pass `x_lengths` to run a padded batch; padded steps are masked out and get zero duration.
+                `length_scale` (overriding `self.length_scale`) and `pitch_shift` set the prosody, for the
+                batch or per item.
 
         Shapes:
             - x: [B, T_max]
             - x_lengths: [B]
+            - length_scale: [B]
+            - pitch_shift: [B]
             - g: [B, C]
+            - model_outputs: [B, T_de_max, C], valid up to `y_lengths`
         """
         g = self._set_speaker_input(aux_input)
-        x_lengths = torch.tensor(x.shape[1:2]).to(x.device)
+        x_lengths = aux_input.get("x_lengths", None)
+        if x_lengths is None or x_lengths.numel() != x.shape[0]:
+            x_lengths = torch.tensor(x.shape[1:2]).to(x.device)
         x_mask = torch.unsqueeze(sequence_mask(x_lengths, x.shape[1]), 1).to(x.dtype).float()
         # encoder pass
         o_en, x_mask, g, _ = self._forward_encoder(x, x_mask, g)
+        # keep padded steps at zero after speaker conditioning so the predictors' convs see clean padding
+        o_en = o_en * x_mask
         # duration predictor pass
         o_dr_log = self.duration_predictor(o_en, x_mask)
-        o_dr = self.format_durations(o_dr_log, x_mask).squeeze(1)
+        o_dr = self.format_durations(o_dr_log, x_mask, aux_input.get("length_scale", None)).squeeze(1)
         y_lengths = o_dr.sum(1)
         # pitch predictor pass
         o_pitch = None
         if self.args.use_pitch:
-            o_pitch_emb, o_pitch = self._forward_pitch_predictor(o_en, x_mask)
-            o_en = o_en + o_pitch_emb
+            o_pitch_emb, o_pitch = self._forward_pitch_predictor(o_en, x_mask, pitch_shift=aux_input.get("pitch_shift", None))
+            o_en = (o_en + o_pitch_emb) * x_mask
         # energy predictor pass
         o_energy = None
         if self.args.use_energy:
             o_energy_emb, o_energy = self._forward_energy_predictor(o_en, x_mask)
-            o_en = o_en + o_energy_emb
+            o_en = (o_en + o_energy_emb) * x_mask
         # decoder pass
         o_de, attn = self._forward_decoder(o_en, o_dr, x_mask, y_lengths, g=None)
         outputs = {
@@ -704,6 +731,7 @@ class ForwardTTS(BaseTTS):
             "pitch": o_pitch,
             "energy": o_energy,
             "durations_log": o_dr_log,
+            "y_lengths": y_lengths,
         }
         return outputs
 
@@ -824,8 +852,12 @@ class ForwardTTS(BaseTTS):
     def load_checkpoint(
         self, config, checkpoint_path, eval=False, cache=False
     ):  # pylint: disable=unused-argument, redefined-builtin
-        state = load_fsspec(checkpoint_path, map_location=torch.device("cpu"), cache=cache)
-        self.load_state_dict(state["model"])
+        if checkpoint_path.endswith(".safetensors"):
+            # Inference-only export: the parameters become views of the memory-mapped file
+            self.load_state_dict(load_safetensors(checkpoint_path), assign=True)
+        else:
+            state = load_fsspec(checkpoint_path, map_location=torch.device("cpu"), cache=cache)
+            self.load_state_dict(state["model"])
         if eval:
             self.eval()
             assert not self.training
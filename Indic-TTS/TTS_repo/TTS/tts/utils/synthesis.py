@@ -29,8 +29,11 @@ def run_model_torch(
     style_text: str = None,
     d_vector: torch.Tensor = None,
     language_id: torch.Tensor = None,
+    input_lengths: torch.Tensor = None,
+    prosody: Dict = None,
 ) -> Dict:
-    """Run a torch model for inference. It does not support batch inference.
+    """Run a torch model for inference. Batch inference needs `input_lengths` and a model that masks padded
+    inputs (`ForwardTTS`).
 
     Args:
         model (nn.Module): The model to run inference.
@@ -38,26 +41,32 @@ def run_model_torch(
         speaker_id (int, optional): Input speaker ids for multi-speaker models. Defaults to None.
         style_mel (torch.Tensor, optional): Spectrograms used for voice styling . Defaults to None.
         d_vector (torch.Tensor, optional): d-vector for multi-speaker models    . Defaults to None.
+        input_lengths (torch.Tensor, optional): Lengths of the padded input sequences. Defaults to None, meaning
+            a single unpadded sequence.
+        prosody (Dict, optional): Prosody inputs of models that take them, e.g. `length_scale` and
+            `pitch_shift` of `ForwardTTS`. Defaults to None.
 
     Returns:
         Dict: model outputs.
     """
-    input_lengths = torch.tensor(inputs.shape[1:2]).to(inputs.device)
+    if input_lengths is None:
+        input_lengths = torch.tensor(inputs.shape[1:2])
+    input_lengths = input_lengths.to(inputs.device)
     if hasattr(model, "module"):
         _func = model.module.inference
     else:
         _func = model.inference
-    outputs = _func(
-        inputs,
-        aux_input={
-            "x_lengths": input_lengths,
-            "speaker_ids": speaker_id,
-            "d_vectors": d_vector,
-            "style_mel": style_mel,
-            "style_text": style_text,
-            "language_ids": language_id,
-        },
-    )
+    aux_input = {
+        "x_lengths": input_lengths,
+        "speaker_ids": speaker_id,
+        "d_vectors": d_vector,
+        "style_mel": style_mel,
+        "style_text": style_text,
+        "language_ids": language_id,
+    }
+    if prosody:
+        aux_input.update(prosody)
+    outputs = _func(inputs, aux_input=aux_input)
     return outputs
 
 
@@ -122,6 +131,7 @@ def synthesis(
     do_trim_silence=False,
     d_vector=None,
     language_id=None,
+    prosody=None,
 ):
     """Synthesize voice for the given text using Griffin-Lim vocoder or just compute output features to be passed to
     the vocoder model.
@@ -161,6 +171,9 @@ def synthesis(
 
         language_id (int):
             Language ID passed to the language embedding layer in multi-langual model. Defaults to None.
+
+        prosody (Dict):
+            Prosody inputs passed to the model, see `run_model_torch`. Defaults to None.
     """
     # GST or Capacitron processing
     # TODO: need to handle the case of setting both gst and capacitron to true somewhere
@@ -218,6 +231,7 @@ def synthesis(
         style_text,
         d_vector=d_vector,
         language_id=language_id,
+        prosody=prosody,
     )
     model_outputs = outputs["model_outputs"]
     model_outputs = model_outputs[0].data.cpu().numpy()
@@ -244,6 +258,87 @@ def synthesis(
     return return_dict
 
 
+def synthesis_batch(
+    model,
+    texts,
+    CONFIG,
+    use_cuda,
+    speaker_id=None,
+    d_vector=None,
+    language_id=None,
+    prosody=None,
+):
+    """Batched counterpart of `synthesis` for models that mask padded inputs (`ForwardTTS`). All texts are
+    tokenized, padded to the longest one and run through the model in a single pass.
+
+    Args:
+        model (TTS.tts.models):
+            The TTS model to synthesize audio with.
+
+        texts (List[str]):
+            The input texts. They share the speaker and language.
+
+        CONFIG (Coqpit):
+            Model configuration.
+
+        use_cuda (bool):
+            Enable/disable CUDA.
+
+        speaker_id (int):
+            Speaker ID passed to the speaker embedding layer in multi-speaker model. Defaults to None.
+
+        d_vector (torch.Tensor):
+            d-vector for multi-speaker models in share :math:`[1, D]`. Defaults to None.
+
+        language_id (int):
+            Language ID passed to the language embedding layer in multi-langual model. Defaults to None.
+
+        prosody (Dict):
+            Prosody inputs passed to the model, see `run_model_torch`. Defaults to None.
+
+    Returns:
+        List[np.ndarray]: model output spectrograms :math:`[T_i, C]`, one per text, with padding removed.
+    """
+    language_name = None
+    if language_id is not None:
+        language = [k for k, v in model.language_manager.name_to_id.items() if v == language_id]
+        assert len(language) == 1, "language_id must be a valid language"
+        language_name = language[0]
+
+    # convert texts to padded sequences of token IDs
+    sequences = [model.tokenizer.text_to_ids(text, language=language_name) for text in texts]
+    input_lengths = np.asarray([len(seq) for seq in sequences], dtype=np.int64)
+    text_inputs = np.zeros((len(sequences), input_lengths.max()), dtype=np.int64)
+    for idx, seq in enumerate(sequences):
+        text_inputs[idx, : len(seq)] = seq
+
+    # pass tensors to backend
+    if speaker_id is not None:
+        speaker_id = id_to_torch(speaker_id, cuda=use_cuda)
+
+    if d_vector is not None:
+        d_vector = embedding_to_torch(d_vector, cuda=use_cuda)
+
+    if language_id is not None:
+        language_id = id_to_torch(language_id, cuda=use_cuda)
+
+    text_inputs = numpy_to_torch(text_inputs, torch.long, cuda=use_cuda)
+    input_lengths = numpy_to_torch(input_lengths, torch.long, cuda=use_cuda)
+    # synthesize voice
+    outputs = run_model_torch(
+        model,
+        text_inputs,
+        speaker_id,
+        d_vector=d_vector,
+        language_id=language_id,
+        input_lengths=input_lengths,
+        prosody=prosody,
+    )
+    model_outputs = outputs["model_outputs"].data.cpu().numpy()
+    output_lengths = outputs["y_lengths"].long().cpu().numpy()
+    return [model_outputs[idx, :length] for idx, length in enumerate(output_lengths)]
+
+
 def transfer_voice(
     model,
     CONFIG,
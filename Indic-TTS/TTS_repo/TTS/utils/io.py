@@ -86,6 +86,60 @@ def load_fsspec(
             return torch.load(f, map_location=map_location, **kwargs)
 
 
+SAFETENSORS_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+
+def load_safetensors(path: str) -> Dict[str, torch.Tensor]:
+    """Load a local safetensors file as tensors backed by a private memory map of the file.
+
+    Nothing is read until a tensor is used, and the pages stay in the shared page cache,
+    so every process that loads the same file maps the same physical memory. Writing to a
+    tensor copies the touched page and never changes the file.
+
+    Args:
+        path: Local path of a `.safetensors` file.
+
+    Returns:
+        Dict mapping tensor names to CPU tensors.
+    """
+    with open(path, "rb") as f:
+        header_size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_size))
+    header.pop("__metadata__", None)
+    data_start = 8 + header_size
+
+    storage = torch.UntypedStorage.from_file(path, shared=False, nbytes=os.path.getsize(path))
+    state = {}
+    for name, info in header.items():
+        dtype = SAFETENSORS_DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        itemsize = torch.empty((), dtype=dtype).element_size()
+        if (data_start + begin) % itemsize:
+            # Misaligned for its dtype: copy this tensor out of the map instead
+            state[name] = torch.frombuffer(bytearray(storage[data_start + begin : data_start + end]), dtype=dtype).reshape(info["shape"])
+        else:
+            state[name] = torch.empty(0, dtype=dtype).set_(storage, (data_start + begin) // itemsize, info["shape"])
+    return state
+
+
+def load_safetensors_metadata(path: str) -> Dict[str, str]:
+    """Read the `__metadata__` of a safetensors file without touching its tensors."""
+    with open(path, "rb") as f:
+        header_size = int.from_bytes(f.read(8), "little")
+        return json.loads(f.read(header_size)).get("__metadata__", {})
+
+
 def load_checkpoint(
     model, checkpoint_path, use_cuda=False, eval=False, cache=False
 ):  # pylint: disable=redefined-builtin
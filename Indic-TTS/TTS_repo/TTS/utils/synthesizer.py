@@ -1,5 +1,5 @@
 import time
-from typing import List
+from typing import Dict, Iterator, List
 
 import numpy as np
 import pysbd
@@ -7,14 +7,16 @@ import torch
 
 from TTS.config import load_config
 from TTS.tts.models import setup_model as setup_tts_model
+from TTS.tts.models.forward_tts import ForwardTTS
 
 # pylint: disable=unused-wildcard-import
 # pylint: disable=wildcard-import
-from TTS.tts.utils.synthesis import synthesis, transfer_voice, trim_silence
+from TTS.tts.utils.synthesis import inv_spectrogram, synthesis, synthesis_batch, transfer_voice, trim_silence
 from TTS.utils.audio import AudioProcessor
 from TTS.utils.audio.numpy_transforms import save_wav
 from TTS.vc.models import setup_model as setup_vc_model
 from TTS.vocoder.models import setup_model as setup_vocoder_model
+from TTS.vocoder.models.hifigan_generator import HifiganGenerator
 from TTS.vocoder.utils.generic_utils import interpolate_vocoder_input
 
 
@@ -76,6 +78,8 @@ class Synthesizer(object):
         self.num_languages = 0
         self.tts_languages = {}
         self.d_vector_dim = 0
+        # Per-speaker prosody ("*" for any speaker), see `get_prosody()`
+        self.prosody = {}
         self.seg = self._get_segmenter("en")
         self.use_cuda = use_cuda
 
@@ -210,44 +214,16 @@ class Synthesizer(object):
         output_wav = self.vc_model.voice_conversion(source_wav, target_wav)
         return output_wav
 
-    def tts(
-        self,
-        text: str = "",
-        speaker_name: str = "",
-        language_name: str = "",
-        speaker_wav=None,
-        style_wav=None,
-        style_text=None,
-        reference_wav=None,
-        reference_speaker_name=None,
-    ) -> List[int]:
-        """🐸 TTS magic. Run all the models and generate speech.
+    def _get_speaker_inputs(self, speaker_name: str = "", speaker_wav=None):
+        """Resolve the speaker id or d-vector for multi-speaker models.
 
         Args:
-            text (str): input text.
             speaker_name (str, optional): spekaer id for multi-speaker models. Defaults to "".
-            language_name (str, optional): language id for multi-language models. Defaults to "".
             speaker_wav (Union[str, List[str]], optional): path to the speaker wav for voice cloning. Defaults to None.
-            style_wav ([type], optional): style waveform for GST. Defaults to None.
-            style_text ([type], optional): transcription of style_wav for Capacitron. Defaults to None.
-            reference_wav ([type], optional): reference waveform for voice conversion. Defaults to None.
-            reference_speaker_name ([type], optional): spekaer id of reference waveform. Defaults to None.
+
         Returns:
-            List[int]: [description]
+            Tuple[int, np.ndarray]: speaker id and speaker embedding. Either or both can be None.
         """
-        start_time = time.time()
-        wavs = []
-
-        if not text and not reference_wav:
-            raise ValueError(
-                "You need to define either `text` (for sythesis) or a `reference_wav` (for voice conversion) to use the Coqui TTS API."
-            )
-
-        if text:
-            sens = self.split_into_sentences(text)
-            print(" > Text splitted to sentences.")
-            print(sens)
-
         # handle multi-speaker
         speaker_embedding = None
         speaker_id = None
@@ -281,6 +257,39 @@ class Synthesizer(object):
                     "Define path for speaker.json if it is a multi-speaker model or remove defined speaker idx. "
                 )
 
+        # compute a new d_vector from the given clip.
+        if speaker_wav is not None:
+            speaker_embedding = self.tts_model.speaker_manager.compute_embedding_from_clip(speaker_wav)
+
+        return speaker_id, speaker_embedding
+
+    def get_prosody(self, speaker_name: str = "", speaking_rate: float = 1.0) -> Dict[str, float]:
+        """Resolve the prosody inputs of `ForwardTTS` for a speaker from `self.prosody`.
+
+        Args:
+            speaker_name (str, optional): speaker name, looked up before the "*" entry. Defaults to "".
+            speaking_rate (float, optional): speed relative to the speaker's configured one. Defaults to 1.0.
+
+        Returns:
+            Dict[str, float]: `length_scale` (multiplies the predicted durations) and `pitch_shift` (added to
+            the normalized predicted pitch).
+        """
+        entry = self.prosody.get(speaker_name, self.prosody.get("*", {}))
+        length_scale = entry.get("length_scale", getattr(self.tts_model, "length_scale", 1.0))
+        return {
+            "length_scale": float(length_scale) / speaking_rate,
+            "pitch_shift": float(entry.get("pitch_shift", 0.0)),
+        }
+
+    def _get_language_id(self, language_name: str = ""):
+        """Resolve the language id for multi-lingual models.
+
+        Args:
+            language_name (str, optional): language id for multi-language models. Defaults to "".
+
+        Returns:
+            int: language id or None.
+        """
         # handle multi-lingual
         language_id = None
         if self.tts_languages_file or (
@@ -311,14 +320,159 @@ class Synthesizer(object):
                     "Define path for language_ids.json if it is a multi-lingual model or remove defined language idx. "
                 )
 
-        # compute a new d_vector from the given clip.
-        if speaker_wav is not None:
-            speaker_embedding = self.tts_model.speaker_manager.compute_embedding_from_clip(speaker_wav)
+        return language_id
 
-        use_gl = self.vocoder_model is None
+    @staticmethod
+    def _length_buckets(lengths: List[int], max_batch_size: int = 16, max_padding: float = 0.1) -> List[List[int]]:
+        """Group item indices into batches of similar length.
 
-        if not reference_wav:
-            for sen in sens:
+        Items are sorted by length and a batch is closed once it holds `max_batch_size` items or the next item
+        is more than `max_padding` longer than its shortest one. Vocoder cost grows with the padded length, so
+        mixing short and long items in one batch costs more than it saves.
+
+        Args:
+            lengths (List[int]): length of each item.
+            max_batch_size (int, optional): maximum number of items per batch. Defaults to 16.
+            max_padding (float, optional): maximum relative padding of an item. Defaults to 0.1.
+
+        Returns:
+            List[List[int]]: item indices of each batch.
+        """
+        buckets = []
+        for idx in sorted(range(len(lengths)), key=lambda idx: lengths[idx]):
+            if (
+                buckets
+                and len(buckets[-1]) < max_batch_size
+                and lengths[idx] <= lengths[buckets[-1][0]] * (1 + max_padding)
+            ):
+                buckets[-1].append(idx)
+            else:
+                buckets.append([idx])
+        return buckets
+
+    def _vocoder_input(self, mel_postnet_spec: np.ndarray) -> torch.Tensor:
+        """Renormalize a TTS model output spectrogram for the vocoder.
+
+        Args:
+            mel_postnet_spec (np.ndarray): model output of shape :math:`[T, C]`.
+
+        Returns:
+            torch.Tensor: vocoder input of shape :math:`[C, T']`.
+        """
+        # denormalize tts output based on tts audio config
+        mel_postnet_spec = self.tts_model.ap.denormalize(mel_postnet_spec.T).T
+        # renormalize spectrogram based on vocoder config
+        vocoder_input = self.vocoder_ap.normalize(mel_postnet_spec.T)
+        # compute scale factor for possible sample rate mismatch
+        scale_factor = [
+            1,
+            self.vocoder_config["audio"]["sample_rate"] / self.tts_model.ap.sample_rate,
+        ]
+        if scale_factor[1] != 1:
+            print(" > interpolating tts model output.")
+            return interpolate_vocoder_input(scale_factor, vocoder_input).squeeze(0)
+        return torch.tensor(vocoder_input)  # pylint: disable=not-callable
+
+    def _vocode_batch(self, mels: List[np.ndarray], max_batch_size: int = 16) -> List[np.ndarray]:
+        """Convert TTS model output spectrograms to waveforms with the vocoder or Griffin-Lim.
+
+        HiFi-GAN vocoders, whose `inference()` takes `lengths`, run the spectrograms as padded
+        batches of up to `max_batch_size` similar lengths (see `_length_buckets()`). Each waveform is cut back to
+        `n_frames * hop_length` samples, dropping the output of the inference and batch padding.
+
+        Args:
+            mels (List[np.ndarray]): model outputs of shape :math:`[T_i, C]`.
+            max_batch_size (int, optional): maximum number of spectrograms per vocoder pass. Defaults to 16.
+
+        Returns:
+            List[np.ndarray]: one waveform per spectrogram, in input order.
+        """
+        if self.vocoder_model is None:
+            return [inv_spectrogram(mel, self.tts_model.ap, self.tts_config) for mel in mels]
+
+        device_type = "cuda" if self.use_cuda else "cpu"
+        vocoder_inputs = [self._vocoder_input(mel) for mel in mels]
+        # `GAN` wraps the generator that does the actual inference
+        generator = getattr(self.vocoder_model, "model_g", self.vocoder_model)
+        if not isinstance(generator, HifiganGenerator):
+            # run vocoder model
+            # [1, T, C]
+            return [
+                self.vocoder_model.inference(c.unsqueeze(0).to(device_type)).cpu().numpy() for c in vocoder_inputs
+            ]
+
+        hop_length = self.vocoder_ap.hop_length
+        pad = generator.inference_padding
+        waveforms = [None] * len(mels)
+        for chunk in self._length_buckets([c.shape[1] for c in vocoder_inputs], max_batch_size):
+            lengths = [vocoder_inputs[idx].shape[1] for idx in chunk]
+            batch = torch.zeros(len(chunk), vocoder_inputs[chunk[0]].shape[0], max(lengths))
+            for i, idx in enumerate(chunk):
+                batch[i, :, : lengths[i]] = vocoder_inputs[idx]
+            # [B, 1, T]
+            outputs = generator.inference(batch.to(device_type), lengths=lengths).cpu().numpy()
+            for i, idx in enumerate(chunk):
+                waveforms[idx] = outputs[i, :, pad * hop_length : (pad + lengths[i]) * hop_length]
+        return waveforms
+
+    @staticmethod
+    def join_waveforms(waveforms: List[np.ndarray], gap: int = 10000) -> np.ndarray:
+        """Join sentence waveforms into one float32 buffer, with `gap` samples of silence after each sentence.
+
+        Args:
+            waveforms (List[np.ndarray]): sentence waveforms.
+            gap (int, optional): number of silent samples after each sentence. Defaults to 10000.
+
+        Returns:
+            np.ndarray: joined waveform.
+        """
+        wav = np.zeros(sum(len(waveform) for waveform in waveforms) + gap * len(waveforms), dtype=np.float32)
+        pos = 0
+        for waveform in waveforms:
+            wav[pos : pos + len(waveform)] = waveform
+            pos += len(waveform) + gap
+        return wav
+
+    def _synthesize_sentences(
+        self,
+        sens: List[str],
+        speaker_id=None,
+        speaker_embedding=None,
+        language_id=None,
+        style_wav=None,
+        style_text=None,
+        max_batch_size: int = 16,
+        prosody: Dict[str, float] = None,
+    ) -> List[np.ndarray]:
+        """Synthesize each sentence into its own waveform.
+
+        Models that mask padded inputs (`ForwardTTS`) run the sentences as padded batches of up to
+        `max_batch_size`, grouped by length to keep padding small. Other models, and style-conditioned
+        synthesis, go sentence by sentence. The spectrograms are then vocoded together by `_vocode_batch()`.
+
+        Returns:
+            List[np.ndarray]: one waveform per sentence, in input order.
+        """
+        use_gl = self.vocoder_model is None
+        waveforms = [None] * len(sens)
+        mels = {}
+        if isinstance(self.tts_model, ForwardTTS) and not style_wav and style_text is None:
+            order = sorted(range(len(sens)), key=lambda idx: len(sens[idx]))
+            for start in range(0, len(order), max_batch_size):
+                chunk = order[start : start + max_batch_size]
+                outputs = synthesis_batch(
+                    model=self.tts_model,
+                    texts=[sens[idx] for idx in chunk],
+                    CONFIG=self.tts_config,
+                    use_cuda=self.use_cuda,
+                    speaker_id=speaker_id,
+                    d_vector=speaker_embedding,
+                    language_id=language_id,
+                    prosody=prosody,
+                )
+                mels.update(zip(chunk, outputs))
+        else:
+            for idx, sen in enumerate(sens):
                 # synthesize voice
                 outputs = synthesis(
                     model=self.tts_model,
@@ -331,40 +485,200 @@ class Synthesizer(object):
                     use_griffin_lim=use_gl,
                     d_vector=speaker_embedding,
                     language_id=language_id,
+                    prosody=prosody,
                 )
-                waveform = outputs["wav"]
-                mel_postnet_spec = outputs["outputs"]["model_outputs"][0].detach().cpu().numpy()
-                if not use_gl:
-                    # denormalize tts output based on tts audio config
-                    mel_postnet_spec = self.tts_model.ap.denormalize(mel_postnet_spec.T).T
-                    device_type = "cuda" if self.use_cuda else "cpu"
-                    # renormalize spectrogram based on vocoder config
-                    vocoder_input = self.vocoder_ap.normalize(mel_postnet_spec.T)
-                    # compute scale factor for possible sample rate mismatch
-                    scale_factor = [
-                        1,
-                        self.vocoder_config["audio"]["sample_rate"] / self.tts_model.ap.sample_rate,
-                    ]
-                    if scale_factor[1] != 1:
-                        print(" > interpolating tts model output.")
-                        vocoder_input = interpolate_vocoder_input(scale_factor, vocoder_input)
-                    else:
-                        vocoder_input = torch.tensor(vocoder_input).unsqueeze(0)  # pylint: disable=not-callable
-                    # run vocoder model
-                    # [1, T, C]
-                    waveform = self.vocoder_model.inference(vocoder_input.to(device_type))
-                if self.use_cuda and not use_gl:
-                    waveform = waveform.cpu()
-                if not use_gl:
-                    waveform = waveform.numpy()
-                waveform = waveform.squeeze()
-
-                # trim silence
-                if "do_trim_silence" in self.tts_config.audio and self.tts_config.audio["do_trim_silence"]:
-                    waveform = trim_silence(waveform, self.tts_model.ap)
-
-                wavs += list(waveform)
-                wavs += [0] * 10000
+                if use_gl:
+                    waveforms[idx] = outputs["wav"]
+                else:
+                    mels[idx] = outputs["outputs"]["model_outputs"][0].detach().cpu().numpy()
+
+        if mels:
+            indices = list(mels)
+            for idx, waveform in zip(indices, self._vocode_batch([mels[idx] for idx in indices], max_batch_size)):
+                waveforms[idx] = waveform
+
+        for idx, waveform in enumerate(waveforms):
+            waveform = waveform.squeeze()
+            # trim silence
+            if "do_trim_silence" in self.tts_config.audio and self.tts_config.audio["do_trim_silence"]:
+                waveform = trim_silence(waveform, self.tts_model.ap)
+            waveforms[idx] = waveform
+        return waveforms
+
+    def tts_sentences(
+        self,
+        sens: List[str],
+        speaker_name: str = "",
+        language_name: str = "",
+        speaker_wav=None,
+        style_wav=None,
+        style_text=None,
+        max_batch_size: int = 16,
+        speaking_rate: float = 1.0,
+    ) -> List[np.ndarray]:
+        """Synthesize sentences that are already split, in padded batches. No silence is appended, so the
+        waveforms can be cached per sentence and laid out later with `join_waveforms()`.
+
+        Args:
+            sens (List[str]): input sentences.
+            speaker_name (str, optional): spekaer id for multi-speaker models. Defaults to "".
+            language_name (str, optional): language id for multi-language models. Defaults to "".
+            speaker_wav (Union[str, List[str]], optional): path to the speaker wav for voice cloning. Defaults to None.
+            style_wav ([type], optional): style waveform for GST. Defaults to None.
+            style_text ([type], optional): transcription of style_wav for Capacitron. Defaults to None.
+            max_batch_size (int, optional): maximum number of sentences per model pass. Defaults to 16.
+            speaking_rate (float, optional): speed relative to the speaker's prosody, see `get_prosody()`.
+                Defaults to 1.0.
+
+        Returns:
+            List[np.ndarray]: one float32 waveform per sentence.
+        """
+        speaker_id, speaker_embedding = self._get_speaker_inputs(speaker_name, speaker_wav)
+        language_id = self._get_language_id(language_name)
+        return self._synthesize_sentences(
+            sens, speaker_id, speaker_embedding, language_id, style_wav, style_text, max_batch_size,
+            self.get_prosody(speaker_name, speaking_rate),
+        )
+
+    def tts_batch(
+        self,
+        texts: List[str],
+        speaker_name: str = "",
+        language_name: str = "",
+        speaker_wav=None,
+        style_wav=None,
+        style_text=None,
+        max_batch_size: int = 16,
+        speaking_rate: float = 1.0,
+    ) -> List[np.ndarray]:
+        """Synthesize several texts with the same speaker and language. The sentences of all texts are
+        synthesized together, so a single padded model pass can cover a whole request.
+
+        Args:
+            texts (List[str]): input texts.
+            speaker_name (str, optional): spekaer id for multi-speaker models. Defaults to "".
+            language_name (str, optional): language id for multi-language models. Defaults to "".
+            speaker_wav (Union[str, List[str]], optional): path to the speaker wav for voice cloning. Defaults to None.
+            style_wav ([type], optional): style waveform for GST. Defaults to None.
+            style_text ([type], optional): transcription of style_wav for Capacitron. Defaults to None.
+            max_batch_size (int, optional): maximum number of sentences per model pass. Defaults to 16.
+            speaking_rate (float, optional): speed relative to the speaker's prosody, see `get_prosody()`.
+                Defaults to 1.0.
+
+        Returns:
+            List[np.ndarray]: one float32 waveform per text, laid out as `tts()` would return it.
+        """
+        start_time = time.time()
+        speaker_id, speaker_embedding = self._get_speaker_inputs(speaker_name, speaker_wav)
+        language_id = self._get_language_id(language_name)
+
+        sens, owners = [], []
+        for idx, text in enumerate(texts):
+            for sen in self.split_into_sentences(text):
+                sens.append(sen)
+                owners.append(idx)
+
+        waveforms = self._synthesize_sentences(
+            sens, speaker_id, speaker_embedding, language_id, style_wav, style_text, max_batch_size,
+            self.get_prosody(speaker_name, speaking_rate),
+        )
+        grouped = [[] for _ in texts]
+        for owner, waveform in zip(owners, waveforms):
+            grouped[owner].append(waveform)
+        wavs = [self.join_waveforms(group) for group in grouped]
+
+        # compute stats
+        process_time = time.time() - start_time
+        audio_time = sum(len(wav) for wav in wavs) / self.tts_config.audio["sample_rate"]
+        print(f" > Processing time: {process_time}")
+        print(f" > Real-time factor: {process_time / max(audio_time, 1e-6)}")
+        return wavs
+
+    def tts_stream(
+        self,
+        text: str,
+        speaker_name: str = "",
+        language_name: str = "",
+        speaker_wav=None,
+        style_wav=None,
+        style_text=None,
+        speaking_rate: float = 1.0,
+    ) -> Iterator[np.ndarray]:
+        """Synthesize `text` sentence by sentence and yield each sentence as soon as it is vocoded.
+
+        Concatenating the yielded chunks gives the same waveform as `tts()`. This trades the batching of
+        `tts_batch()` for time to first audio.
+
+        Args:
+            text (str): input text.
+            speaker_name (str, optional): spekaer id for multi-speaker models. Defaults to "".
+            language_name (str, optional): language id for multi-language models. Defaults to "".
+            speaker_wav (Union[str, List[str]], optional): path to the speaker wav for voice cloning. Defaults to None.
+            style_wav ([type], optional): style waveform for GST. Defaults to None.
+            style_text ([type], optional): transcription of style_wav for Capacitron. Defaults to None.
+            speaking_rate (float, optional): speed relative to the speaker's prosody, see `get_prosody()`.
+                Defaults to 1.0.
+
+        Yields:
+            np.ndarray: float32 waveform of one sentence, followed by the inter-sentence silence.
+        """
+        speaker_id, speaker_embedding = self._get_speaker_inputs(speaker_name, speaker_wav)
+        language_id = self._get_language_id(language_name)
+        prosody = self.get_prosody(speaker_name, speaking_rate)
+        for sen in self.split_into_sentences(text):
+            waveforms = self._synthesize_sentences(
+                [sen], speaker_id, speaker_embedding, language_id, style_wav, style_text, prosody=prosody
+            )
+            yield self.join_waveforms(waveforms)
+
+    def tts(
+        self,
+        text: str = "",
+        speaker_name: str = "",
+        language_name: str = "",
+        speaker_wav=None,
+        style_wav=None,
+        style_text=None,
+        reference_wav=None,
+        reference_speaker_name=None,
+    ) -> np.ndarray:
+        """🐸 TTS magic. Run all the models and generate speech.
+
+        Args:
+            text (str): input text.
+            speaker_name (str, optional): spekaer id for multi-speaker models. Defaults to "".
+            language_name (str, optional): language id for multi-language models. Defaults to "".
+            speaker_wav (Union[str, List[str]], optional): path to the speaker wav for voice cloning. Defaults to None.
+            style_wav ([type], optional): style waveform for GST. Defaults to None.
+            style_text ([type], optional): transcription of style_wav for Capacitron. Defaults to None.
+            reference_wav ([type], optional): reference waveform for voice conversion. Defaults to None.
+            reference_speaker_name ([type], optional): spekaer id of reference waveform. Defaults to None.
+        Returns:
+            np.ndarray: float32 waveform.
+        """
+        start_time = time.time()
+
+        if not text and not reference_wav:
+            raise ValueError(
+                "You need to define either `text` (for sythesis) or a `reference_wav` (for voice conversion) to use the Coqui TTS API."
+            )
+
+        if text:
+            sens = self.split_into_sentences(text)
+            print(" > Text splitted to sentences.")
+            print(sens)
+
+        speaker_id, speaker_embedding = self._get_speaker_inputs(speaker_name, speaker_wav)
+        language_id = self._get_language_id(language_name)
+
+        use_gl = self.vocoder_model is None
+
+        if not reference_wav:
+            waveforms = self._synthesize_sentences(
+                sens, speaker_id, speaker_embedding, language_id, style_wav, style_text,
+                prosody=self.get_prosody(speaker_name),
+            )
+            wavs = self.join_waveforms(waveforms)
         else:
             # get the speaker embedding or speaker id for the reference wav file
             reference_speaker_embedding = None
@@ -240,6 +240,11 @@ class GAN(BaseVocoder):
             checkpoint_path (str): Checkpoint file path.
             eval (bool, optional): If true, load the model for inference. If falseDefaults to False.
         """
+        if checkpoint_path.endswith(".safetensors"):
+            # Inference-only export of the generator (scripts/convert_tts_checkpoints.py)
+            self.model_d = None
+            self.model_g.load_checkpoint(config, checkpoint_path, eval=True)
+            return
         state = load_fsspec(checkpoint_path, map_location=torch.device("cpu"), cache=cache)
         # band-aid for older than v0.0.15 GAN models
         if "model_disc" in state:
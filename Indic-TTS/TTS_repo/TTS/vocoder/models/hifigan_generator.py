@@ -5,7 +5,7 @@ from torch.nn import Conv1d, ConvTranspose1d
 from torch.nn import functional as F
 from torch.nn.utils import remove_weight_norm, weight_norm
 
-from TTS.utils.io import load_fsspec
+from TTS.utils.io import load_fsspec, load_safetensors
 
 LRELU_SLOPE = 0.1
 
@@ -264,19 +264,28 @@ class HifiganGenerator(torch.nn.Module):
         return o
 
     @torch.no_grad()
-    def inference(self, c):
+    def inference(self, c, lengths=None):
         """
         Args:
             x (Tensor): conditioning input tensor.
+            lengths (Tensor, optional): number of valid frames of each item in a padded batch. Frames past
+                each length are overwritten with that item's last frame, so its output matches running it alone
+                up to small differences (about 1e-4) in its last frames.
 
         Returns:
             Tensor: output waveform.
 
         Shapes:
             x: [B, C, T]
+            lengths: [B]
             Tensor: [B, 1, T]
         """
         c = c.to(self.conv_pre.weight.device)
+        if lengths is not None:
+            lengths = torch.as_tensor(lengths, device=c.device)
+            idx = torch.arange(c.shape[2], device=c.device).unsqueeze(0)
+            idx = torch.minimum(idx, (lengths - 1).unsqueeze(1))
+            c = torch.gather(c, 2, idx.unsqueeze(1).expand(-1, c.shape[1], -1))
         c = torch.nn.functional.pad(c, (self.inference_padding, self.inference_padding), "replicate")
         return self.forward(c)
 
@@ -292,6 +301,13 @@ class HifiganGenerator(torch.nn.Module):
     def load_checkpoint(
         self, config, checkpoint_path, eval=False, cache=False
     ):  # pylint: disable=unused-argument, redefined-builtin
+        if checkpoint_path.endswith(".safetensors"):
+            # Inference-only export with weight norm already folded into the weights,
+            # which become views of the memory-mapped file
+            self.remove_weight_norm()
+            self.load_state_dict(load_safetensors(checkpoint_path), assign=True)
+            self.eval()
+            return
         state = load_fsspec(checkpoint_path, map_location=torch.device("cpu"), cache=cache)
         self.load_state_dict(state["model"])
         if eval:
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, UploadFile, File, Form, Request
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, UploadFile, File, Form, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from typing import Optional
 import os
+import logging
 
 from pipeline.orchestrator import orchestrator
 from api.schemas import TranscriptionResponse, TTSResponse, TTSInfoResponse
 from config.settings import settings
+from core.executors import StageOverloaded
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -30,24 +34,178 @@ async def transcribe(
         
     return TranscriptionResponse(
         text=result["text"],
-        translated_text=result.get("translated_text", "")
+        translated_text=result.get("translated_text", ""),
+        segments=result.get("segments", [])
     )
 
+@router.websocket("/ws/transcribe")
+async def transcribe_stream(
+    websocket: WebSocket,
+    lang: str,
+    target_lang: Optional[str] = None
+):
+    """
+    Incremental transcription. The client sends MediaRecorder chunks as binary
+    messages and the text message "stop" when done; the server answers with
+    {"type": "partial" | "final", ...} JSON events.
+    """
+    await websocket.accept()
+    try:
+        session = orchestrator.open_stream(lang, target_lang)
+    except StageOverloaded as e:
+        # 1013: Try Again Later
+        await websocket.close(code=1013, reason=str(e))
+        return
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                events = await session.feed(message["bytes"])
+            elif message.get("text") == "stop":
+                events = await session.close()
+            else:
+                continue
+
+            for event in events:
+                await websocket.send_json(event)
+            if session.closed:
+                await websocket.close()
+                break
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.exception("Error in transcription stream")
+        await websocket.close(code=1011, reason=str(e)[:120])
+    finally:
+        session.abort()
+
+AUDIO_ACCEPT = {
+    "audio/wav": "audio/wav",
+    "audio/wave": "audio/wav",
+    "audio/x-wav": "audio/wav",
+    "audio/*": "audio/wav",
+    "audio/ogg": "audio/ogg",
+    "audio/l16": "audio/L16"
+}
+
+def negotiate_audio_type(accept: Optional[str]) -> Optional[str]:
+    """
+    Picks the /tts response format from the Accept header, honouring q-values.
+    Returns None for the base64 JSON compatibility response, which is what
+    clients get without an Accept header, with */* or with application/json.
+    """
+    ranges = []
+    for idx, part in enumerate((accept or "").split(",")):
+        media_type, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranges.append((-q, idx, media_type.strip().lower()))
+
+    for _, _, media_type in sorted(ranges):
+        if media_type in ("application/json", "*/*"):
+            return None
+        if media_type in AUDIO_ACCEPT:
+            return AUDIO_ACCEPT[media_type]
+    return None
+
 @router.post("/tts", response_model=TTSResponse)
 async def tts(
+    request: Request,
     text: str = Form(...), 
     lang: str = Form(...), 
-    gender: str = Form("male")
+    gender: str = Form("male"),
+    speaking_rate: float = Form(1.0, ge=0.5, le=2.0)
 ):
+    """
+    Returns the speech as audio/wav, audio/ogg (Vorbis) or raw 16-bit mono
+    audio/L16 when the Accept header asks for one, streamed straight from the
+    sample buffer. Otherwise returns base64 WAV in JSON for older clients.
+    `speaking_rate` speeds up (> 1) or slows down the voice's configured pace.
+    """
+    media_type = negotiate_audio_type(request.headers.get("accept"))
+    if media_type is None:
+        try:
+            audio_b64 = await orchestrator.generate_tts(text, lang, gender, speaking_rate)
+            if audio_b64 is None:
+                return TTSResponse(error="TTS generation failed")
+                
+            return TTSResponse(audio=audio_b64)
+        except StageOverloaded:
+            raise
+        except Exception as e:
+            return TTSResponse(error=str(e))
+
+    result = await orchestrator.generate_tts_audio(text, lang, gender, media_type, speaking_rate)
+    if result is None:
+        return JSONResponse(status_code=500, content=TTSResponse(error="TTS generation failed").model_dump())
+
+    sample_rate, chunks = result
+    if media_type == "audio/L16":
+        media_type = f"audio/L16;rate={sample_rate};channels=1"
+    return StreamingResponse(
+        iter(chunks),
+        media_type=media_type,
+        headers={
+            "Content-Length": str(sum(memoryview(chunk).nbytes for chunk in chunks)),
+            "X-Sample-Rate": str(sample_rate)
+        }
+    )
+
+@router.post("/tts/stream")
+async def tts_stream(
+    text: str = Form(...),
+    lang: str = Form(...),
+    gender: str = Form("male"),
+    speaking_rate: float = Form(1.0, ge=0.5, le=2.0)
+):
+    """
+    Streams raw 16-bit little-endian mono PCM, one sentence per chunk, over a
+    chunked response so playback can start after the first sentence. The
+    sample rate is in the media type and in the X-Sample-Rate header.
+    """
     try:
-        audio_b64 = await orchestrator.generate_tts(text, lang, gender)
-        if audio_b64 is None:
-            return TTSResponse(error="TTS generation failed")
-            
-        return TTSResponse(audio=audio_b64)
+        sample_rate, chunks = await orchestrator.stream_tts(text, lang, gender, speaking_rate)
+    except FileNotFoundError as e:
+        return JSONResponse(status_code=404, content={"error": str(e)})
+    except StageOverloaded:
+        raise
     except Exception as e:
-        return TTSResponse(error=str(e))
+        logger.exception("Error in tts_stream")
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+    return StreamingResponse(
+        chunks,
+        media_type=f"audio/L16;rate={sample_rate};channels=1",
+        headers={"X-Sample-Rate": str(sample_rate)}
+    )
 
 @router.get("/tts_info", response_model=TTSInfoResponse)
 async def get_tts_info():
     return TTSInfoResponse(supported_languages=orchestrator.get_tts_langs())
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is serving. Reports per-model load state and load time."""
+    return {"status": "ok", **orchestrator.get_health()}
+
+@router.get("/readyz")
+async def readyz():
+    """Readiness: 200 once every preloaded model is loaded and warmed up, 503 before that or while one of them has failed to load."""
+    ready = orchestrator.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", **orchestrator.get_health()}
+    )
+
+@router.get("/metrics")
+async def get_metrics():
+    return orchestrator.get_metrics()
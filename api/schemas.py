@@ -1,9 +1,15 @@
 from pydantic import BaseModel
 from typing import Optional, List, Any
 
+class TranscriptSegment(BaseModel):
+    start: float
+    end: float
+    text: str
+
 class TranscriptionResponse(BaseModel):
     text: str
     translated_text: Optional[str] = ""
+    segments: List[TranscriptSegment] = []
     error: Optional[str] = None
 
 class TTSResponse(BaseModel):
@@ -1,14 +1,28 @@
+import asyncio
 import uvicorn
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from config.settings import settings
 from api.routes import router
+from pipeline.orchestrator import orchestrator
 from core.logger import setup_logger
+from core.executors import StageOverloaded
 
 logger = setup_logger()
 
+@asynccontextmanager
+async def lifespan(app_: FastAPI):
+    # Preload in the background: the server answers /healthz right away and /readyz once models are warm
+    preload = asyncio.create_task(asyncio.to_thread(orchestrator.preload))
+    yield
+    if not preload.done():
+        logger.info("Shutting down while models are still preloading")
+    orchestrator.workers.shutdown()
+
 def create_app() -> FastAPI:
-    app_ = FastAPI(title=settings.APP_TITLE)
+    app_ = FastAPI(title=settings.APP_TITLE, lifespan=lifespan)
     
     # Static files if any (currently empty, but good to have)
     app_.mount("/static", StaticFiles(directory="ui/static"), name="static")
@@ -16,6 +30,15 @@ def create_app() -> FastAPI:
     # Include routes
     app_.include_router(router)
     
+    # A full stage queue fails fast instead of piling up latency
+    @app_.exception_handler(StageOverloaded)
+    async def stage_overloaded(request: Request, exc: StageOverloaded):
+        return JSONResponse(
+            status_code=503,
+            content={"error": str(exc), "stage": exc.stage},
+            headers={"Retry-After": str(exc.retry_after_s)}
+        )
+    
     return app_
 
 app = create_app()
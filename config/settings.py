@@ -21,7 +21,126 @@ class Settings:
     STT_EN_MODEL_ID: str = os.getenv("STT_EN_MODEL_ID", "openai/whisper-tiny")
     MT_MODEL_PATH: str = os.getenv("MT_MODEL_PATH", "./nllb-safe")
     
+    # MT model loading: "eager" (the default) materializes the model first, then loads the weights.
+    # Opt-in low-memory loaders: "mmap" builds the model without initializing it and maps the
+    # safetensors of MT_MODEL_PATH (written by scripts/convert_models.py) in place, "low_memory" uses
+    # the transformers low_cpu_mem_usage (meta device) path. MT_DTYPE "bfloat16" halves the weights
+    # and uses bf16 matmuls on CPUs that have them; check translation quality and peak memory with
+    # scripts/benchmark_mt_load.py before switching either
+    MT_LOAD_STRATEGY: str = os.getenv("MT_LOAD_STRATEGY", "eager")
+    MT_DTYPE: str = os.getenv("MT_DTYPE", "float32")
+    
+    # Dynamic int8 quantization (CPU only) of the models listed in QUANTIZE_MODELS: "mt" (the NLLB
+    # Linear layers), "stt" (the Whisper Linear layers) and "tts" (the FastPitch encoder and decoder,
+    # whose convolutions run as quantized Linears). The int8 weights are cached in QUANTIZE_CACHE_DIR,
+    # so only the first load quantizes. Check latency and quality with scripts/benchmark_quantization.py
+    QUANTIZE_MODELS: list = [m for m in os.getenv("QUANTIZE_MODELS", "").split(",") if m]
+    QUANTIZE_CACHE_DIR: str = os.getenv("QUANTIZE_CACHE_DIR", os.path.join(BASE_DIR, "cache", "quantized"))
+    
+    # Model memory budget: when the parameters and buffers of the loaded models exceed
+    # MODEL_MEMORY_BUDGET_MB (0 = unlimited), models not serving a request are unloaded,
+    # least recently ("lru") or least frequently ("lfu") used first, and reloaded on demand
+    MODEL_MEMORY_BUDGET_MB: float = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+    MODEL_EVICTION_POLICY: str = os.getenv("MODEL_EVICTION_POLICY", "lru")
+    # A model that failed to load is not retried for MODEL_LOAD_RETRY_BACKOFF_S, doubling
+    # with each further failure up to MODEL_LOAD_RETRY_MAX_BACKOFF_S; requests get the cached error
+    MODEL_LOAD_RETRY_BACKOFF_S: float = float(os.getenv("MODEL_LOAD_RETRY_BACKOFF_S", "5"))
+    MODEL_LOAD_RETRY_MAX_BACKOFF_S: float = float(os.getenv("MODEL_LOAD_RETRY_MAX_BACKOFF_S", "300"))
+    
+    # STT micro-batching: Whisper clips arriving within STT_BATCH_MAX_WAIT_MS of each other share
+    # one padded forward pass. The Indic model decodes a single clip per call, so its requests
+    # skip the batcher and run on the STT stage workers directly
+    STT_BATCH_MAX_SIZE: int = int(os.getenv("STT_BATCH_MAX_SIZE", "8"))
+    STT_BATCH_MAX_WAIT_MS: float = float(os.getenv("STT_BATCH_MAX_WAIT_MS", "20"))
+    
+    # MT micro-batching: requests for the same language pair arriving within
+    # MT_BATCH_MAX_WAIT_MS of each other share one generate() call
+    MT_BATCH_MAX_SIZE: int = int(os.getenv("MT_BATCH_MAX_SIZE", "16"))
+    MT_BATCH_MAX_WAIT_MS: float = float(os.getenv("MT_BATCH_MAX_WAIT_MS", "10"))
+    MT_MAX_LENGTH: int = int(os.getenv("MT_MAX_LENGTH", "128"))
+    MT_NUM_BEAMS: int = int(os.getenv("MT_NUM_BEAMS", "1"))
+    
+    # MT translation cache: an LRU of MT_CACHE_MAX_ENTRIES per language pair (0 disables it),
+    # written through to the SQLite file MT_CACHE_DB when set
+    MT_CACHE_MAX_ENTRIES: int = int(os.getenv("MT_CACHE_MAX_ENTRIES", "4096"))
+    MT_CACHE_DB: str = os.getenv("MT_CACHE_DB", "")
+    
+    # TTS output cache: whole texts and single sentences, each an in-memory LRU of at most
+    # *_MAX_MB (0 disables it). With TTS_CACHE_DIR set, entries are also kept on disk as .npy files
+    TTS_CACHE_MAX_MB: float = float(os.getenv("TTS_CACHE_MAX_MB", "256"))
+    TTS_SENTENCE_CACHE_MAX_MB: float = float(os.getenv("TTS_SENTENCE_CACHE_MAX_MB", "128"))
+    TTS_CACHE_DIR: str = os.getenv("TTS_CACHE_DIR", "")
+    
+    # Per-language, per-speaker ("*" = any) FastPitch prosody: "length_scale" multiplies the predicted
+    # durations (> 1 is slower) and "pitch_shift" offsets the predicted pitch, in the model's normalized
+    # pitch units. A "prosody" mapping of speakers in a checkpoint's fastpitch/config.json overrides it
+    TTS_PROSODY_FILE: str = os.getenv("TTS_PROSODY_FILE", os.path.join(BASE_DIR, "config", "tts_prosody.json"))
+    
+    # Load the inference-only model.safetensors exports written by scripts/convert_tts_checkpoints.py
+    # (memory-mapped, so cold loads are fast and processes share the pages) instead of best_model.pth
+    TTS_USE_SAFETENSORS: bool = os.getenv("TTS_USE_SAFETENSORS", "1") == "1"
+    
+    # TTS execution backend: "torch", or "ort" to run FastPitch and HiFi-GAN through onnxruntime
+    # from the model.onnx graphs written by scripts/export_tts_onnx.py (languages without
+    # up-to-date graphs stay on torch). TTS_ORT_INTRA_OP_THREADS 0 lets onnxruntime pick
+    TTS_BACKEND: str = os.getenv("TTS_BACKEND", "torch")
+    TTS_ORT_INTRA_OP_THREADS: int = int(os.getenv("TTS_ORT_INTRA_OP_THREADS", os.getenv("TTS_TORCH_THREADS", "0")))
+    TTS_ORT_INTER_OP_THREADS: int = int(os.getenv("TTS_ORT_INTER_OP_THREADS", "1"))
+    
+    # Startup preloading: comma separated STT languages, MT pairs ("en-hi") and TTS languages
+    # to load in parallel before /readyz reports ready. PRELOAD_WARMUP also runs one dummy
+    # inference per model so the first real request does not pay for allocator/kernel warm-up
+    PRELOAD_STT_LANGS: list = [l for l in os.getenv("PRELOAD_STT_LANGS", "").split(",") if l]
+    PRELOAD_MT_PAIRS: list = [tuple(p.split("-", 1)) for p in os.getenv("PRELOAD_MT_PAIRS", "").split(",") if p]
+    PRELOAD_TTS_LANGS: list = [l for l in os.getenv("PRELOAD_TTS_LANGS", "").split(",") if l]
+    PRELOAD_WARMUP: bool = os.getenv("PRELOAD_WARMUP", "1") == "1"
+    PRELOAD_WORKERS: int = int(os.getenv("PRELOAD_WORKERS", "3"))
+    
+    # Inference executors: each pipeline stage runs on its own pool of <STAGE>_WORKERS threads,
+    # so a burst of one kind of request cannot starve the others. At most <STAGE>_MAX_QUEUE
+    # more calls wait for a worker; beyond that requests get 503 right away. <STAGE>_TORCH_THREADS
+    # sets torch's intra-op threads per worker (0 = torch's default at startup) to avoid oversubscribing cores.
+    # STT and MT workers mostly wait on their micro-batcher, so there are enough of them to fill a batch.
+    # Indic STT forwards run on the STT workers themselves; size STT_TORCH_THREADS for that many at once
+    AUDIO_WORKERS: int = int(os.getenv("AUDIO_WORKERS", "2"))
+    AUDIO_MAX_QUEUE: int = int(os.getenv("AUDIO_MAX_QUEUE", "32"))
+    STT_WORKERS: int = int(os.getenv("STT_WORKERS", os.getenv("STT_BATCH_MAX_SIZE", "8")))
+    STT_MAX_QUEUE: int = int(os.getenv("STT_MAX_QUEUE", "8"))
+    STT_TORCH_THREADS: int = int(os.getenv("STT_TORCH_THREADS", "0"))
+    MT_WORKERS: int = int(os.getenv("MT_WORKERS", os.getenv("MT_BATCH_MAX_SIZE", "16")))
+    MT_MAX_QUEUE: int = int(os.getenv("MT_MAX_QUEUE", "32"))
+    MT_TORCH_THREADS: int = int(os.getenv("MT_TORCH_THREADS", "0"))
+    TTS_WORKERS: int = int(os.getenv("TTS_WORKERS", "1"))
+    TTS_MAX_QUEUE: int = int(os.getenv("TTS_MAX_QUEUE", "8"))
+    TTS_TORCH_THREADS: int = int(os.getenv("TTS_TORCH_THREADS", "0"))
+    
+    # Serving mode: "threads" runs every stage in this process. "processes" (needs fork, so not on Windows) forks
+    # INFERENCE_PROCESSES workers after preloading, with the preloaded weights moved to shared
+    # memory first (INFERENCE_SHARE_MEMORY; needs a /dev/shm large enough for them), and sends
+    # STT, MT and TTS jobs to them. Streaming sessions stay in this process. Set the stage
+    # *_WORKERS to at least INFERENCE_PROCESSES so every worker process can be kept busy
+    SERVING_MODE: str = os.getenv("SERVING_MODE", "threads")
+    INFERENCE_PROCESSES: int = int(os.getenv("INFERENCE_PROCESSES", str(os.cpu_count() or 1)))
+    INFERENCE_PROCESS_TORCH_THREADS: int = int(os.getenv("INFERENCE_PROCESS_TORCH_THREADS", "1"))
+    INFERENCE_SHARE_MEMORY: bool = os.getenv("INFERENCE_SHARE_MEMORY", "1") == "1"
+    
     # Audio
     SAMPLE_RATE: int = 16000
+    
+    # Long-form STT: uploads longer than STT_LONG_FORM_MIN_S are cut at pauses of at least
+    # STT_SEGMENT_MIN_SILENCE_MS (energy VAD) into consecutive segments of at most STT_SEGMENT_MAX_S
+    # (keep it under Whisper's 30 s window) covering the whole upload, which go through the STT
+    # micro-batcher like other requests
+    STT_LONG_FORM_MIN_S: float = float(os.getenv("STT_LONG_FORM_MIN_S", "30"))
+    STT_SEGMENT_MAX_S: float = float(os.getenv("STT_SEGMENT_MAX_S", "25"))
+    STT_SEGMENT_MIN_SILENCE_MS: int = int(os.getenv("STT_SEGMENT_MIN_SILENCE_MS", "300"))
+
+    # Streaming STT (WebSocket)
+    STREAM_FRAME_MS: int = 30
+    STREAM_END_SILENCE_MS: int = int(os.getenv("STREAM_END_SILENCE_MS", "600"))
+    STREAM_PRE_ROLL_MS: int = 200
+    STREAM_MAX_SEGMENT_S: float = float(os.getenv("STREAM_MAX_SEGMENT_S", "15"))
+    STREAM_PARTIAL_INTERVAL_S: float = float(os.getenv("STREAM_PARTIAL_INTERVAL_S", "1.0"))
+    STREAM_BUFFER_S: float = 30.0
 
 settings = Settings()
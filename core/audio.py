@@ -3,9 +3,11 @@ import subprocess
 import imageio_ffmpeg
 import soundfile as sf
 import logging
-import tempfile
 import numpy as np
+import threading
 import time
+import io
+import struct
 
 logger = logging.getLogger(__name__)
 
@@ -31,70 +33,256 @@ def probe_file(file_path):
     cmd = [ffmpeg_path, "-v", "error", "-i", file_path, "-f", "null", "-"]
     subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
+def decode_audio_bytes(audio_bytes: bytes, sample_rate: int = 16000) -> np.ndarray:
+    """
+    Decodes any container/codec ffmpeg understands (WebM/Opus from the browser)
+    entirely in memory: bytes go in over stdin, float32 mono PCM comes back over stdout.
+    Raises subprocess.CalledProcessError if ffmpeg cannot decode the input.
+    """
+    cmd = [
+        imageio_ffmpeg.get_ffmpeg_exe(),
+        "-v", "error",
+        "-i", "pipe:0",
+        "-ar", str(sample_rate),
+        "-ac", "1",
+        "-f", "f32le",
+        "pipe:1"
+    ]
+    proc = subprocess.run(cmd, input=audio_bytes, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return np.frombuffer(proc.stdout, dtype=np.float32)
+
 def convert_webm_to_wav(webm_bytes: bytes, sample_rate: int = 16000, retries=2) -> np.ndarray:
+    """
+    Returns a float32 mono waveform at `sample_rate`, or an empty array on failure.
+    A single ffmpeg run decodes straight from memory; no temp files, no separate probe.
+    """
     if not webm_bytes or len(webm_bytes) < 100:
         logger.error("Received bytes too small to be valid audio")
-        return np.array([])
-        
-    inject_ffmpeg_path()
-    
-    # Write temp file
-    temp_webm = None
-    wav_filename = None
-    
-    try:
-        with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as f:
-            f.write(webm_bytes)
-            f.flush()
-            temp_webm_path = f.name
-            
-        wav_filename = temp_webm_path.replace(".webm", ".wav")
-        ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
-        
-        # Verify input
+        return np.array([], dtype=np.float32)
+
+    for attempt in range(retries):
         try:
-            probe_file(temp_webm_path)
+            return decode_audio_bytes(webm_bytes, sample_rate)
+        except subprocess.CalledProcessError as e:
+            if attempt == retries - 1:
+                logger.error(f"FFmpeg failed: {e.stderr.decode() if e.stderr else str(e)}")
+                return np.array([], dtype=np.float32)
+            time.sleep(0.1)
         except Exception as e:
-            logger.error(f"Input file validation failed: {e}")
-            return np.array([])
-            
-        # Conversion command with explicit pcm_s16le
+            logger.error(f"Audio conversion failed: {e}")
+            return np.array([], dtype=np.float32)
+
+def float_to_pcm16(samples: np.ndarray) -> bytes:
+    """
+    Converts float audio in [-1, 1] to 16-bit little-endian PCM bytes
+    (the audio/L16 layout, without the big-endian byte order of RFC 2586).
+    """
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+AUDIO_MEDIA_TYPES = ("audio/wav", "audio/ogg", "audio/L16")
+
+def wav_header(num_samples: int, sample_rate: int) -> bytes:
+    """44-byte RIFF header for 16-bit mono PCM."""
+    data_size = num_samples * 2
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size
+    )
+
+def encode_audio(samples: np.ndarray, sample_rate: int, media_type: str) -> list:
+    """
+    Encodes float audio for a binary HTTP response, as a list of bytes-like chunks.
+    WAV and L16 share one int16 buffer that is handed out as a memoryview, so the
+    samples are converted once and never copied into a bytes object.
+    OGG is Vorbis encoded by libsndfile into memory.
+    """
+    if media_type == "audio/ogg":
+        byte_io = io.BytesIO()
+        sf.write(byte_io, samples, sample_rate, format="OGG", subtype="VORBIS")
+        return [byte_io.getbuffer()]
+
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    if media_type == "audio/L16":
+        return [memoryview(pcm).cast("B")]
+    if media_type == "audio/wav":
+        return [wav_header(len(pcm), sample_rate), memoryview(pcm).cast("B")]
+    raise ValueError(f"Unsupported audio media type: {media_type}")
+
+class StreamingDecoder:
+    """
+    One long-lived ffmpeg process per audio stream. Container slices (e.g. MediaRecorder
+    WebM chunks, which only carry the header in the first slice) are written to stdin as
+    they arrive; a reader thread collects float32 mono PCM from stdout.
+    """
+    def __init__(self, sample_rate: int = 16000):
         cmd = [
-            ffmpeg_path, "-y", 
-            "-v", "error", 
-            "-i", temp_webm_path, 
-            "-ar", str(sample_rate), 
-            "-ac", "1", 
-            "-c:a", "pcm_s16le", 
-            "-f", "wav", 
-            wav_filename
+            imageio_ffmpeg.get_ffmpeg_exe(),
+            "-v", "error",
+            "-i", "pipe:0",
+            "-ar", str(sample_rate),
+            "-ac", "1",
+            "-f", "f32le",
+            "pipe:1"
         ]
-        
-        for attempt in range(retries):
-            try:
-                subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self._lock = threading.Lock()
+        self._chunks = []
+        self._pending = b""
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        while True:
+            data = self.proc.stdout.read1(65536)
+            if not data:
                 break
-            except subprocess.CalledProcessError as e:
-                if attempt == retries - 1:
-                    logger.error(f"FFmpeg failed: {e.stderr.decode() if e.stderr else str(e)}")
-                    raise e
-                time.sleep(0.1)
-
-        # Read back
-        y, sr = sf.read(wav_filename)
-        return y
-        
-    except Exception as e:
-        logger.error(f"Audio conversion failed: {e}")
-        return np.array([])
-        
-    finally:
-        # Cleanup
-        for p in [temp_webm_path, wav_filename]:
-            if p and os.path.exists(p):
-                try:
-                    os.remove(p)
-                except OSError as e:
-                     logger.warning(f"Failed to remove temp file {p}: {e}")
-                except Exception as e:
-                     logger.warning(f"Unexpected error removing temp file {p}: {e}")
+            with self._lock:
+                data = self._pending + data
+                usable = len(data) - len(data) % 4
+                self._chunks.append(np.frombuffer(data[:usable], dtype=np.float32))
+                self._pending = data[usable:]
+
+    def write(self, data: bytes):
+        try:
+            self.proc.stdin.write(data)
+            self.proc.stdin.flush()
+        except (BrokenPipeError, ValueError) as e:
+            logger.error(f"Streaming decoder is no longer accepting data: {e}")
+
+    def read(self) -> np.ndarray:
+        """Returns all samples decoded since the previous call."""
+        with self._lock:
+            chunks, self._chunks = self._chunks, []
+        if not chunks:
+            return np.array([], dtype=np.float32)
+        return np.concatenate(chunks)
+
+    def close(self, timeout: float = 5.0) -> np.ndarray:
+        """Flushes ffmpeg and returns the remaining samples."""
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning("Streaming decoder did not exit in time, killing it")
+            self.proc.kill()
+        self._reader.join(timeout=timeout)
+        return self.read()
+
+    def kill(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity float32 ring buffer addressed by absolute sample index
+    (samples written since the stream started).
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=np.float32)
+        self.total = 0
+
+    @property
+    def start(self) -> int:
+        """Oldest absolute index still held."""
+        return max(0, self.total - self.capacity)
+
+    def append(self, samples: np.ndarray):
+        samples = samples[-self.capacity:]
+        n = len(samples)
+        if n == 0:
+            return
+        pos = self.total % self.capacity
+        first = min(n, self.capacity - pos)
+        self.buffer[pos:pos + first] = samples[:first]
+        self.buffer[:n - first] = samples[first:]
+        self.total += n
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        start = max(start, self.start)
+        end = min(end, self.total)
+        if end <= start:
+            return np.array([], dtype=np.float32)
+        idx = np.arange(start, end) % self.capacity
+        return self.buffer[idx]
+
+class EnergyVAD:
+    """
+    Frame energy VAD with an adaptive noise floor. A frame is speech when its energy
+    clears both an absolute floor and the tracked noise level by `margin_db`.
+    """
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, min_energy_db: float = -45.0, margin_db: float = 9.0):
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.min_energy_db = min_energy_db
+        self.margin_db = margin_db
+        # Start low so a stream that opens mid-speech is not taken for noise
+        self.noise_floor_db = min_energy_db - margin_db
+
+    def frame_energies(self, audio: np.ndarray) -> np.ndarray:
+        n = len(audio) // self.frame_size
+        frames = audio[:n * self.frame_size].reshape(n, self.frame_size).astype(np.float64)
+        return 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+
+    def is_speech(self, audio: np.ndarray) -> np.ndarray:
+        """Returns one flag per whole frame of `audio`; trailing partial frames are ignored."""
+        energies = self.frame_energies(audio)
+        flags = np.zeros(len(energies), dtype=bool)
+        for i, energy in enumerate(energies):
+            flags[i] = energy > max(self.min_energy_db, self.noise_floor_db + self.margin_db)
+            if energy < self.noise_floor_db:
+                self.noise_floor_db = energy
+            else:
+                # Track rising background noise, but only crawl while speech is present
+                rate = 0.001 if flags[i] else 0.05
+                self.noise_floor_db += rate * (energy - self.noise_floor_db)
+        return flags
+
+def split_on_silence(audio: np.ndarray, sample_rate: int = 16000, max_segment_s: float = 25.0,
+                     min_silence_ms: int = 300) -> list:
+    """
+    Splits a long recording into consecutive segments of at most `max_segment_s` for offline
+    transcription. Segments end in the middle of a pause of at least `min_silence_ms`
+    (EnergyVAD), as late as the maximum length allows; sound running longer without one is
+    cut at its quietest frame. The VAD only places the cuts: the segments cover all of
+    `audio`, so nothing it takes for noise is dropped from the transcript.
+    Returns (start, end) sample offsets into `audio`.
+    """
+    if len(audio) == 0:
+        return []
+    vad = EnergyVAD(sample_rate)
+    frame = vad.frame_size
+    flags = vad.is_speech(audio)
+    energies = vad.frame_energies(audio)
+    frame_ms = 1000 * frame / sample_rate
+    max_frames = max(2, int(max_segment_s * 1000 / frame_ms))
+    min_silence = max(1, int(np.ceil(min_silence_ms / frame_ms)))
+
+    # Silence runs between speech frames; the long enough ones are cut points (their middle)
+    edges = np.diff(flags.astype(np.int8))
+    run_starts = np.flatnonzero(edges == -1) + 1
+    run_ends = np.flatnonzero(edges == 1) + 1
+    run_ends = run_ends[run_ends > run_starts[0]] if len(run_starts) else run_ends[:0]
+    run_starts = run_starts[:len(run_ends)]
+    long_runs = run_ends - run_starts >= min_silence
+    cuts = (run_starts[long_runs] + run_ends[long_runs]) // 2
+
+    segments = []
+    start = 0
+    while len(audio) - start * frame > max_frames * frame:
+        limit = start + max_frames
+        candidates = cuts[(cuts > start) & (cuts <= limit)]
+        if len(candidates):
+            end = candidates[-1]
+        else:
+            # No pause: cut at the quietest frame of the window's second half
+            half = start + max_frames // 2
+            end = half + int(np.argmin(energies[half:limit]))
+        segments.append((int(start) * frame, int(end) * frame))
+        start = end
+    segments.append((int(start) * frame, len(audio)))
+    return segments
@@ -0,0 +1,124 @@
+import os
+import time
+import logging
+import threading
+from collections import deque, Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into batches.
+    Items are grouped by key (e.g. a language pair); a worker thread waits up to
+    `max_wait_ms` after the oldest pending item for batch-mates, then runs
+    `batch_fn(key, items) -> results` once and resolves each caller's future.
+    `initializer`, if given, runs once on the worker thread before the first batch.
+    """
+    def __init__(self, name: str, batch_fn: Callable[[Hashable, List[Any]], List[Any]], max_batch_size: int = 16, max_wait_ms: float = 10.0, initializer: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.initializer = initializer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queues: Dict[Hashable, deque] = {}
+        self._cond = threading.Condition()
+        self._worker = None
+        # A forked inference worker inherits neither the worker thread nor a usable lock
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+        # Metrics
+        self.batch_sizes = Counter()
+        self.items_total = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _reset_after_fork(self):
+        self._queues = {}
+        self._cond = threading.Condition()
+        self._worker = None
+
+    def submit(self, key: Hashable, item: Any) -> Future:
+        future = Future()
+        with self._cond:
+            self._queues.setdefault(key, deque()).append((item, future, time.perf_counter()))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=f"{self.name}-batcher", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return future
+
+    def run(self, key: Hashable, item: Any) -> Any:
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(key, item).result()
+
+    def _next_batch(self):
+        with self._cond:
+            while True:
+                if not self._queues:
+                    self._cond.wait()
+                    continue
+                # Serve the key whose oldest item has waited longest
+                key = min(self._queues, key=lambda k: self._queues[k][0][2])
+                queue = self._queues[key]
+                remaining = queue[0][2] + self.max_wait - time.perf_counter()
+                if len(queue) < self.max_batch_size and remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+
+                batch = [queue.popleft() for _ in range(min(self.max_batch_size, len(queue)))]
+                if not queue:
+                    del self._queues[key]
+                return key, batch
+
+    def _run(self):
+        if self.initializer is not None:
+            self.initializer()
+        while True:
+            key, batch = self._next_batch()
+            items = [item for item, _, _ in batch]
+
+            now = time.perf_counter()
+            waits = [now - enqueued for _, _, enqueued in batch]
+            with self._cond:
+                self.batch_sizes[len(batch)] += 1
+                self.items_total += len(batch)
+                self.wait_total += sum(waits)
+                self.wait_max = max(self.wait_max, max(waits))
+
+            try:
+                results = self.batch_fn(key, items)
+                # zip() would leave the callers past the end of a short result list waiting forever
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name} batch_fn returned {len(results)} results for {len(batch)} items")
+                for (_, future, _), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                logger.error(f"{self.name} batch of {len(batch)} failed: {e}")
+                for _, future, _ in batch:
+                    # Cancelled futures, and any resolved before the failure, cannot be set again
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self) -> Dict[str, Any]:
+        # The worker updates the metrics under the same lock, so they are read as one consistent snapshot
+        with self._cond:
+            queued = sum(len(q) for q in self._queues.values())
+            histogram = dict(sorted(self.batch_sizes.items()))
+            items = self.items_total
+            wait_total = self.wait_total
+            wait_max = self.wait_max
+        batches = sum(histogram.values())
+        return {
+            "batches": batches,
+            "items": items,
+            "queued": queued,
+            "mean_batch_size": round(items / batches, 2) if batches else 0.0,
+            "batch_size_histogram": histogram,
+            "mean_queue_wait_ms": round(1000 * wait_total / items, 2) if items else 0.0,
+            "max_queue_wait_ms": round(1000 * wait_max, 2)
+        }
@@ -0,0 +1,135 @@
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+import torch
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("audio", "stt", "mt", "tts")
+
+class StageOverloaded(Exception):
+    """Raised when a stage's admission queue is full; the API answers 503 with Retry-After."""
+    def __init__(self, stage: str, retry_after_s: int = 1):
+        super().__init__(f"The {stage} stage is overloaded, retry later")
+        self.stage = stage
+        self.retry_after_s = retry_after_s
+
+# torch's intra-op thread count before any stage changed it
+DEFAULT_TORCH_THREADS = torch.get_num_threads()
+
+def set_torch_threads(num_threads: int):
+    """
+    Sets torch's intra-op threads for the calling thread (0 means DEFAULT_TORCH_THREADS).
+    Threads created afterwards start from the value set last, by whichever thread
+    set it, so every pool sets an explicit value in its initializer instead of
+    leaving its workers with another stage's cap.
+    """
+    torch.set_num_threads(num_threads if num_threads > 0 else DEFAULT_TORCH_THREADS)
+
+class StageExecutor:
+    """
+    Bounded thread pool for one pipeline stage.
+    At most `workers` calls run at once and at most `max_queue` more wait for a
+    worker; calls beyond that are rejected with StageOverloaded right away instead
+    of queueing behind work that would make them time out anyway.
+    """
+    def __init__(self, name: str, workers: int, max_queue: int, torch_threads: int = 0):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.torch_threads = torch_threads
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix=f"{name}-stage",
+            initializer=set_torch_threads,
+            initargs=(torch_threads,)
+        )
+        self._lock = threading.Lock()
+        self._admitted = 0    # queued + running
+        self._running = 0
+
+        # Metrics
+        self.started = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def check_capacity(self):
+        """Raises StageOverloaded if a new call would be rejected now."""
+        with self._lock:
+            if self._admitted >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise StageOverloaded(self.name)
+
+    async def run(self, fn: Callable, *args, check_depth: bool = True) -> Any:
+        """
+        Runs `fn(*args)` on a stage worker and awaits the result.
+        `check_depth=False` admits the call even when the queue is full; it is for
+        follow-up work of a request that was already admitted, such as the next
+        sentence of a stream, which must not fail halfway through.
+        """
+        with self._lock:
+            if check_depth and self._admitted >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise StageOverloaded(self.name)
+            self._admitted += 1
+
+        enqueued = time.perf_counter()
+
+        def _task():
+            wait = time.perf_counter() - enqueued
+            with self._lock:
+                self._running += 1
+                self.started += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        def _release(_):
+            # Runs when the task finishes or is cancelled before it started
+            with self._lock:
+                self._admitted -= 1
+                self.completed += 1
+
+        future = self._pool.submit(_task)
+        future.add_done_callback(_release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "torch_threads": self.torch_threads,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "mean_queue_wait_ms": round(1000 * self.wait_total / self.started, 2) if self.started else 0.0,
+                "max_queue_wait_ms": round(1000 * self.wait_max, 2)
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+# One executor per stage, sized by the <STAGE>_WORKERS, <STAGE>_MAX_QUEUE and <STAGE>_TORCH_THREADS settings
+stage_executors: Dict[str, StageExecutor] = {
+    stage: StageExecutor(
+        stage,
+        getattr(settings, f"{stage.upper()}_WORKERS"),
+        getattr(settings, f"{stage.upper()}_MAX_QUEUE"),
+        getattr(settings, f"{stage.upper()}_TORCH_THREADS", 0)
+    )
+    for stage in STAGES
+}
@@ -0,0 +1,41 @@
+import os
+import sys
+from typing import Optional
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process (anonymous and file-backed pages), or None without /proc."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, AttributeError, ValueError):
+        return None
+
+def rss_breakdown() -> dict:
+    """RssAnon / RssFile / RssShmem of this process in bytes, from /proc/self/status (empty without /proc)."""
+    breakdown = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(("RssAnon", "RssFile", "RssShmem")):
+                    name, value, _ = line.split()
+                    breakdown[name.rstrip(":")] = int(value) * 1024
+    except OSError:
+        return {}
+    return breakdown
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far, or None where getrusage is missing."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def to_mb(nbytes: Optional[int]) -> Optional[int]:
+    return None if nbytes is None else round(nbytes / 2**20)
@@ -1,18 +1,108 @@
 import gc
+import os
+import time
 import torch
 import logging
-from typing import Optional, Any, Dict
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Optional, Any, Callable, Dict, Iterator
 
 from core.device_manager import device_manager
+from core.quantization import quantized_nbytes
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+def iter_modules(model: Any, max_depth: int = 2) -> Iterator[torch.nn.Module]:
+    """
+    Yields the top-level torch modules reachable from `model`: the model itself, or
+    modules held by a wrapper (a transformers pipeline, a TTS Synthesizer) up to
+    `max_depth` attributes deep.
+    """
+    seen = set()
+
+    def visit(obj, depth):
+        if id(obj) in seen:
+            return
+        seen.add(id(obj))
+
+        if isinstance(obj, torch.nn.Module):
+            yield obj
+            return
+        if depth >= max_depth:
+            return
+        if isinstance(obj, dict):
+            children = obj.values()
+        elif isinstance(obj, (list, tuple)):
+            children = obj
+        elif hasattr(obj, "__dict__"):
+            children = vars(obj).values()
+        else:
+            return
+        for child in list(children):
+            yield from visit(child, depth + 1)
+
+    yield from visit(model, 0)
+
+def model_nbytes(model: Any) -> int:
+    """Bytes held by the parameters and buffers of every module in `model`; shared and tied tensors are counted once."""
+    seen_tensors = set()
+    total = 0
+    for module in iter_modules(model):
+        for tensor in list(module.parameters()) + list(module.buffers()):
+            tensor_key = (tensor.device, tensor.data_ptr(), tensor.nbytes)
+            if tensor_key not in seen_tensors:
+                seen_tensors.add(tensor_key)
+                total += tensor.nbytes
+        total += quantized_nbytes(module)
+    return total
+
 class ModelManager:
     _instance = None
-    
-    def __init__(self):
+
+    def __init__(self, budget_bytes: Optional[int] = None, policy: Optional[str] = None):
         self.models: Dict[str, Any] = {}
-        
+        # Per-model load state ("loading" / "loaded" / "failed" / "unloaded" / "evicted") and timings, for /healthz and /readyz
+        self.status: Dict[str, Dict[str, Any]] = {}
+
+        # Memory budget: once the resident models exceed it, unpinned models are evicted
+        # least recently ("lru") or least frequently ("lfu") used first. 0 means unlimited
+        if budget_bytes is None:
+            budget_bytes = int(settings.MODEL_MEMORY_BUDGET_MB * 1024 * 1024)
+        self.budget_bytes = budget_bytes
+        self.policy = (policy or settings.MODEL_EVICTION_POLICY).lower()
+        if self.policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy: {self.policy}")
+
+        # Sizes are kept after eviction, so a reload can make room before it starts
+        self.sizes: Dict[str, int] = {}
+        self.last_used: Dict[str, float] = {}
+        self.use_counts = Counter()
+        self.pins = Counter()
+        self.eviction_callbacks: Dict[str, Callable[[], None]] = {}
+        self._lock = threading.RLock()
+
+        # Single-flight loading: the future of the load running for each key, and the
+        # last failure per key with the time before which it is not retried
+        self._inflight: Dict[str, Future] = {}
+        self.failures: Dict[str, Dict[str, Any]] = {}
+        # Inference worker processes are forked from this one; locks another thread
+        # held at fork time would never be released in the child
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+        # Metrics
+        self.evictions = Counter()
+        self.reloads = Counter()
+        self.coalesced_loads = Counter()
+
+    def _reset_after_fork(self):
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self.pins.clear()
+
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
@@ -23,35 +113,212 @@ class ModelManager:
         """
         Loads a model if not already loaded.
         loader_func: Function that returns the model
+
+        Single-flight: while one thread runs the loader for `key`, other callers for
+        the same key wait for its result instead of loading a second copy. Different
+        keys load in parallel. A failed load is remembered, and callers get the same
+        error without a retry until an exponentially growing backoff has passed.
         """
-        if key in self.models:
-            return self.models[key]
-            
+        with self._lock:
+            if key in self.models:
+                self._touch(key)
+                return self.models[key]
+
+            failure = self.failures.get(key)
+            if failure is not None and time.monotonic() < failure["retry_at"]:
+                raise failure["error"].with_traceback(None)
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            self.coalesced_loads[key] += 1
+            logger.info(f"Waiting for in-flight load of {key}")
+            return future.result()
+
+        try:
+            model = self._load(key, loader_func, *args, **kwargs)
+            future.set_result(model)
+            return model
+        except Exception as e:
+            future.set_exception(e)
+            raise e
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _load(self, key: str, loader_func, *args, **kwargs):
+        # Make room up front using the size measured the last time this model was loaded
+        self._enforce_budget(keep=key, incoming_bytes=self.sizes.get(key, 0))
         logger.info(f"Loading model: {key}")
+        self.status[key] = {"state": "loading"}
+        start = time.perf_counter()
         try:
             model = loader_func(*args, **kwargs)
             if model is None:
                 raise ValueError(f"Loader/Validation failed for {key}")
-                
-            self.models[key] = model
-            logger.info(f"Model {key} loaded successfully.")
+
+            nbytes = model_nbytes(model)
+            with self._lock:
+                self.models[key] = model
+                self.sizes[key] = nbytes
+                self._touch(key)
+                if self.evictions[key]:
+                    self.reloads[key] += 1
+                self.failures.pop(key, None)
+            self.status[key] = {"state": "loaded", "load_time_s": round(time.perf_counter() - start, 2), "bytes": nbytes}
+            logger.info(f"Model {key} loaded successfully in {self.status[key]['load_time_s']}s ({nbytes / 2**20:.1f} MiB).")
+            self._enforce_budget(keep=key)
             return model
         except Exception as e:
-            logger.error(f"CRITICAL: Failed to load model {key}: {e}")
+            with self._lock:
+                attempts = self.failures.get(key, {}).get("attempts", 0) + 1
+                backoff = min(settings.MODEL_LOAD_RETRY_BACKOFF_S * 2 ** (attempts - 1), settings.MODEL_LOAD_RETRY_MAX_BACKOFF_S)
+                self.failures[key] = {"error": e, "attempts": attempts, "retry_at": time.monotonic() + backoff}
+            self.status[key] = {
+                "state": "failed",
+                "load_time_s": round(time.perf_counter() - start, 2),
+                "error": str(e),
+                "attempts": attempts,
+                "retry_in_s": round(backoff, 1)
+            }
+            logger.error(f"CRITICAL: Failed to load model {key} (attempt {attempts}, next retry in {backoff:.0f}s): {e}")
             raise e
 
+    @contextmanager
+    def pinned(self, key: str):
+        """Keeps `key` from being evicted while the block runs, e.g. for the length of a request."""
+        with self._lock:
+            self.pins[key] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.pins[key] -= 1
+                if not self.pins[key]:
+                    del self.pins[key]
+            # Pinned models may have held the manager over budget
+            self._enforce_budget()
+
+    @contextmanager
+    def use(self, key: str, loader_func, *args, **kwargs):
+        """Loads `key` if needed and yields it, pinned for the duration of the block."""
+        with self.pinned(key):
+            yield self.load_model(key, loader_func, *args, **kwargs)
+
+    def register_eviction_callback(self, key: str, callback: Callable[[], None]):
+        """`callback` runs when `key` is unloaded, so owners can drop their own references to the model."""
+        self.eviction_callbacks[key] = callback
+
+    def _touch(self, key: str):
+        self.last_used[key] = time.monotonic()
+        self.use_counts[key] += 1
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(self.sizes.get(key, 0) for key in self.models)
+
+    def _enforce_budget(self, keep: Optional[str] = None, incoming_bytes: int = 0):
+        """Evicts unpinned models other than `keep` until the resident ones, plus `incoming_bytes`, fit the budget."""
+        if self.budget_bytes <= 0:
+            return
+        evicted = []
+        with self._lock:
+            resident = self.resident_bytes()
+            while resident + incoming_bytes > self.budget_bytes:
+                candidates = [key for key in self.models if key != keep and not self.pins[key]]
+                if not candidates:
+                    logger.warning(
+                        f"Model memory {(resident + incoming_bytes) / 2**20:.0f} MiB exceeds the "
+                        f"{self.budget_bytes / 2**20:.0f} MiB budget, but every resident model is in use"
+                    )
+                    break
+                if self.policy == "lfu":
+                    victim = min(candidates, key=lambda k: (self.use_counts[k], self.last_used[k]))
+                else:
+                    victim = min(candidates, key=lambda k: self.last_used[k])
+                logger.info(f"Evicting model {victim} ({self.sizes.get(victim, 0) / 2**20:.1f} MiB, {self.policy})")
+                self._remove(victim, "evicted")
+                self.evictions[victim] += 1
+                evicted.append(victim)
+                resident = self.resident_bytes()
+        if evicted:
+            self.clear_cache()
+
+    def _remove(self, key: str, state: str):
+        del self.models[key]
+        self.status[key] = {"state": state}
+        callback = self.eviction_callbacks.get(key)
+        if callback is not None:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Eviction callback for {key} failed: {e}")
+
+    def record_warmup(self, key: str, seconds: float):
+        if key in self.status:
+            self.status[key]["warmup_time_s"] = round(seconds, 2)
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        return {key: dict(status) for key, status in self.status.items()}
+
     def get_model(self, key: str) -> Optional[Any]:
         return self.models.get(key)
-        
+
     def unload_model(self, key: str):
-        if key in self.models:
+        with self._lock:
+            if key not in self.models:
+                return
             logger.info(f"Unloading model: {key}")
-            del self.models[key]
-            self.clear_cache()
-            
+            self._remove(key, "unloaded")
+        self.clear_cache()
+
+    def share_memory(self) -> int:
+        """
+        Moves the weights of every resident model into shared memory, so processes
+        forked afterwards map the same pages instead of each holding a copy.
+        Weights memory-mapped from a file (safetensors exports) already count as shared
+        and stay mapped, so their pages keep coming from the page cache.
+        Returns the bytes shared.
+        """
+        total = 0
+        with self._lock:
+            for key, model in self.models.items():
+                for module in iter_modules(model):
+                    module.share_memory()
+                total += self.sizes.get(key, 0)
+        return total
+
     def clear_cache(self):
         gc.collect()
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
 
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "policy": self.policy,
+                "budget_bytes": self.budget_bytes,
+                "resident_bytes": self.resident_bytes(),
+                "evictions": sum(self.evictions.values()),
+                "reloads": sum(self.reloads.values()),
+                "coalesced_loads": sum(self.coalesced_loads.values()),
+                "loading": sorted(self._inflight),
+                "models": {
+                    key: {
+                        "resident": key in self.models,
+                        "bytes": self.sizes[key],
+                        "pins": self.pins[key],
+                        "uses": self.use_counts[key],
+                        "idle_s": round(now - self.last_used[key], 1),
+                        "evictions": self.evictions[key],
+                        "reloads": self.reloads[key]
+                    }
+                    for key in self.sizes
+                }
+            }
+
 model_manager = ModelManager.get_instance()
@@ -0,0 +1,128 @@
+import os
+import queue
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from core.executors import set_torch_threads
+
+logger = logging.getLogger(__name__)
+
+# How long start() waits for every worker to report its pid
+WORKER_READY_TIMEOUT_S = 60.0
+
+def _init_worker(torch_threads: int, initializer: Optional[Callable[[], None]], ready):
+    set_torch_threads(torch_threads)
+    if initializer is not None:
+        initializer()
+    ready.put(os.getpid())
+    logger.info(f"Inference worker {os.getpid()} ready")
+
+def _worker_pid(_) -> int:
+    return os.getpid()
+
+def fork_supported() -> bool:
+    """Whether worker processes can be forked here (not on Windows)."""
+    return "fork" in multiprocessing.get_all_start_methods()
+
+class InferenceProcessPool:
+    """
+    Pool of forked inference worker processes.
+    Models loaded in the parent before start() are inherited by every worker, so
+    with their weights in shared memory they exist once however many workers run,
+    and pure-Python stages no longer serialize on one interpreter's GIL.
+    Until start() is called, call() simply runs the job in the calling thread,
+    which is the behaviour of the default single-process serving mode.
+    Jobs must be picklable, i.e. module-level functions with picklable arguments.
+    """
+    def __init__(self, processes: int, torch_threads: int = 1, initializer: Optional[Callable[[], None]] = None):
+        self.processes = max(1, processes)
+        self.torch_threads = torch_threads
+        self.initializer = initializer
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # A worker runs its jobs inline and never forks workers of its own
+        self.in_worker = False
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+        # Metrics
+        self.shared_bytes = 0
+        self.restarts = 0
+        self.pids = []
+
+    def _reset_after_fork(self):
+        self._pool = None
+        self._lock = threading.Lock()
+        self.in_worker = True
+
+    @property
+    def started(self) -> bool:
+        return self._pool is not None
+
+    def start(self):
+        """Forks the workers. Call after the models to share are loaded."""
+        with self._lock:
+            if self._pool is not None or self.in_worker:
+                return
+            context = multiprocessing.get_context("fork")
+            # Each worker reports its pid here once its initializer has run
+            ready = context.Queue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.torch_threads, self.initializer, ready)
+            )
+            pool = self._pool
+        # With fork every worker is created on the first submit; wait until they answer
+        list(pool.map(_worker_pid, range(self.processes)))
+        pids = []
+        try:
+            for _ in range(self.processes):
+                pids.append(ready.get(timeout=WORKER_READY_TIMEOUT_S))
+        except queue.Empty:
+            logger.warning(f"Only {len(pids)} of {self.processes} inference workers reported ready")
+        self.pids = sorted(pids)
+        logger.info(f"Started {self.processes} inference worker processes: {self.pids}")
+
+    def call(self, fn: Callable, *args) -> Any:
+        """Runs `fn(*args)` in a worker process (or inline before start()) and returns its result."""
+        pool = self._pool
+        if pool is None:
+            return fn(*args)
+        try:
+            return pool.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for running out of memory); replace the pool for later jobs
+            logger.error("An inference worker process died; restarting the pool")
+            self._restart(pool)
+            raise
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._pool is not broken:
+                return
+            self._pool = None
+            self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "processes": self.processes if self.started else 0,
+            "pids": self.pids,
+            "torch_threads": self.torch_threads,
+            "shared_bytes": self.shared_bytes,
+            "restarts": self.restarts
+        }
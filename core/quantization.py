@@ -0,0 +1,183 @@
+import os
+import glob
+import hashlib
+import logging
+from typing import Dict, Iterable, Optional, Sequence
+
+import torch
+import torch.nn.functional as F
+import torch.ao.nn.quantized.dynamic as nnqd
+from torch.ao.quantization import per_channel_dynamic_qconfig
+from safetensors.torch import load_file, save_file
+
+from config.settings import settings
+from core.device_manager import device_manager
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the layout of the cached files changes
+CACHE_FORMAT = 1
+
+def quantization_enabled(name: str) -> bool:
+    """Whether QUANTIZE_MODELS lists `name` ("mt", "stt", "tts"). Dynamic int8 kernels only exist on CPU."""
+    if name not in settings.QUANTIZE_MODELS:
+        return False
+    if device_manager.is_cuda():
+        logger.warning(f"Dynamic int8 quantization is CPU only; running {name} unquantized on CUDA")
+        return False
+    return True
+
+def _digest(*parts) -> str:
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+def stat_id(paths: Iterable[str]) -> str:
+    """Cheap identity of model files (name, size, mtime), for keying caches on multi-GB weights without hashing them."""
+    parts = []
+    for path in sorted(paths):
+        if os.path.isfile(path):
+            st = os.stat(path)
+            parts.append((os.path.basename(path), st.st_size, st.st_mtime_ns))
+    return _digest(*parts)
+
+class Conv1dAsLinear(torch.nn.Module):
+    """
+    Conv1d computed as a dynamically quantized Linear over unfolded frames.
+    torch's DynamicQuantizedConv1d is documented as numerically poor, while the
+    quantized Linear kernels are accurate and fast, and a stride 1 convolution is
+    exactly a Linear over each window of `kernel_size` frames.
+    """
+    def __init__(self, in_channels: int, out_channels: int, kernel_size: int, padding: int, bias: bool = True):
+        super().__init__()
+        self.kernel_size = kernel_size
+        self.padding = padding
+        self.linear = nnqd.Linear(in_channels * kernel_size, out_channels, bias_=bias, dtype=torch.qint8)
+
+    @staticmethod
+    def supports(conv: torch.nn.Conv1d) -> bool:
+        return (
+            conv.stride == (1,) and conv.dilation == (1,) and conv.groups == 1
+            and conv.padding_mode == "zeros" and isinstance(conv.padding, tuple)
+        )
+
+    @classmethod
+    def from_float(cls, conv: torch.nn.Conv1d) -> "Conv1dAsLinear":
+        module = cls(conv.in_channels, conv.out_channels, conv.kernel_size[0], conv.padding[0], conv.bias is not None)
+        # (out, in, k) -> (out, in * k), matching the (channel, offset) order of the unfolded frames
+        linear = torch.nn.Linear(conv.in_channels * conv.kernel_size[0], conv.out_channels, bias=conv.bias is not None)
+        linear.weight.data = conv.weight.detach().reshape(conv.out_channels, -1)
+        if conv.bias is not None:
+            linear.bias.data = conv.bias.detach()
+        linear.qconfig = per_channel_dynamic_qconfig
+        module.linear = nnqd.Linear.from_float(linear)
+        return module
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        # (B, C, T) -> (B, T, C * k) -> (B, T, out) -> (B, out, T)
+        if self.padding:
+            x = F.pad(x, (self.padding, self.padding))
+        frames = x.unfold(2, self.kernel_size, 1).permute(0, 2, 1, 3)
+        frames = frames.reshape(frames.shape[0], frames.shape[1], -1)
+        return self.linear(frames).transpose(1, 2)
+
+def _swap_layers(module: torch.nn.Module, convs: bool, empty: bool) -> int:
+    """
+    Replaces the Linear (and with `convs`, the eligible Conv1d) layers below `module`
+    with dynamically quantized ones: quantized from the float weights, or with `empty`
+    left unset for cached weights to be loaded into. Returns the number replaced.
+    """
+    swapped = 0
+    for name, child in list(module.named_children()):
+        # Exact type: nn.MultiheadAttention's NonDynamicallyQuantizableLinear must stay float
+        if type(child) is torch.nn.Linear:
+            if empty:
+                replacement = nnqd.Linear(child.in_features, child.out_features, bias_=child.bias is not None, dtype=torch.qint8)
+            else:
+                child.qconfig = per_channel_dynamic_qconfig
+                replacement = nnqd.Linear.from_float(child)
+        elif convs and type(child) is torch.nn.Conv1d and Conv1dAsLinear.supports(child):
+            if empty:
+                replacement = Conv1dAsLinear(child.in_channels, child.out_channels, child.kernel_size[0], child.padding[0], child.bias is not None)
+            else:
+                replacement = Conv1dAsLinear.from_float(child)
+        else:
+            swapped += _swap_layers(child, convs, empty)
+            continue
+        setattr(module, name, replacement)
+        swapped += 1
+    return swapped
+
+def _quantized_state(module: torch.nn.Module) -> Dict[str, torch.Tensor]:
+    """The int8 weights, scales and biases of the quantized layers as plain tensors, since safetensors has no quantized dtypes."""
+    state = {}
+    for name, child in module.named_modules():
+        if not isinstance(child, nnqd.Linear):
+            continue
+        weight, bias = child._weight_bias()
+        state[f"{name}.weight_int8"] = weight.int_repr().contiguous()
+        state[f"{name}.weight_scales"] = weight.q_per_channel_scales().contiguous()
+        state[f"{name}.weight_zero_points"] = weight.q_per_channel_zero_points().contiguous()
+        if bias is not None:
+            state[f"{name}.bias"] = bias.detach().contiguous()
+    return state
+
+def _load_quantized_state(module: torch.nn.Module, state: Dict[str, torch.Tensor]):
+    for name, child in module.named_modules():
+        if not isinstance(child, nnqd.Linear):
+            continue
+        weight = torch._make_per_channel_quantized_tensor(
+            state[f"{name}.weight_int8"], state[f"{name}.weight_scales"], state[f"{name}.weight_zero_points"], 0
+        )
+        child.set_weight_bias(weight, state.get(f"{name}.bias"))
+
+def quantized_nbytes(module: torch.nn.Module) -> int:
+    """Bytes of the packed int8 weights, which are not parameters or buffers of the module."""
+    total = 0
+    for child in module.modules():
+        if isinstance(child, nnqd.Linear):
+            weight, bias = child._weight_bias()
+            total += weight.int_repr().nbytes + (bias.nbytes if bias is not None else 0)
+    return total
+
+def quantize_model(model: torch.nn.Module, name: str, source_id: str, submodules: Optional[Sequence[str]] = None, convs: bool = False) -> torch.nn.Module:
+    """
+    Quantizes the Linear layers of `model` (of the `submodules` children only, when given)
+    to dynamic int8, in place. With `convs`, eligible Conv1d layers run as quantized
+    Linears too (Conv1dAsLinear). The int8 weights are cached in QUANTIZE_CACHE_DIR,
+    keyed on `source_id` and the torch version, so later loads only read them back.
+    """
+    targets = [getattr(model, attr) for attr in submodules] if submodules else [model]
+    key = _digest(source_id, torch.__version__, CACHE_FORMAT, submodules, convs)[:16]
+    cache_path = os.path.join(settings.QUANTIZE_CACHE_DIR, f"{name}-{key}.safetensors")
+
+    state = None
+    if os.path.isfile(cache_path):
+        try:
+            state = load_file(cache_path)
+        except Exception as e:
+            logger.warning(f"Unreadable quantization cache {cache_path}, quantizing again: {e}")
+    if state is not None:
+        for index, target in enumerate(targets):
+            _swap_layers(target, convs, empty=True)
+            prefix = f"{index}."
+            _load_quantized_state(target, {k[len(prefix):]: v for k, v in state.items() if k.startswith(prefix)})
+        logger.info(f"Loaded int8 weights of {name} from {cache_path}")
+        return model
+
+    swapped = sum(_swap_layers(target, convs, empty=False) for target in targets)
+    logger.info(f"Quantized {swapped} layers of {name} to int8")
+
+    state = {}
+    for index, target in enumerate(targets):
+        state.update({f"{index}.{k}": v for k, v in _quantized_state(target).items()})
+    try:
+        os.makedirs(settings.QUANTIZE_CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        save_file(state, tmp_path, metadata={"source_id": source_id, "torch": torch.__version__})
+        os.replace(tmp_path, cache_path)
+        # Caches of older weights of this model are never read again
+        for stale in glob.glob(os.path.join(settings.QUANTIZE_CACHE_DIR, f"{name}-*.safetensors")):
+            if stale != cache_path:
+                os.remove(stale)
+    except OSError as e:
+        logger.warning(f"Could not cache the int8 weights of {name}: {e}")
+    return model
@@ -1,13 +1,35 @@
+import os
+import glob
+import time
 import torch
 import logging
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from safetensors.torch import load_file
+from transformers import AutoConfig, AutoModelForSeq2SeqLM, AutoTokenizer
+try:
+    from transformers.initialization import no_init_weights
+except ImportError:  # transformers < 5
+    from transformers.modeling_utils import no_init_weights
 from config.settings import settings
 from core.device_manager import device_manager
 from core.model_manager import model_manager
+from core.batching import MicroBatcher
+from core.executors import set_torch_threads
+from core.memory import rss_bytes, peak_rss_bytes, to_mb
+from core.quantization import quantization_enabled, quantize_model, stat_id
 
 logger = logging.getLogger(__name__)
 
 
+MT_DTYPES = {
+    "float32": torch.float32,
+    "bfloat16": torch.bfloat16,
+    "float16": torch.float16
+}
+
 # 2. Load NLLB safely (NO meta tensors) + 4. Correct language routing
 NLLB_LANG_MAP = {
     "en": "eng_Latn",
@@ -22,9 +44,125 @@ NLLB_LANG_MAP = {
     "pa": "pan_Guru"
 }
 
+class TranslationCache:
+    """
+    Memoizes translations in one size-bounded LRU per language pair, with optional
+    write-through to a SQLite file so a restarted server keeps its hit rate.
+    `namespace` identifies the model and generation settings, so entries from
+    different configurations never collide in the shared file.
+    """
+    def __init__(self, namespace: str, max_entries: int, db_path: Optional[str] = None):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._pairs: Dict[Tuple[str, str], OrderedDict] = {}
+        self._lock = threading.Lock()
+
+        self.db_path = db_path
+        self._db = None
+        if db_path:
+            self._connect()
+        # SQLite connections must not be used across fork(); forked inference workers open their own
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+        # Metrics
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "namespace TEXT, src TEXT, tgt TEXT, text TEXT, translation TEXT, "
+            "PRIMARY KEY (namespace, src, tgt, text))"
+        )
+        self._db.commit()
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        if self.db_path:
+            self._connect()
+
+    def get(self, lang_pair: Tuple[str, str], text: str) -> Optional[str]:
+        with self._lock:
+            entries = self._pairs.get(lang_pair)
+            if entries is not None and text in entries:
+                entries.move_to_end(text)
+                self.hits += 1
+                return entries[text]
+
+            translation = None
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT translation FROM translations WHERE namespace=? AND src=? AND tgt=? AND text=?",
+                    (self.namespace, lang_pair[0], lang_pair[1], text)
+                ).fetchone()
+                if row:
+                    translation = row[0]
+                    self.db_hits += 1
+                    self._insert(lang_pair, text, translation)
+
+            if translation is None:
+                self.misses += 1
+            return translation
+
+    def put(self, lang_pair: Tuple[str, str], text: str, translation: str):
+        with self._lock:
+            self._insert(lang_pair, text, translation)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                        (self.namespace, lang_pair[0], lang_pair[1], text, translation)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Translation cache write failed: {e}")
+
+    def _insert(self, lang_pair, text, translation):
+        entries = self._pairs.setdefault(lang_pair, OrderedDict())
+        entries[text] = translation
+        entries.move_to_end(text)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.db_hits + self.misses
+            return {
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.db_hits) / lookups, 3) if lookups else 0.0,
+                "entries": {f"{src}->{tgt}": len(entries) for (src, tgt), entries in self._pairs.items()}
+            }
+
 class MTEngine:
     def __init__(self):
         self.tokenizer = None
+        self.load_stats = None
+        self.generation_params = {
+            "max_length": settings.MT_MAX_LENGTH,
+            "num_beams": settings.MT_NUM_BEAMS
+        }
+        self.cache = None
+        if settings.MT_CACHE_MAX_ENTRIES > 0:
+            namespace = f"{settings.MT_MODEL_PATH}|max_length={settings.MT_MAX_LENGTH}|num_beams={settings.MT_NUM_BEAMS}"
+            self.cache = TranslationCache(namespace, settings.MT_CACHE_MAX_ENTRIES, settings.MT_CACHE_DB or None)
+        # Concurrent translate() calls for the same language pair share one generate()
+        self.batcher = MicroBatcher(
+            "mt",
+            self._translate_batch,
+            max_batch_size=settings.MT_BATCH_MAX_SIZE,
+            max_wait_ms=settings.MT_BATCH_MAX_WAIT_MS,
+            # generate() runs on the batcher thread, so that is where the MT torch thread cap applies
+            initializer=lambda: set_torch_threads(settings.MT_TORCH_THREADS)
+        )
         
     def load_model(self):
         logger.info(f"Loading Translation model from {settings.MT_MODEL_PATH}...")
@@ -34,20 +172,88 @@ class MTEngine:
             settings.MT_MODEL_PATH
         )
         
-        # 1. Use the correct model class + 2. Load NLLB safely
-        model = AutoModelForSeq2SeqLM.from_pretrained(
-            settings.MT_MODEL_PATH,
-            torch_dtype=torch.float32,
-            low_cpu_mem_usage=False
-        )
+        strategy = settings.MT_LOAD_STRATEGY
+        dtype = MT_DTYPES[settings.MT_DTYPE]
+        quantize = quantization_enabled("mt")
+        if quantize and dtype != torch.float32:
+            # The dynamic int8 kernels quantize float32 weights
+            logger.warning(f"QUANTIZE_MODELS includes mt; loading float32 weights instead of {settings.MT_DTYPE}")
+            dtype = torch.float32
+        weight_files = sorted(glob.glob(os.path.join(settings.MT_MODEL_PATH, "*.safetensors")))
+        if strategy == "mmap" and not weight_files:
+            logger.warning(f"No safetensors in {settings.MT_MODEL_PATH} (see scripts/convert_models.py); loading eagerly")
+            strategy = "eager"
+
+        start = time.perf_counter()
+        if strategy == "mmap":
+            model = self._load_mmap(weight_files, dtype)
+        else:
+            # 1. Use the correct model class + 2. Load NLLB safely. "low_memory" lets
+            # transformers initialize on the meta device and fill the weights shard by shard
+            model = AutoModelForSeq2SeqLM.from_pretrained(
+                settings.MT_MODEL_PATH,
+                dtype=dtype,
+                low_cpu_mem_usage=strategy == "low_memory"
+            )
         
         # 6. GPU handling (safe)
         if device_manager.is_cuda():
             model = model.to("cuda")
             
         model.eval()
+        if quantize:
+            source_files = weight_files or glob.glob(os.path.join(settings.MT_MODEL_PATH, "*.bin"))
+            model = quantize_model(model, "mt", stat_id(source_files))
+        self.load_stats = {
+            "strategy": strategy,
+            "dtype": "int8" if quantize else settings.MT_DTYPE,
+            "load_time_s": round(time.perf_counter() - start, 2),
+            "rss_mb": to_mb(rss_bytes()),
+            "peak_rss_mb": to_mb(peak_rss_bytes())
+        }
+        logger.info(f"Translation model loaded: {self.load_stats}")
+        return model
+
+    def _load_mmap(self, weight_files: List[str], dtype: torch.dtype):
+        """
+        Builds the model without initializing its weights (and without the meta device),
+        then assigns the weights as views of the memory-mapped safetensors files, so the
+        model is never materialized twice. With a dtype other than the stored one, each
+        tensor is converted on its own and its mapped pages can be dropped afterwards.
+        """
+        config = AutoConfig.from_pretrained(settings.MT_MODEL_PATH)
+        with no_init_weights():
+            model = AutoModelForSeq2SeqLM.from_config(config, dtype=dtype)
+
+        state = {}
+        for path in weight_files:
+            for name, tensor in load_file(path).items():
+                state[name] = tensor.to(dtype) if tensor.is_floating_point() else tensor
+        missing, unexpected = model.load_state_dict(state, strict=False, assign=True)
+        # Tied embeddings are stored once; tie_weights() points the other keys at them
+        model.tie_weights()
+
+        loaded = {tensor.data_ptr() for tensor in state.values()}
+        parameters = dict(model.named_parameters(remove_duplicate=False))
+        untied = [name for name in missing if name in parameters and parameters[name].data_ptr() not in loaded]
+        if untied or unexpected:
+            raise ValueError(f"Weights do not match the model config: missing {untied}, unexpected {unexpected}")
         return model
 
+    def warmup(self, lang_pairs: List[Tuple[str, str]]):
+        """
+        Loads the model (raising on failure) and, with PRELOAD_WARMUP, runs one
+        uncached generate() per language pair to trigger allocator and kernel warm-up.
+        """
+        model_manager.load_model("mt_model", self.load_model)
+        if not settings.PRELOAD_WARMUP:
+            return
+
+        start = time.perf_counter()
+        for src_lang, tgt_lang in lang_pairs:
+            self._translate_batch((NLLB_LANG_MAP[src_lang], NLLB_LANG_MAP[tgt_lang]), ["Hello, how are you?"])
+        model_manager.record_warmup("mt_model", time.perf_counter() - start)
+
     def translate(self, text: str, src_lang: str, tgt_lang: str) -> str:
         if not text or src_lang == tgt_lang:
             return text
@@ -59,27 +265,42 @@ class MTEngine:
             logger.warning(f"Unsupported language pair: {src_lang} -> {tgt_lang}")
             return f"{text} (Unsupported Language)"
 
+        lang_pair = (src_code, tgt_code)
+        if self.cache is not None:
+            cached = self.cache.get(lang_pair, text)
+            if cached is not None:
+                return cached
+
+        translation = self.batcher.run(lang_pair, text)
+        if self.cache is not None:
+            self.cache.put(lang_pair, text, translation)
+        return translation
+
+    def _translate_batch(self, lang_pair, texts: List[str]) -> List[str]:
+        src_code, tgt_code = lang_pair
         try:
-            # 5. Fix ModelManager behavior (Load once, fail fast)
-            model = model_manager.load_model("mt_model", self.load_model)
-            
-            self.tokenizer.src_lang = src_code
-            inputs = self.tokenizer(text, return_tensors="pt")
-            
-            if device_manager.is_cuda():
-                inputs = {k: v.to("cuda") for k, v in inputs.items()}
-            
-            tgt_id = self.tokenizer.convert_tokens_to_ids(tgt_code)
-            
-            with torch.inference_mode():
-                generated_tokens = model.generate(
-                    **inputs,
-                    forced_bos_token_id=tgt_id,
-                    max_length=128,
-                    num_beams=1,
-                    do_sample=False
-                )
-            return self.tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)[0]
+            # Identical texts in one batch are generated once
+            unique_texts = list(dict.fromkeys(texts))
+
+            # 5. Fix ModelManager behavior (Load once, fail fast); pinned so it is not evicted mid-batch
+            with model_manager.use("mt_model", self.load_model) as model:
+                self.tokenizer.src_lang = src_code
+                inputs = self.tokenizer(unique_texts, return_tensors="pt", padding=True)
+                
+                if device_manager.is_cuda():
+                    inputs = {k: v.to("cuda") for k, v in inputs.items()}
+                
+                tgt_id = self.tokenizer.convert_tokens_to_ids(tgt_code)
+                
+                with torch.inference_mode():
+                    generated_tokens = model.generate(
+                        **inputs,
+                        forced_bos_token_id=tgt_id,
+                        do_sample=False,
+                        **self.generation_params
+                    )
+            translations = dict(zip(unique_texts, self.tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)))
+            return [translations[text] for text in texts]
         except Exception as e:
             logger.error(f"Translation Error: {e}")
             raise e  # Fail fast
@@ -1,77 +1,252 @@
+import time
 import logging
 import base64
-import io
-import asyncio
-import soundfile as sf
-from typing import Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple, AsyncIterator
 
 from pipeline.stt_engine import stt_engine
 from pipeline.mt_engine import mt_engine
+from pipeline.streaming import StreamingSession
 from tts_engine.engine import TTSEngine
-from core.audio import convert_webm_to_wav
+from core.audio import convert_webm_to_wav, float_to_pcm16, encode_audio
+from core.model_manager import model_manager
+from core.executors import stage_executors, StageOverloaded, set_torch_threads
+from core.process_pool import InferenceProcessPool, fork_supported
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Stage jobs for the inference workers. Module-level so they pickle by reference;
+# each resolves the engines of whichever process runs it
+def _transcribe_job(audio, lang: str) -> Dict:
+    return stt_engine.transcribe_with_timestamps(audio, lang)
+
+def _translate_job(text: str, src_lang: str, tgt_lang: str) -> str:
+    return mt_engine.translate(text, src_lang, tgt_lang)
+
+def _synthesize_job(text: str, lang: str, gender: str, speaking_rate: float = 1.0) -> Optional[Tuple[int, object]]:
+    wav = orchestrator.tts.synthesize(text, lang, gender, speaking_rate)
+    if wav is None:
+        return None
+    return orchestrator.tts.sample_rate, wav
+
+def _init_inference_worker():
+    # Models were loaded before the fork; this only runs the warm-up inferences in the worker
+    if settings.PRELOAD_WARMUP:
+        orchestrator.preload()
+
 class STSOrchestrator:
     def __init__(self):
         self.tts = TTSEngine()
+        self.preload_state = "pending"
+        self.preload_errors: Dict[str, str] = {}
+        self.preload_time_s = None
+        # ModelManager keys of the preloaded models, which /readyz watches
+        self.preload_keys: List[str] = []
+        # With SERVING_MODE=processes, STT, MT and TTS jobs run in forked worker processes;
+        # until the pool is started (and always in the default "threads" mode) they run inline
+        if settings.SERVING_MODE == "processes" and not fork_supported():
+            raise ValueError("SERVING_MODE=processes needs fork(), which this platform lacks; use SERVING_MODE=threads")
+        self.workers = InferenceProcessPool(
+            settings.INFERENCE_PROCESSES,
+            settings.INFERENCE_PROCESS_TORCH_THREADS,
+            initializer=_init_inference_worker
+        )
+
+    def preload(self):
+        """
+        Loads and warms up the models named in the PRELOAD_* settings, in parallel.
+        Blocking; runs in a worker thread at startup. Languages served by the same
+        model are warmed up in one task, so no model is ever loaded twice.
+        With SERVING_MODE=processes, the loaded weights are then moved to shared memory
+        and the inference workers are forked, so they all map the same weights.
+        """
+        tasks = {}
+        stt_langs = {}
+        for lang in settings.PRELOAD_STT_LANGS:
+            stt_langs.setdefault("stt_en" if lang == "en" else "stt_indic", []).append(lang)
+        for key, langs in stt_langs.items():
+            tasks[key] = lambda langs=langs: [stt_engine.warmup(lang) for lang in langs]
+        if settings.PRELOAD_MT_PAIRS:
+            tasks["mt_model"] = lambda: mt_engine.warmup(settings.PRELOAD_MT_PAIRS)
+        for lang in settings.PRELOAD_TTS_LANGS:
+            tasks[f"tts_{lang}"] = lambda lang=lang: self.tts.warmup(lang)
+
+        self.preload_keys = list(tasks)
+        self.preload_state = "running"
+        start = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=max(1, settings.PRELOAD_WORKERS),
+            thread_name_prefix="preload",
+            initializer=set_torch_threads,
+            initargs=(0,)
+        ) as pool:
+            futures = {name: pool.submit(task) for name, task in tasks.items()}
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Preload of {name} failed: {e}")
+                    self.preload_errors[name] = str(e)
+
+        if settings.SERVING_MODE == "processes" and not self.workers.started:
+            try:
+                if settings.INFERENCE_SHARE_MEMORY:
+                    self.workers.shared_bytes = model_manager.share_memory()
+                    logger.info(f"Moved {self.workers.shared_bytes / 2**20:.0f} MiB of model weights to shared memory")
+                self.workers.start()
+            except Exception as e:
+                logger.error(f"Starting the inference workers failed: {e}")
+                self.preload_errors["inference_workers"] = str(e)
+        self.preload_time_s = round(time.perf_counter() - start, 2)
+        self.preload_state = "done"
+        logger.info(f"Preload finished in {self.preload_time_s}s ({len(tasks)} models, {len(self.preload_errors)} failed)")
+
+    def get_health(self) -> Dict:
+        return {
+            "preload": {
+                "state": self.preload_state,
+                "time_s": self.preload_time_s,
+                "errors": self.preload_errors
+            },
+            "models": model_manager.get_status(),
+            "serving_mode": settings.SERVING_MODE
+        }
+
+    def is_ready(self) -> bool:
+        """
+        True once preloading has finished and no preloaded model is currently in the
+        "failed" state. A model whose preload failed counts again as soon as a later
+        load of it succeeds; evicted models reload on demand and still count.
+        """
+        if self.preload_state != "done" or "inference_workers" in self.preload_errors:
+            return False
+        status = model_manager.get_status()
+        return all(key in status and status[key]["state"] != "failed" for key in self.preload_keys)
 
     async def process_speech(self, audio_bytes: bytes, src_lang: str, tgt_lang: Optional[str] = None):
         """
         Full pipeline: Audio -> STT -> Translate -> TTS
-        Returns: { "text": ..., "translated_text": ..., "audio": ... }
-        Non-blocking execution.
+        Returns: { "text": ..., "translated_text": ..., "segments": [{"start", "end", "text"}] }
+        Non-blocking execution: each step runs on its stage's executor.
+        Raises StageOverloaded when a stage's queue is full.
         """
         try:
             # 1. Convert Audio (CPU bound)
-            wav_data = await asyncio.to_thread(convert_webm_to_wav, audio_bytes, settings.SAMPLE_RATE)
+            wav_data = await stage_executors["audio"].run(convert_webm_to_wav, audio_bytes, settings.SAMPLE_RATE)
             if len(wav_data) == 0:
                 return {"error": "Empty or invalid audio data extracted."}
 
             # 2. STT (GPU/CPU bound)
-            transcribed_text = await asyncio.to_thread(stt_engine.transcribe, wav_data, src_lang)
+            transcription = await stage_executors["stt"].run(self.workers.call, _transcribe_job, wav_data, src_lang)
+            transcribed_text = transcription["text"]
             logger.info(f"STT Output: {transcribed_text}")
             
             result = {
                 "text": transcribed_text,
-                "translated_text": ""
+                "translated_text": "",
+                "segments": transcription["segments"]
             }
             
             # 3. Translation (GPU/CPU bound)
             if tgt_lang and tgt_lang != src_lang and transcribed_text:
-                translated_text = await asyncio.to_thread(mt_engine.translate, transcribed_text, src_lang, tgt_lang)
+                translated_text = await stage_executors["mt"].run(self.workers.call, _translate_job, transcribed_text, src_lang, tgt_lang)
                 result["translated_text"] = translated_text
                 logger.info(f"MT Output: {translated_text}")
             
             return result
+        except StageOverloaded:
+            raise
         except Exception as e:
             logger.exception("Error in process_speech")
             return {"error": f"Processing failed: {str(e)}"}
 
-    async def generate_tts(self, text: str, lang: str, gender: str) -> Optional[str]:
+    def open_stream(self, src_lang: str, tgt_lang: Optional[str] = None) -> StreamingSession:
+        """
+        Starts an incremental transcription session (one per WebSocket connection).
+        Raises StageOverloaded when the STT queue is full; once open, a session's
+        work is always admitted so it never loses audio halfway through.
+        """
+        stage_executors["stt"].check_capacity()
+        return StreamingSession(src_lang, tgt_lang)
+
+    async def generate_tts_audio(self, text: str, lang: str, gender: str, media_type: str, speaking_rate: float = 1.0) -> Optional[Tuple[int, list]]:
         """
-        Returns base64 encoded WAV
+        Returns the sample rate and the speech as bytes-like chunks encoded as
+        `media_type` (one of core.audio.AUDIO_MEDIA_TYPES), or None on failure.
+        `speaking_rate` scales the speed of the speaker's configured prosody.
+        Raises StageOverloaded when the TTS queue is full.
         """
         try:
             # TTS Synthesis (GPU/CPU bound)
-            audio_arr = await asyncio.to_thread(self.tts.synthesize, text, lang, gender)
-            if audio_arr is None:
+            result = await stage_executors["tts"].run(self.workers.call, _synthesize_job, text, lang, gender, speaking_rate)
+            if result is None:
                 return None
-                
-            # Encoding (I/O bound-ish)
-            def _encode_audio(arr):
-                byte_io = io.BytesIO()
-                sf.write(byte_io, arr, 16000, format='WAV')
-                byte_io.seek(0)
-                return base64.b64encode(byte_io.read()).decode('utf-8')
-            
-            return await asyncio.to_thread(_encode_audio, audio_arr)
-        except Exception as e:
-            logger.exception("Error in generate_tts")
+
+            sample_rate, audio_arr = result
+            chunks = await stage_executors["audio"].run(encode_audio, audio_arr, sample_rate, media_type, check_depth=False)
+            return sample_rate, chunks
+        except StageOverloaded:
+            raise
+        except Exception:
+            logger.exception("Error in generate_tts_audio")
+            return None
+
+    async def generate_tts(self, text: str, lang: str, gender: str, speaking_rate: float = 1.0) -> Optional[str]:
+        """
+        Returns base64 encoded WAV (compatibility mode of /tts)
+        """
+        result = await self.generate_tts_audio(text, lang, gender, "audio/wav", speaking_rate)
+        if result is None:
             return None
-        
+        _, chunks = result
+        return base64.b64encode(b"".join(chunks)).decode('utf-8')
+
+    async def stream_tts(self, text: str, lang: str, gender: str, speaking_rate: float = 1.0) -> Tuple[int, AsyncIterator[bytes]]:
+        """
+        Starts sentence-by-sentence synthesis.
+        Returns the sample rate and an async iterator of 16-bit mono PCM chunks.
+        The first sentence is synthesized before returning, so load and synthesis
+        errors raise here rather than in the middle of a response. Admission to
+        the TTS queue is checked once, here; the rest of the stream is never rejected.
+        """
+        tts_stage = stage_executors["tts"]
+        await tts_stage.run(self.tts.load_language, lang)
+        chunks = self.tts.synthesize_stream(text, lang, gender, speaking_rate)
+        try:
+            first = await tts_stage.run(next, chunks, None, check_depth=False)
+        except Exception:
+            # Closing runs the generator's cleanup, which unpins the language's model
+            await tts_stage.run(chunks.close, check_depth=False)
+            raise
+
+        async def _pcm_chunks():
+            chunk = first
+            try:
+                while chunk is not None:
+                    yield float_to_pcm16(chunk)
+                    chunk = await tts_stage.run(next, chunks, None, check_depth=False)
+            except Exception:
+                logger.exception("Error in stream_tts")
+            finally:
+                # Also reached when the client disconnects and the response closes this iterator early
+                await tts_stage.run(chunks.close, check_depth=False)
+
+        return self.tts.sample_rate, _pcm_chunks()
+
     def get_tts_langs(self):
         return self.tts.get_supported_languages()
 
+    def get_metrics(self) -> Dict:
+        return {
+            "stt_batching": stt_engine.batcher.stats(),
+            "mt_batching": mt_engine.batcher.stats(),
+            "mt_cache": mt_engine.cache.stats() if mt_engine.cache else None,
+            "mt_load": mt_engine.load_stats,
+            "tts_cache": self.tts.cache_stats(),
+            "models": model_manager.stats(),
+            "executors": {name: executor.stats() for name, executor in stage_executors.items()},
+            "inference_workers": self.workers.stats()
+        }
+
 orchestrator = STSOrchestrator()
@@ -0,0 +1,126 @@
+import logging
+import math
+from typing import Optional, List, Dict
+
+from pipeline.stt_engine import stt_engine
+from pipeline.mt_engine import mt_engine
+from core.audio import StreamingDecoder, AudioRingBuffer, EnergyVAD
+from core.executors import stage_executors
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class StreamingSession:
+    """
+    Incremental transcription state for one WebSocket connection.
+    Compressed chunks go through a single long-lived decoder into a ring buffer;
+    a VAD bounds utterances and only the open utterance is ever sent to STT,
+    so work per spoken second stays flat however long the stream runs.
+    """
+    def __init__(self, src_lang: str, tgt_lang: Optional[str] = None):
+        self.src_lang = src_lang
+        self.tgt_lang = tgt_lang or None
+        self.sr = settings.SAMPLE_RATE
+
+        self.decoder = StreamingDecoder(self.sr)
+        self.ring = AudioRingBuffer(int(settings.STREAM_BUFFER_S * self.sr))
+        self.vad = EnergyVAD(self.sr, settings.STREAM_FRAME_MS)
+        self.frame_size = self.vad.frame_size
+
+        self.end_silence_frames = math.ceil(settings.STREAM_END_SILENCE_MS / settings.STREAM_FRAME_MS)
+        self.pre_roll = int(settings.STREAM_PRE_ROLL_MS * self.sr / 1000)
+        self.max_segment = int(settings.STREAM_MAX_SEGMENT_S * self.sr)
+        self.partial_interval = int(settings.STREAM_PARTIAL_INTERVAL_S * self.sr)
+
+        self.vad_pos = 0              # absolute index of the next sample the VAD has not seen
+        self.segment_start = None     # absolute start of the open utterance
+        self.committed_pos = 0        # end of the last finalized utterance
+        self.last_speech_end = 0
+        self.silence_frames = 0
+        self.last_partial_pos = 0
+        self.closed = False
+
+    async def feed(self, chunk: bytes) -> List[Dict]:
+        """Pushes one compressed chunk; returns partial/final events for audio decoded so far."""
+        # The session was admitted when it opened, so its chunks are never rejected
+        await stage_executors["audio"].run(self.decoder.write, chunk, check_depth=False)
+        return await stage_executors["stt"].run(self._process, self.decoder.read(), False, check_depth=False)
+
+    async def close(self) -> List[Dict]:
+        """Flushes the decoder and finalizes the open utterance."""
+        if self.closed:
+            return []
+        self.closed = True
+        samples = await stage_executors["audio"].run(self.decoder.close, check_depth=False)
+        return await stage_executors["stt"].run(self._process, samples, True, check_depth=False)
+
+    def abort(self):
+        if not self.closed:
+            self.closed = True
+            self.decoder.kill()
+
+    def _process(self, samples, flush: bool) -> List[Dict]:
+        self.ring.append(samples)
+        events = []
+
+        n_frames = (self.ring.total - self.vad_pos) // self.frame_size
+        if n_frames:
+            flags = self.vad.is_speech(self.ring.read(self.vad_pos, self.vad_pos + n_frames * self.frame_size))
+            for i, is_speech in enumerate(flags):
+                frame_start = self.vad_pos + i * self.frame_size
+                frame_end = frame_start + self.frame_size
+                if is_speech:
+                    if self.segment_start is None:
+                        self.segment_start = max(self.ring.start, self.committed_pos, frame_start - self.pre_roll)
+                        self.last_partial_pos = frame_start
+                    self.silence_frames = 0
+                    self.last_speech_end = frame_end
+                elif self.segment_start is not None:
+                    self.silence_frames += 1
+                    if self.silence_frames >= self.end_silence_frames:
+                        events.extend(self._finalize(self.last_speech_end))
+                        continue
+
+                if self.segment_start is not None and frame_end - self.segment_start >= self.max_segment:
+                    events.extend(self._finalize(frame_end))
+            self.vad_pos += n_frames * self.frame_size
+
+        if self.segment_start is not None:
+            if flush:
+                events.extend(self._finalize(self.ring.total))
+            elif self.vad_pos - self.last_partial_pos >= self.partial_interval:
+                self.last_partial_pos = self.vad_pos
+                text = self._transcribe(self.segment_start, self.vad_pos)
+                if text:
+                    events.append({"type": "partial", "text": text})
+        return events
+
+    def _finalize(self, end: int) -> List[Dict]:
+        start = self.segment_start
+        self.segment_start = None
+        self.silence_frames = 0
+        self.committed_pos = end
+
+        text = self._transcribe(start, end)
+        if not text:
+            return []
+
+        event = {
+            "type": "final",
+            "text": text,
+            "translated_text": "",
+            "start": round(start / self.sr, 2),
+            "end": round(end / self.sr, 2)
+        }
+        if self.tgt_lang and self.tgt_lang != self.src_lang:
+            try:
+                event["translated_text"] = mt_engine.translate(text, self.src_lang, self.tgt_lang)
+            except Exception as e:
+                logger.error(f"Streaming translation failed: {e}")
+        return [event]
+
+    def _transcribe(self, start: int, end: int) -> str:
+        audio = self.ring.read(start, end)
+        if len(audio) == 0:
+            return ""
+        return stt_engine.transcribe(audio, self.src_lang)
@@ -1,15 +1,31 @@
+import time
 import torch
 import logging
+import numpy as np
+from typing import Dict, List
 from transformers import AutoModel, pipeline
 from config.settings import settings
+from core.audio import split_on_silence
 from core.device_manager import device_manager
 from core.model_manager import model_manager
+from core.batching import MicroBatcher
+from core.executors import set_torch_threads
+from core.quantization import quantization_enabled, quantize_model
 
 logger = logging.getLogger(__name__)
 
 class STTEngine:
     def __init__(self):
         self.device = device_manager.get_device()
+        # Concurrent Whisper requests (and the segments of long uploads) share one forward pass
+        self.batcher = MicroBatcher(
+            "stt",
+            self._transcribe_batch,
+            max_batch_size=settings.STT_BATCH_MAX_SIZE,
+            max_wait_ms=settings.STT_BATCH_MAX_WAIT_MS,
+            # Whisper runs on the batcher thread, so that is where the STT torch thread cap applies
+            initializer=lambda: set_torch_threads(settings.STT_TORCH_THREADS)
+        )
         
     def load_indic_model(self):
         logger.info(f"Loading Indic STT model from {settings.STT_MODEL_ID}...")
@@ -22,43 +38,95 @@ class STTEngine:
     def load_english_model(self):
         logger.info(f"Loading English STT model...")
         device_id = 0 if device_manager.is_cuda() else -1
-        return pipeline("automatic-speech-recognition", model=settings.STT_EN_MODEL_ID, device=device_id)
+        asr = pipeline("automatic-speech-recognition", model=settings.STT_EN_MODEL_ID, device=device_id)
+        if quantization_enabled("stt"):
+            # Keyed on the hub revision, so an updated model is quantized again
+            source_id = f"{settings.STT_EN_MODEL_ID}@{getattr(asr.model.config, '_commit_hash', None)}"
+            quantize_model(asr.model, "stt_en", source_id)
+        return asr
+
+    def warmup(self, lang: str):
+        """
+        Loads the model serving `lang` (raising on failure) and, with PRELOAD_WARMUP,
+        transcribes one second of silence to trigger allocator and kernel warm-up.
+        """
+        if lang == "en":
+            key = "stt_en"
+            model_manager.load_model(key, self.load_english_model)
+        else:
+            key = "stt_indic"
+            model_manager.load_model(key, self.load_indic_model)
+
+        if settings.PRELOAD_WARMUP:
+            start = time.perf_counter()
+            self.transcribe(np.zeros(settings.SAMPLE_RATE, dtype=np.float32), lang)
+            model_manager.record_warmup(key, time.perf_counter() - start)
 
     def transcribe(self, audio_data: torch.Tensor, lang: str) -> str:
+        return self.transcribe_with_timestamps(audio_data, lang)["text"]
+
+    def transcribe_with_timestamps(self, audio_data, lang: str) -> Dict:
         """
-        audio_data: Tensor of shape (1, samples) or numpy array?
-        Indic model expects tensor. Whisper expects numpy.
+        audio_data: Tensor of shape (1, samples) or numpy array of 16 kHz samples.
+        Returns {"text": ..., "segments": [{"start": s, "end": s, "text": ...}]}.
+        Clips longer than STT_LONG_FORM_MIN_S are split at pauses into segments of at most
+        STT_SEGMENT_MAX_S (Whisper only sees 30 s), so memory stays bounded by the segment
+        length rather than the recording's.
         """
+        if isinstance(audio_data, torch.Tensor):
+            audio_data = audio_data.cpu().numpy()
+        audio = np.asarray(audio_data, dtype=np.float32).reshape(-1)
+        sample_rate = settings.SAMPLE_RATE
         try:
-            if lang == "en":
-                model = model_manager.load_model("stt_en", self.load_english_model)
-                # Ensure input is numpy for pipeline
-                if isinstance(audio_data, torch.Tensor):
-                    audio_numpy = audio_data.cpu().numpy().squeeze()
-                else:
-                    audio_numpy = audio_data
-                
-                res = model(audio_numpy)
-                return res["text"].strip()
+            if len(audio) > settings.STT_LONG_FORM_MIN_S * sample_rate:
+                bounds = split_on_silence(
+                    audio, sample_rate, settings.STT_SEGMENT_MAX_S, settings.STT_SEGMENT_MIN_SILENCE_MS
+                )
             else:
-                model = model_manager.load_model("stt_indic", self.load_indic_model)
-                
-                # Ensure input is tensor
-                if not isinstance(audio_data, torch.Tensor):
-                     audio_data = torch.from_numpy(audio_data).float()
-                
-                if audio_data.dim() == 1:
-                    audio_data = audio_data.unsqueeze(0)
-                    
-                if device_manager.is_cuda():
-                    audio_data = audio_data.to("cuda")
-                
-                with torch.inference_mode():
-                    transcription = model(audio_data, lang=lang)
-                
-                return transcription.replace('▁', ' ').strip()
+                bounds = [(0, len(audio))]
+            texts = self._transcribe_clips([audio[start:end] for start, end in bounds], lang)
         except Exception as e:
             logger.error(f"STT Error: {e}")
-            return ""
+            return {"text": "", "segments": []}
+
+        segments = [
+            {"start": round(start / sample_rate, 2), "end": round(end / sample_rate, 2), "text": text}
+            for (start, end), text in zip(bounds, texts) if text
+        ]
+        return {"text": " ".join(segment["text"] for segment in segments), "segments": segments}
+
+    def _transcribe_clips(self, clips: List[np.ndarray], lang: str) -> List[str]:
+        """
+        Whisper clips join the batch of whatever else is waiting for the English model.
+        The Indic conformer's forward takes a single clip, so batching it would only
+        serialize requests; its clips are decoded right here, on the calling stage
+        worker, so up to STT_WORKERS of them run at once whatever their language.
+        """
+        if lang == "en":
+            futures = [self.batcher.submit("stt_en", clip) for clip in clips]
+            return [future.result() for future in futures]
+
+        # Pinned while in use, so the memory budget cannot evict it mid-request
+        with model_manager.use("stt_indic", self.load_indic_model) as model:
+            return [self._transcribe_indic(model, clip, lang) for clip in clips]
+
+    def _transcribe_batch(self, key, clips: List[np.ndarray]) -> List[str]:
+        """
+        Runs on the batcher thread. Whisper decodes the clips as one padded pipeline batch
+        (its feature extractor pads every clip to the 30 s window).
+        """
+        # Pinned while in use, so the memory budget cannot evict it mid-batch
+        with model_manager.use("stt_en", self.load_english_model) as model:
+            results = model(clips, batch_size=len(clips)) if len(clips) > 1 else [model(clips[0])]
+        return [res["text"].strip() for res in results]
+
+    def _transcribe_indic(self, model, clip: np.ndarray, lang: str) -> str:
+        # Indic model expects a (1, samples) tensor
+        audio_data = torch.from_numpy(clip).float().unsqueeze(0)
+        if device_manager.is_cuda():
+            audio_data = audio_data.to("cuda")
+        with torch.inference_mode():
+            transcription = model(audio_data, lang=lang)
+        return transcription.replace('▁', ' ').strip()
 
 stt_engine = STTEngine()
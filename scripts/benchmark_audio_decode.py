@@ -0,0 +1,135 @@
+import sys
+import os
+import time
+import argparse
+import logging
+import tempfile
+import subprocess
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import soundfile as sf
+import imageio_ffmpeg
+
+from core.audio import convert_webm_to_wav, inject_ffmpeg_path, probe_file
+
+logger = logging.getLogger(__name__)
+
+def convert_webm_to_wav_tempfile(webm_bytes: bytes, sample_rate: int = 16000, retries=2) -> np.ndarray:
+    """
+    The decode path the pipeline used before convert_webm_to_wav: write the upload
+    to a temp file, probe it, convert it to a WAV file and read that back.
+    """
+    if not webm_bytes or len(webm_bytes) < 100:
+        logger.error("Received bytes too small to be valid audio")
+        return np.array([])
+        
+    inject_ffmpeg_path()
+    
+    # Write temp file
+    temp_webm_path = None
+    wav_filename = None
+    
+    try:
+        with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as f:
+            f.write(webm_bytes)
+            f.flush()
+            temp_webm_path = f.name
+            
+        wav_filename = temp_webm_path.replace(".webm", ".wav")
+        ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
+        
+        # Verify input
+        try:
+            probe_file(temp_webm_path)
+        except Exception as e:
+            logger.error(f"Input file validation failed: {e}")
+            return np.array([])
+            
+        # Conversion command with explicit pcm_s16le
+        cmd = [
+            ffmpeg_path, "-y", 
+            "-v", "error", 
+            "-i", temp_webm_path, 
+            "-ar", str(sample_rate), 
+            "-ac", "1", 
+            "-c:a", "pcm_s16le", 
+            "-f", "wav", 
+            wav_filename
+        ]
+        
+        for attempt in range(retries):
+            try:
+                subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                break
+            except subprocess.CalledProcessError as e:
+                if attempt == retries - 1:
+                    logger.error(f"FFmpeg failed: {e.stderr.decode() if e.stderr else str(e)}")
+                    raise e
+                time.sleep(0.1)
+
+        # Read back
+        y, sr = sf.read(wav_filename)
+        return y
+        
+    except Exception as e:
+        logger.error(f"Audio conversion failed: {e}")
+        return np.array([])
+        
+    finally:
+        # Cleanup
+        for p in [temp_webm_path, wav_filename]:
+            if p and os.path.exists(p):
+                try:
+                    os.remove(p)
+                except OSError as e:
+                     logger.warning(f"Failed to remove temp file {p}: {e}")
+                except Exception as e:
+                     logger.warning(f"Unexpected error removing temp file {p}: {e}")
+
+def make_test_clip(duration: float) -> bytes:
+    """Synthesizes a WebM/Opus clip like the ones MediaRecorder uploads."""
+    cmd = [
+        imageio_ffmpeg.get_ffmpeg_exe(), "-v", "error",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+        "-ac", "1", "-ar", "48000", "-c:a", "libopus",
+        "-f", "webm", "pipe:1"
+    ]
+    return subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout
+
+def bench(name, fn, data, runs):
+    fn(data)  # warm-up (page cache, ffmpeg binary lookup)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = fn(data)
+        times.append(time.perf_counter() - start)
+    times = np.array(times) * 1000
+    print(f"   {name:<10} mean {times.mean():7.2f} ms | p50 {np.percentile(times, 50):7.2f} ms | p95 {np.percentile(times, 95):7.2f} ms")
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare in-memory vs temp-file WebM decoding")
+    parser.add_argument("--input", help="Path to a .webm file (default: synthesized clips)")
+    parser.add_argument("--durations", default="1,3,6,15", help="Comma separated clip durations in seconds")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, "rb") as f:
+            clips = [(os.path.basename(args.input), f.read())]
+    else:
+        clips = [(f"{d}s sine", make_test_clip(float(d))) for d in args.durations.split(",")]
+
+    for name, data in clips:
+        print(f"--- {name} ({len(data)} bytes) ---")
+        a = bench("pipe", convert_webm_to_wav, data, args.runs)
+        b = bench("tempfile", convert_webm_to_wav_tempfile, data, args.runs)
+        n = min(len(a), len(b))
+        # tempfile path round-trips through 16-bit PCM, so allow one LSB of difference
+        print(f"   samples {len(a)} vs {len(b)} | max abs diff {np.abs(a[:n] - b[:n]).max():.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import sys
+import os
+import gc
+import json
+import time
+import argparse
+import subprocess
+from collections import Counter
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+SENTENCES = [
+    "Hello, how are you?",
+    "The train to Delhi leaves at seven in the morning.",
+    "Please drink plenty of water and rest for two days.",
+    "Our school library is open on weekends as well.",
+    "The farmers are waiting for the monsoon rains this year.",
+    "Can you tell me the way to the nearest hospital?",
+    "The price of onions has gone up again this week.",
+    "She has been learning to play the sitar since childhood."
+]
+
+def chrf(hypothesis: str, reference: str, max_n: int = 6, beta: float = 2.0) -> float:
+    """Character n-gram F-score (chrF), 0-100."""
+    hypothesis, reference = hypothesis.replace(" ", ""), reference.replace(" ", "")
+    precisions, recalls = [], []
+    for n in range(1, max_n + 1):
+        hyp = Counter(hypothesis[i : i + n] for i in range(len(hypothesis) - n + 1))
+        ref = Counter(reference[i : i + n] for i in range(len(reference) - n + 1))
+        if not hyp or not ref:
+            continue
+        overlap = sum((hyp & ref).values())
+        precisions.append(overlap / sum(hyp.values()))
+        recalls.append(overlap / sum(ref.values()))
+    if not precisions:
+        return 100.0 if hypothesis == reference else 0.0
+    p, r = sum(precisions) / len(precisions), sum(recalls) / len(recalls)
+    return 100 * (1 + beta**2) * p * r / (beta**2 * p + r) if p + r else 0.0
+
+def run_child(lang_pair):
+    """Loads the model with the strategy from the environment and reports memory and translations as JSON."""
+    from core.memory import rss_bytes, rss_breakdown, peak_rss_bytes
+    from core.model_manager import model_manager
+    from pipeline.mt_engine import mt_engine, NLLB_LANG_MAP
+
+    baseline = rss_bytes()
+    model_manager.load_model("mt_model", mt_engine.load_model)
+    peak = peak_rss_bytes()
+
+    src, tgt = lang_pair
+    start = time.perf_counter()
+    translations = mt_engine._translate_batch((NLLB_LANG_MAP[src], NLLB_LANG_MAP[tgt]), SENTENCES)
+    translate_s = time.perf_counter() - start
+    gc.collect()
+
+    print(json.dumps({
+        "load": mt_engine.load_stats,
+        "baseline_rss": baseline,
+        "peak_rss": peak,
+        "steady_rss": rss_bytes(),
+        "steady_breakdown": rss_breakdown(),
+        "translate_s": translate_s,
+        "translations": translations
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare NLLB load strategies and weight dtypes: load time, peak and steady RSS, quality")
+    parser.add_argument("--configs", default="eager:float32,low_memory:float32,mmap:float32,mmap:bfloat16", help="Comma separated strategy:dtype pairs; the first is the quality reference")
+    parser.add_argument("--pair", default="en-hi", help="Language pair to translate, e.g. en-hi")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    lang_pair = tuple(args.pair.split("-", 1))
+
+    if args.child:
+        run_child(lang_pair)
+        return
+
+    reference = None
+    for config in args.configs.split(","):
+        strategy, dtype = config.split(":")
+        env = dict(os.environ, MT_LOAD_STRATEGY=strategy, MT_DTYPE=dtype, MT_CACHE_MAX_ENTRIES="0", PRELOAD_MT_PAIRS="")
+        # A fresh process per configuration, so peak RSS is not polluted by the previous one
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--pair", args.pair],
+            env=env, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f"--- {config}: failed ---\n{proc.stderr[-2000:]}")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if reference is None:
+            reference = result["translations"]
+
+        mb = lambda b: b / 2**20
+        breakdown = result["steady_breakdown"]
+        exact = sum(h == r for h, r in zip(result["translations"], reference)) / len(reference)
+        score = sum(chrf(h, r) for h, r in zip(result["translations"], reference)) / len(reference)
+        print(f"--- {config} (loaded as {result['load']['strategy']}) ---")
+        print(f"   load {result['load']['load_time_s']:6.2f} s | peak RSS {mb(result['peak_rss'] - result['baseline_rss']):7.0f} MiB over baseline")
+        print(
+            f"   steady RSS {mb(result['steady_rss'] - result['baseline_rss']):7.0f} MiB over baseline "
+            f"(anon {mb(breakdown.get('RssAnon', 0)):.0f} MiB, file {mb(breakdown.get('RssFile', 0)):.0f} MiB)"
+        )
+        print(f"   translate {len(SENTENCES)} sentences: {result['translate_s']:.2f} s | exact match {exact:.0%} | chrF vs reference {score:.1f}")
+
+if __name__ == "__main__":
+    main()
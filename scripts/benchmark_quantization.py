@@ -0,0 +1,171 @@
+import sys
+import os
+import gc
+import json
+import math
+import time
+import argparse
+import tempfile
+import subprocess
+from collections import Counter
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from benchmark_mt_load import SENTENCES
+
+TTS_TEXTS = [
+    "भारत एक विशाल देश है जहाँ अनेक भाषाएँ बोली जाती हैं।",
+    "कृपया दो दिन आराम करें और खूब पानी पिएं।",
+    "किसान इस साल मानसून की बारिश का इंतज़ार कर रहे हैं।"
+]
+
+def bleu(hypotheses, references, max_n: int = 4) -> float:
+    """Corpus BLEU (0-100) over whitespace tokens, with the standard brevity penalty."""
+    matches, totals = [0] * max_n, [0] * max_n
+    hyp_len = ref_len = 0
+    for hypothesis, reference in zip(hypotheses, references):
+        hyp, ref = hypothesis.split(), reference.split()
+        hyp_len, ref_len = hyp_len + len(hyp), ref_len + len(ref)
+        for n in range(1, max_n + 1):
+            hyp_ngrams = Counter(tuple(hyp[i : i + n]) for i in range(len(hyp) - n + 1))
+            ref_ngrams = Counter(tuple(ref[i : i + n]) for i in range(len(ref) - n + 1))
+            matches[n - 1] += sum((hyp_ngrams & ref_ngrams).values())
+            totals[n - 1] += max(len(hyp) - n + 1, 0)
+    if not hyp_len or min(matches) == 0:
+        return 0.0
+    log_precision = sum(math.log(m / t) for m, t in zip(matches, totals)) / max_n
+    brevity = min(1.0, math.exp(1 - ref_len / hyp_len))
+    return 100 * brevity * math.exp(log_precision)
+
+def wer(hypotheses, references) -> float:
+    """Word error rate over the corpus: word-level edit distance / reference words."""
+    errors = words = 0
+    for hypothesis, reference in zip(hypotheses, references):
+        hyp, ref = hypothesis.lower().split(), reference.lower().split()
+        row = list(range(len(hyp) + 1))
+        for i, ref_word in enumerate(ref, 1):
+            previous, row[0] = row[0], i
+            for j, hyp_word in enumerate(hyp, 1):
+                previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (ref_word != hyp_word))
+        errors += row[-1]
+        words += len(ref)
+    return errors / max(words, 1)
+
+def mel_l1(wav_a: np.ndarray, wav_b: np.ndarray, ap) -> float:
+    """Mean absolute difference of the two log-mel spectrograms, over the frames both have."""
+    mel_a, mel_b = ap.melspectrogram(wav_a), ap.melspectrogram(wav_b)
+    frames = min(mel_a.shape[1], mel_b.shape[1])
+    return float(np.abs(mel_a[:, :frames] - mel_b[:, :frames]).mean())
+
+def run_child(model: str, args):
+    """Loads one model with QUANTIZE_MODELS from the environment, runs it and writes timings and outputs to --out."""
+    import torch
+    from core.memory import rss_bytes, peak_rss_bytes
+    from core.model_manager import model_manager
+
+    baseline = rss_bytes()
+    start = time.perf_counter()
+    if model == "mt":
+        from pipeline.mt_engine import mt_engine, NLLB_LANG_MAP
+        model_manager.load_model("mt_model", mt_engine.load_model)
+        src, tgt = args.pair.split("-", 1)
+        run = lambda: mt_engine._translate_batch((NLLB_LANG_MAP[src], NLLB_LANG_MAP[tgt]), SENTENCES)
+    elif model == "stt":
+        from core.audio import decode_audio_bytes
+        from pipeline.stt_engine import stt_engine
+        model_manager.load_model("stt_en", stt_engine.load_english_model)
+        clips = []
+        for path in args.audio.split(","):
+            with open(path, "rb") as f:
+                clips.append(decode_audio_bytes(f.read()))
+        run = lambda: [stt_engine.transcribe(clip, "en") for clip in clips]
+    else:
+        from tts_engine.engine import TTSEngine
+        engine = TTSEngine()
+        engine.load_language(args.lang)
+        run = lambda: [engine.synthesize(text, args.lang, args.gender) for text in TTS_TEXTS]
+    load_s = time.perf_counter() - start
+    peak = peak_rss_bytes()
+
+    with torch.inference_mode():
+        run()
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            outputs = run()
+        infer_s = (time.perf_counter() - start) / args.repeats
+    gc.collect()
+
+    result = {"load_s": load_s, "infer_s": infer_s, "peak_rss": peak - baseline, "steady_rss": rss_bytes() - baseline}
+    if model == "tts":
+        result["sample_rate"] = engine.sample_rate
+        np.savez(args.out + ".npz", *outputs)
+    else:
+        result["outputs"] = outputs
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare float32 and dynamic int8 models: load time, latency, RSS and output similarity")
+    parser.add_argument("--models", default="mt,stt,tts", help="Comma separated models to compare: mt, stt, tts")
+    parser.add_argument("--pair", default="en-hi", help="MT language pair")
+    parser.add_argument("--audio", default="debug_en.wav", help="Comma separated English audio files for STT")
+    parser.add_argument("--lang", default="hi", help="TTS language")
+    parser.add_argument("--gender", default="female", help="TTS speaker")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs after one warm-up run")
+    parser.add_argument("--child", default="", help=argparse.SUPPRESS)
+    parser.add_argument("--out", default="", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args)
+        return
+
+    # A fresh cache, so the first int8 run pays for quantization and the second reads the cache
+    cache_dir = tempfile.mkdtemp(prefix="quantized-")
+    for model in args.models.split(","):
+        print(f"--- {model} ---")
+        results = {}
+        for mode in ("fp32", "int8 (quantize)", "int8 (cached)"):
+            out = os.path.join(cache_dir, f"{model}-{len(results)}.json")
+            env = dict(
+                os.environ,
+                QUANTIZE_MODELS="" if mode == "fp32" else model,
+                QUANTIZE_CACHE_DIR=cache_dir,
+                MT_CACHE_MAX_ENTRIES="0",
+                TTS_CACHE_MAX_MB="0",
+                TTS_SENTENCE_CACHE_MAX_MB="0"
+            )
+            # A fresh process per run, so RSS is not polluted by the previous one
+            passthrough = ["--pair", args.pair, "--audio", args.audio, "--lang", args.lang, "--gender", args.gender, "--repeats", str(args.repeats)]
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", model, "--out", out] + passthrough,
+                env=env, capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(f"   {mode}: failed\n{proc.stderr[-2000:]}")
+                break
+            with open(out, encoding="utf-8") as f:
+                result = results[mode] = json.load(f)
+            if model == "tts":
+                with np.load(out + ".npz") as archive:
+                    result["outputs"] = [archive[name] for name in archive.files]
+
+            reference = results["fp32"]["outputs"]
+            if model == "mt":
+                similarity = f"BLEU vs fp32 {bleu(result['outputs'], reference):5.1f}"
+            elif model == "stt":
+                similarity = f"WER vs fp32 {wer(result['outputs'], reference):6.1%}"
+            else:
+                from TTS.utils.audio import AudioProcessor
+                ap = AudioProcessor(sample_rate=result["sample_rate"], num_mels=80, fft_size=1024, hop_length=256, win_length=1024, mel_fmin=0, mel_fmax=8000, verbose=False)
+                similarity = f"mel L1 vs fp32 {np.mean([mel_l1(a, b, ap) for a, b in zip(result['outputs'], reference)]):.4f}"
+            print(
+                f"   {mode:<16} load {result['load_s']:6.2f} s | infer {result['infer_s'] * 1000:8.1f} ms | "
+                f"peak RSS {result['peak_rss'] / 2**20:7.0f} MiB | steady RSS {result['steady_rss'] / 2**20:7.0f} MiB | {similarity}"
+            )
+
+if __name__ == "__main__":
+    main()
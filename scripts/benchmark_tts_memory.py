@@ -0,0 +1,84 @@
+import sys
+import os
+import re
+import time
+import argparse
+import tracemalloc
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from TTS.utils.synthesizer import Synthesizer
+
+SAMPLE_SENTENCE = "भारत एक विशाल देश है जहाँ अनेक भाषाएँ बोली जाती हैं। "
+
+def make_paragraph(n_chars: int, sentence: str = SAMPLE_SENTENCE) -> str:
+    return (sentence * (n_chars // len(sentence) + 1))[:n_chars]
+
+def list_path(waveforms, n_chunks):
+    """The old layout: boxed Python floats per sample, then one np.concatenate per paragraph chunk."""
+    per_chunk = -(-len(waveforms) // n_chunks)
+    wav = None
+    for start in range(0, len(waveforms), per_chunk):
+        wavs = []
+        for waveform in waveforms[start : start + per_chunk]:
+            wavs += list(waveform)
+            wavs += [0] * 10000
+        chunk = np.array(wavs)
+        wav = chunk if wav is None else np.concatenate([wav, chunk])
+    return wav
+
+def array_path(waveforms, n_chunks):
+    """The current layout: float32 buffers per paragraph chunk, joined once."""
+    per_chunk = -(-len(waveforms) // n_chunks)
+    chunks = [
+        Synthesizer.join_waveforms(waveforms[start : start + per_chunk])
+        for start in range(0, len(waveforms), per_chunk)
+    ]
+    return np.concatenate(chunks, dtype=np.float32)
+
+def measure(name, fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {name:<8} peak {peak / 2**20:8.1f} MiB | {elapsed * 1000:8.1f} ms | {out.dtype}, {out.nbytes / 2**20:.1f} MiB")
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure peak memory of TTS waveform accumulation")
+    parser.add_argument("--chars", type=int, default=2000, help="Paragraph length in characters")
+    parser.add_argument("--chunks", type=int, default=4, help="Paragraph chunks the text handler splits the input into")
+    parser.add_argument("--sample_rate", type=int, default=22050)
+    parser.add_argument("--chars_per_second", type=float, default=14.0, help="Speaking rate used to size sentences")
+    parser.add_argument("--lang", default="", help="Also run the full TTS engine for this language (needs checkpoints)")
+    args = parser.parse_args()
+
+    paragraph = make_paragraph(args.chars)
+    sentences = [s for s in re.split(r"(?<=[।.?!])\s*", paragraph) if s]
+    rng = np.random.default_rng(0)
+    waveforms = [
+        (rng.standard_normal(int(len(s) / args.chars_per_second * args.sample_rate)) * 0.1).astype(np.float32)
+        for s in sentences
+    ]
+    audio_seconds = sum(len(w) for w in waveforms) / args.sample_rate
+    print(f"--- {len(paragraph)} chars, {len(sentences)} sentences, {audio_seconds:.0f} s of audio ---")
+
+    a = measure("list", list_path, waveforms, args.chunks)
+    b = measure("array", array_path, waveforms, args.chunks)
+    print(f"   samples {len(a)} vs {len(b)} | max abs diff {np.abs(a - b).max():.2e}")
+
+    if args.lang:
+        from tts_engine.engine import TTSEngine
+
+        engine = TTSEngine()
+        engine.load_language(args.lang)
+        print(f"--- TTS engine ({args.lang}) ---")
+        measure("engine", engine.synthesize, paragraph, args.lang)
+
+if __name__ == "__main__":
+    main()
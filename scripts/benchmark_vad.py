@@ -0,0 +1,38 @@
+import sys
+import os
+import time
+import argparse
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from tts_engine.internal.src.postprocessor.vad import VoiceActivityDetection
+from tests.test_vad import legacy_process, speech_like
+
+def bench(fn, clip, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = fn(clip)
+        times.append(time.perf_counter() - start)
+    return out, np.median(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the vectorized VAD of PostProcessor.trim_silence with the old frame loop")
+    parser.add_argument("--durations", default="2,10,30,60", help="Comma separated clip durations in seconds")
+    parser.add_argument("--sample_rate", type=int, default=22050)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for duration in (float(d) for d in args.durations.split(",")):
+        clip = speech_like(duration, args.sample_rate)
+        legacy, legacy_ms = bench(lambda c: legacy_process(VoiceActivityDetection(), c, 40), clip, args.runs)
+        vectorized, vectorized_ms = bench(lambda c: VoiceActivityDetection().process(c, 40), clip, args.runs)
+        identical = legacy.dtype == vectorized.dtype and np.array_equal(legacy, vectorized)
+        print(f"{duration:5.0f} s | frame loop {legacy_ms:9.2f} ms | vectorized {vectorized_ms:7.2f} ms | "
+              f"{legacy_ms / vectorized_ms:6.0f}x | identical {identical}")
+
+if __name__ == "__main__":
+    main()
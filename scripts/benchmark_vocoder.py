@@ -0,0 +1,91 @@
+import sys
+import os
+import time
+import argparse
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import torch
+
+from TTS.config import load_config
+from TTS.utils.synthesizer import Synthesizer
+from TTS.vocoder.configs.hifigan_config import HifiganConfig
+from TTS.vocoder.models import setup_model as setup_vocoder_model
+
+from tts_engine.configs import TTSConfigResolver
+from config.settings import settings
+
+def load_generator(lang: str):
+    """Loads the HiFi-GAN generator for `lang`, or a randomly initialized one when no language is given."""
+    if lang:
+        hifigan_dir = os.path.join(settings.TTS_CHECKPOINTS_DIR, lang, "hifigan")
+        config = load_config(TTSConfigResolver.ensure_resolved_config(os.path.join(hifigan_dir, "config.json")))
+        model = setup_vocoder_model(config)
+        model.load_checkpoint(config, os.path.join(hifigan_dir, "best_model.pth"), eval=True)
+    else:
+        config = HifiganConfig()
+        model = setup_vocoder_model(config)
+        model.model_g.remove_weight_norm()
+        model.eval()
+    return model.model_g, config.audio["num_mels"], config.audio["hop_length"], config.audio["sample_rate"]
+
+def vocode(generator, mels, hop_length, batch_size, max_padding):
+    """Vocodes `mels` in padded batches of similar length the way Synthesizer._vocode_batch does."""
+    pad = generator.inference_padding
+    wavs = [None] * len(mels)
+    for chunk in Synthesizer._length_buckets([mel.shape[1] for mel in mels], batch_size, max_padding):
+        lengths = [mels[idx].shape[1] for idx in chunk]
+        batch = torch.zeros(len(chunk), mels[chunk[0]].shape[0], max(lengths))
+        for i, idx in enumerate(chunk):
+            batch[i, :, : lengths[i]] = mels[idx]
+        outputs = generator.inference(batch, lengths=lengths)
+        for i, idx in enumerate(chunk):
+            wavs[idx] = outputs[i, 0, pad * hop_length : (pad + lengths[i]) * hop_length]
+    return wavs
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure HiFi-GAN throughput at different batch sizes on CPU")
+    parser.add_argument("--lang", default="", help="Language checkpoint to load (default: random weights)")
+    parser.add_argument("--batch_sizes", default="1,4,8,16", help="Comma separated batch sizes")
+    parser.add_argument("--sentences", type=int, default=16, help="Number of spectrograms per run")
+    parser.add_argument("--min_frames", type=int, default=80)
+    parser.add_argument("--max_frames", type=int, default=400)
+    parser.add_argument("--max_padding", type=float, default=0.1, help="Maximum relative padding within a batch")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (default: torch's choice)")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    generator, num_mels, hop_length, sample_rate = load_generator(args.lang)
+    rng = np.random.default_rng(0)
+    # Sentence-sized spectrograms of mixed lengths, like the sentences of a paragraph
+    mels = [
+        torch.from_numpy(rng.standard_normal((num_mels, n), dtype=np.float32))
+        for n in rng.integers(args.min_frames, args.max_frames + 1, args.sentences)
+    ]
+    audio_seconds = sum(mel.shape[1] for mel in mels) * hop_length / sample_rate
+    print(f"{len(mels)} spectrograms, {audio_seconds:.1f} s of audio per run, {torch.get_num_threads()} threads")
+
+    reference = None
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        vocode(generator, mels[:batch_size], hop_length, batch_size, args.max_padding)  # warm-up
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            wavs = vocode(generator, mels, hop_length, batch_size, args.max_padding)
+            times.append(time.perf_counter() - start)
+        best = min(times)
+        if reference is None:
+            reference = wavs
+        diff = max((a - b).abs().max().item() for a, b in zip(wavs, reference))
+        print(
+            f"   batch {batch_size:>2}: {audio_seconds / best:7.2f} audio-s/s | best {best:6.2f} s "
+            f"| mean {np.mean(times):6.2f} s | max diff vs first {diff:.1e}"
+        )
+
+if __name__ == "__main__":
+    main()
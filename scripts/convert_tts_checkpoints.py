@@ -0,0 +1,99 @@
+import sys
+import os
+import time
+import argparse
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import torch
+from safetensors.torch import save_file
+
+from TTS.utils.io import load_fsspec, load_safetensors
+
+from tts_engine.cache import file_digest
+from config.settings import settings
+
+def inference_state(module: torch.nn.Module):
+    """Contiguous copy of the state dict; tensors shared between keys are stored once each, as safetensors requires."""
+    state = {}
+    seen = set()
+    for name, tensor in module.state_dict().items():
+        tensor = tensor.detach().cpu().contiguous()
+        if tensor.data_ptr() in seen:
+            tensor = tensor.clone()
+        seen.add(tensor.data_ptr())
+        state[name] = tensor
+    return state
+
+def export(module: torch.nn.Module, checkpoint: str, force: bool) -> None:
+    """Writes the eval-ready weights of `module` next to `checkpoint` as model.safetensors."""
+    target = os.path.join(os.path.dirname(checkpoint), "model.safetensors")
+    if not force and os.path.isfile(target) and os.path.getmtime(target) >= os.path.getmtime(checkpoint):
+        print(f"   {target} is up to date")
+        return
+
+    state = inference_state(module)
+    metadata = {
+        "format": "pt",
+        "source": os.path.basename(checkpoint),
+        # The engine keys its audio caches on this, so converting does not invalidate them
+        "source_sha256": file_digest([checkpoint])
+    }
+    tmp_path = target + ".tmp"
+    save_file(state, tmp_path, metadata=metadata)
+    os.replace(tmp_path, target)
+
+    # Round trip: the mapped tensors must equal the exported ones
+    loaded = load_safetensors(target)
+    diff = max((loaded[name].float() - tensor.float()).abs().max().item() for name, tensor in state.items())
+    checkpoint_mb = os.path.getsize(checkpoint) / 2**20
+    target_mb = os.path.getsize(target) / 2**20
+    print(f"   {target}: {checkpoint_mb:.0f} MiB -> {target_mb:.0f} MiB, {len(state)} tensors, max diff {diff:.1e}")
+
+def time_loads(checkpoint: str):
+    target = os.path.join(os.path.dirname(checkpoint), "model.safetensors")
+    start = time.perf_counter()
+    load_fsspec(checkpoint, map_location=torch.device("cpu"))
+    pth_s = time.perf_counter() - start
+    start = time.perf_counter()
+    load_safetensors(target)
+    mmap_s = time.perf_counter() - start
+    print(f"   load {os.path.basename(checkpoint)}: {pth_s * 1000:.0f} ms | model.safetensors (mmap): {mmap_s * 1000:.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Export inference-only safetensors for the TTS checkpoints")
+    parser.add_argument("--checkpoints_dir", default=settings.TTS_CHECKPOINTS_DIR)
+    parser.add_argument("--langs", default="", help="Comma separated languages (default: every language directory)")
+    parser.add_argument("--force", action="store_true", help="Re-export even when model.safetensors is newer than the checkpoint")
+    args = parser.parse_args()
+
+    # Export from the original float checkpoints, never from earlier exports or quantized models
+    settings.TTS_USE_SAFETENSORS = False
+    settings.QUANTIZE_MODELS = []
+    from tts_engine.engine import TTSEngine
+
+    engine = TTSEngine()
+    engine.checkpoint_root = args.checkpoints_dir
+    langs = [l for l in args.langs.split(",") if l] or engine.get_supported_languages()
+    for lang in langs:
+        print(f"--- {lang} ---")
+        try:
+            synthesizer = engine._load_synthesizer(lang)
+        except Exception as e:
+            print(f"   Failed to load {lang}: {e}")
+            continue
+
+        lang_path = os.path.join(args.checkpoints_dir, lang)
+        fastpitch_checkpoint = os.path.join(lang_path, "fastpitch", "best_model.pth")
+        hifigan_checkpoint = os.path.join(lang_path, "hifigan", "best_model.pth")
+        # Loaded with eval=True: the vocoder's weight norm is already folded into its weights
+        generator = getattr(synthesizer.vocoder_model, "model_g", synthesizer.vocoder_model)
+
+        export(synthesizer.tts_model, fastpitch_checkpoint, args.force)
+        export(generator, hifigan_checkpoint, args.force)
+        time_loads(fastpitch_checkpoint)
+        time_loads(hifigan_checkpoint)
+
+if __name__ == "__main__":
+    main()
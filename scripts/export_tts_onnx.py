@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+import argparse
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import torch
+
+from tts_engine.onnx_backend import attach_ort, export_fastpitch, export_hifigan, onnx_paths
+from config.settings import settings
+
+def sample_sentences(synthesizer):
+    """Sentences of growing length from the model's own character set, so any language can be checked."""
+    characters = getattr(getattr(synthesizer.tts_config, "characters", None), "characters", None) or "abcdefghij"
+    return [characters[:n] for n in (8, 24, 48)]
+
+def speaker_name(synthesizer) -> str:
+    speaker_manager = getattr(synthesizer.tts_model, "speaker_manager", None)
+    return next(iter(getattr(speaker_manager, "name_to_id", None) or {}), "")
+
+def timed_synthesis(synthesizer, sentences, speaker):
+    with torch.inference_mode():
+        synthesizer.tts_sentences(sentences, speaker_name=speaker)
+        start = time.perf_counter()
+        waveforms = synthesizer.tts_sentences(sentences, speaker_name=speaker)
+    return waveforms, time.perf_counter() - start
+
+def export(fn, module, path: str):
+    tmp_path = path + ".tmp"
+    fn(module, tmp_path)
+    os.replace(tmp_path, path)
+    print(f"   {path}: {os.path.getsize(path) / 2**20:.0f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Export FastPitch and HiFi-GAN to ONNX for the onnxruntime TTS backend")
+    parser.add_argument("--checkpoints_dir", default=settings.TTS_CHECKPOINTS_DIR)
+    parser.add_argument("--langs", default="", help="Comma separated languages (default: every language directory)")
+    args = parser.parse_args()
+
+    # Export the float torch models
+    settings.TTS_BACKEND = "torch"
+    settings.QUANTIZE_MODELS = []
+    from tts_engine.engine import TTSEngine
+
+    engine = TTSEngine()
+    engine.checkpoint_root = args.checkpoints_dir
+    langs = [l for l in args.langs.split(",") if l] or engine.get_supported_languages()
+    for lang in langs:
+        print(f"--- {lang} ---")
+        try:
+            synthesizer = engine._load_synthesizer(lang)
+        except Exception as e:
+            print(f"   Failed to load {lang}: {e}")
+            continue
+
+        fastpitch_path, hifigan_path = onnx_paths(os.path.join(args.checkpoints_dir, lang))
+        # Loaded with eval=True: the vocoder's weight norm is already folded into its weights
+        generator = getattr(synthesizer.vocoder_model, "model_g", synthesizer.vocoder_model)
+        export(export_fastpitch, synthesizer.tts_model, fastpitch_path)
+        export(export_hifigan, generator, hifigan_path)
+
+        # Parity: the same sentences through torch and through the exported graphs
+        sentences = sample_sentences(synthesizer)
+        speaker = speaker_name(synthesizer)
+        reference, torch_s = timed_synthesis(synthesizer, sentences, speaker)
+        attach_ort(synthesizer, fastpitch_path, hifigan_path)
+        outputs, ort_s = timed_synthesis(synthesizer, sentences, speaker)
+        diff = max(np.abs(a - b).max() if len(a) == len(b) else np.inf for a, b in zip(reference, outputs))
+        print(f"   torch {torch_s * 1000:.0f} ms | onnxruntime {ort_s * 1000:.0f} ms | max waveform diff {diff:.1e}")
+
+if __name__ == "__main__":
+    main()
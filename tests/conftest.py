@@ -0,0 +1,81 @@
+import sys
+import os
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import math
+
+import pytest
+import torch
+
+# Speakers of the random FastPitch, as in the Indic-TTS checkpoints
+SPEAKERS = {"male": 0, "female": 1}
+# Mean frames per token of the random FastPitch; an untrained duration predictor gives 1
+MEAN_DURATION = 7
+
+@pytest.fixture
+def fastpitch():
+    """A small randomly initialised two-speaker FastPitch over lowercase ASCII text, in eval mode."""
+    pytest.importorskip("TTS")
+    from TTS.tts.configs.fast_pitch_config import FastPitchConfig
+    from TTS.tts.configs.shared_configs import CharactersConfig
+    from TTS.tts.models.forward_tts import ForwardTTS
+    from TTS.tts.utils.speakers import SpeakerManager
+    from TTS.tts.utils.text.tokenizer import TTSTokenizer
+    from TTS.utils.audio import AudioProcessor
+
+    torch.manual_seed(0)
+    config = FastPitchConfig(
+        use_phonemes=False,
+        text_cleaner="basic_cleaners",
+        use_speaker_embedding=True,
+        characters=CharactersConfig(
+            characters_class="TTS.tts.models.vits.VitsCharacters",
+            pad="_", eos="", bos="", blank="",
+            characters="abcdefghijklmnopqrstuvwxyz ", punctuations=".,!?", phonemes=None
+        )
+    )
+    config.model_args.use_speaker_embedding = True
+    speaker_manager = SpeakerManager()
+    speaker_manager.name_to_id = dict(SPEAKERS)
+    tokenizer, config = TTSTokenizer.init_from_config(config)
+    model = ForwardTTS(config, AudioProcessor.init_from_config(config), tokenizer, speaker_manager).eval()
+    # Spread the predicted log durations around log(8) so tokens span 6-12 frames and length scales show
+    with torch.no_grad():
+        model.duration_predictor.proj.weight.mul_(5)
+        model.duration_predictor.proj.bias.fill_(math.log(MEAN_DURATION + 1))
+    return model
+
+@pytest.fixture
+def hifigan():
+    """A small randomly initialised HiFi-GAN generator (hop length 256) with weight norm removed, in eval mode."""
+    pytest.importorskip("TTS")
+    from TTS.vocoder.models.hifigan_generator import HifiganGenerator
+
+    torch.manual_seed(0)
+    generator = HifiganGenerator(
+        80, 1, "1",
+        resblock_dilation_sizes=[[1, 3, 5], [1, 3, 5], [1, 3, 5]],
+        resblock_kernel_sizes=[3, 7, 11],
+        upsample_kernel_sizes=[16, 16, 4, 4],
+        upsample_initial_channel=128,
+        upsample_factors=[8, 8, 2, 2]
+    )
+    generator.remove_weight_norm()
+    return generator.eval()
+
+@pytest.fixture
+def synthesizer(fastpitch, hifigan):
+    """A Synthesizer around the random FastPitch and HiFi-GAN, without any checkpoint on disk."""
+    from TTS.utils.synthesizer import Synthesizer
+
+    synthesizer = Synthesizer()
+    synthesizer.tts_model = fastpitch
+    synthesizer.tts_config = fastpitch.config
+    synthesizer.tts_speakers_file = "speakers.pth"
+    synthesizer.output_sample_rate = fastpitch.ap.sample_rate
+    synthesizer.vocoder_model = hifigan
+    synthesizer.vocoder_ap = fastpitch.ap
+    synthesizer.vocoder_config = {"audio": {"sample_rate": fastpitch.ap.sample_rate}}
+    return synthesizer
@@ -0,0 +1,32 @@
+import sys
+import os
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from core.batching import MicroBatcher
+
+def test_short_result_list_fails_every_caller():
+    batcher = MicroBatcher("test", lambda key, items: items[:-1], max_batch_size=3, max_wait_ms=1000)
+    futures = [batcher.submit("key", i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="2 results for 3 items"):
+            future.result(timeout=5)
+
+def test_cancelled_caller_does_not_affect_the_rest():
+    batcher = MicroBatcher("test", lambda key, items: [item * 2 for item in items], max_batch_size=3, max_wait_ms=1000)
+    futures = [batcher.submit("key", i) for i in range(3)]
+    futures[0].cancel()
+    assert [future.result(timeout=5) for future in futures[1:]] == [2, 4]
+
+def test_stats_count_every_item():
+    batcher = MicroBatcher("test", lambda key, items: items, max_batch_size=4, max_wait_ms=1)
+    futures = [batcher.submit(i % 3, i) for i in range(50)]
+    assert [future.result(timeout=5) for future in futures] == list(range(50))
+    stats = batcher.stats()
+    assert stats["items"] == 50
+    assert sum(size * count for size, count in stats["batch_size_histogram"].items()) == 50
+    assert stats["batches"] == sum(stats["batch_size_histogram"].values())
+    assert stats["queued"] == 0
@@ -0,0 +1,85 @@
+import sys
+import os
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import torch
+
+from config.settings import settings
+from core.model_manager import ModelManager
+
+# Size of one test model: a bias-free 64x64 float32 Linear layer
+MODEL_BYTES = 64 * 64 * 4
+
+def make_model():
+    return torch.nn.Linear(64, 64, bias=False)
+
+def test_concurrent_callers_load_once():
+    manager = ModelManager(budget_bytes=0)
+    callers = 8
+    calls = []
+    barrier = threading.Barrier(callers)
+
+    def loader():
+        calls.append(threading.current_thread().name)
+        # Hold the load open long enough for every caller to arrive while it runs
+        time.sleep(0.2)
+        return make_model()
+
+    def call(_):
+        barrier.wait()
+        return manager.load_model("model", loader)
+
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        models = list(pool.map(call, range(callers)))
+
+    assert len(calls) == 1
+    assert all(model is models[0] for model in models)
+    assert manager.coalesced_loads["model"] == callers - 1
+
+def test_failed_load_is_cached_until_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_LOAD_RETRY_BACKOFF_S", 0.2)
+    manager = ModelManager(budget_bytes=0)
+    calls = []
+
+    def failing_loader():
+        calls.append(1)
+        raise RuntimeError("no checkpoint")
+
+    with pytest.raises(RuntimeError, match="no checkpoint"):
+        manager.load_model("model", failing_loader)
+    # Within the backoff the cached error comes back without running the loader
+    with pytest.raises(RuntimeError, match="no checkpoint"):
+        manager.load_model("model", failing_loader)
+    assert len(calls) == 1
+    assert manager.get_status()["model"]["state"] == "failed"
+
+    time.sleep(0.3)
+    model = manager.load_model("model", make_model)
+    assert isinstance(model, torch.nn.Linear)
+    assert manager.get_status()["model"]["state"] == "loaded"
+    assert "model" not in manager.failures
+
+@pytest.mark.parametrize("policy", ["lru", "lfu"])
+def test_pinned_model_is_never_evicted(policy):
+    # Room for two models, so every further load has to evict one
+    manager = ModelManager(budget_bytes=2 * MODEL_BYTES, policy=policy)
+    pinned = manager.load_model("pinned", make_model)
+
+    with manager.pinned("pinned"):
+        # "pinned" is the least recently and least frequently used resident model throughout
+        for i in range(4):
+            manager.load_model(f"other_{i}", make_model)
+            for _ in range(3):
+                manager.load_model(f"other_{i}", make_model)
+            assert manager.get_model("pinned") is pinned
+            assert manager.resident_bytes() <= 2 * MODEL_BYTES
+
+    assert manager.evictions["pinned"] == 0
+    assert sum(manager.evictions.values()) == 3
@@ -0,0 +1,96 @@
+import sys
+import os
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+import torch
+
+from config.settings import settings
+from tts_engine.onnx_backend import (
+    OrtFastPitch, OrtHifigan, _ExportAttention, attach_ort, export_fastpitch, export_hifigan
+)
+
+# Largest allowed sample difference between the torch and onnxruntime waveforms
+MAX_WAVEFORM_DIFF = 1e-3
+# Largest allowed difference between the torch and onnxruntime outputs of the random models
+MAX_OUTPUT_DIFF = 1e-4
+
+def test_export_attention_matches_multihead_attention():
+    torch.manual_seed(0)
+    attention = torch.nn.MultiheadAttention(32, 2).eval()
+    x = torch.randn(11, 3, 32)
+    key_padding_mask = torch.arange(11)[None, :] >= torch.tensor([11, 7, 4])[:, None]
+    with torch.no_grad():
+        expected, expected_weights = attention(x, x, x, key_padding_mask=key_padding_mask)
+        actual, actual_weights = _ExportAttention(attention)(x, x, x, key_padding_mask=key_padding_mask)
+    assert torch.allclose(actual, expected, atol=1e-6)
+    assert torch.allclose(actual_weights, expected_weights, atol=1e-6)
+
+def test_onnx_parity_random_models(tmp_path, fastpitch, hifigan):
+    pytest.importorskip("onnxruntime")
+    fastpitch_path = str(tmp_path / "fastpitch.onnx")
+    hifigan_path = str(tmp_path / "hifigan.onnx")
+    export_fastpitch(fastpitch, fastpitch_path)
+    export_hifigan(hifigan, hifigan_path)
+
+    # Batch size, text lengths and prosody other than the traced ones, so the dynamic axes are exercised
+    x_lengths = torch.tensor([31, 9, 20])
+    x = torch.randint(1, 27, (3, 31)) * (torch.arange(31)[None, :] < x_lengths[:, None])
+    aux_input = {
+        "x_lengths": x_lengths,
+        "speaker_ids": torch.tensor([1, 0, 1]),
+        "d_vectors": None,
+        "length_scale": torch.tensor([1.0, 1.4, 0.8]),
+        "pitch_shift": torch.tensor([0.0, -0.5, 0.3])
+    }
+    with torch.inference_mode():
+        expected = fastpitch.inference(x, aux_input=aux_input)
+        actual = OrtFastPitch(fastpitch_path)(x, aux_input=aux_input)
+    assert torch.equal(actual["y_lengths"], expected["y_lengths"])
+    for i, frames in enumerate(expected["y_lengths"].long().tolist()):
+        diff = (actual["model_outputs"][i, :frames] - expected["model_outputs"][i, :frames]).abs().max()
+        assert diff < MAX_OUTPUT_DIFF
+
+    lengths = [45, 23, 38]
+    c = torch.randn(3, 80, 45)
+    with torch.inference_mode():
+        expected = hifigan.inference(c, lengths=lengths)
+        actual = OrtHifigan(hifigan_path)(c, lengths=lengths)
+    assert actual.shape == expected.shape
+    assert (actual - expected).abs().max() < MAX_OUTPUT_DIFF
+
+def test_onnx_parity(tmp_path):
+    settings.TTS_BACKEND = "torch"
+    settings.QUANTIZE_MODELS = []
+    from tts_engine.engine import TTSEngine
+
+    tts = TTSEngine()
+    lang = "hi"
+    if lang not in tts.get_supported_languages():
+        pytest.skip(f"No {lang} checkpoint in {tts.checkpoint_root}")
+
+    synthesizer = tts._load_synthesizer(lang)
+    fastpitch_path = str(tmp_path / "fastpitch.onnx")
+    hifigan_path = str(tmp_path / "hifigan.onnx")
+    export_fastpitch(synthesizer.tts_model, fastpitch_path)
+    export_hifigan(getattr(synthesizer.vocoder_model, "model_g", synthesizer.vocoder_model), hifigan_path)
+
+    # Lengths other than the traced ones, batched, so the dynamic axes are exercised too
+    sentences = ["नमस्ते।", "यह एक परीक्षण है।", "भारत एक विशाल देश है जहाँ अनेक भाषाएँ बोली जाती हैं।"]
+    with torch.inference_mode():
+        reference = synthesizer.tts_sentences(sentences, speaker_name="female")
+        attach_ort(synthesizer, fastpitch_path, hifigan_path)
+        outputs = synthesizer.tts_sentences(sentences, speaker_name="female")
+
+    for expected, actual in zip(reference, outputs):
+        assert len(actual) == len(expected)
+        assert np.abs(actual - expected).max() < MAX_WAVEFORM_DIFF
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_onnx_parity(Path(tmp_dir))
@@ -0,0 +1,70 @@
+import sys
+import os
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+import torch
+
+from config.settings import settings
+from tts_engine.configs import TTSConfigResolver
+
+TEXTS = ["hello world.", "how are you today?", "fine, thanks!"]
+
+def run(model, **prosody):
+    ids = [model.tokenizer.text_to_ids(text) for text in TEXTS]
+    x = torch.zeros(len(ids), max(map(len, ids)), dtype=torch.long)
+    for i, seq in enumerate(ids):
+        x[i, :len(seq)] = torch.tensor(seq)
+    aux_input = {"x_lengths": torch.tensor([len(seq) for seq in ids]), "speaker_ids": torch.ones(len(ids), dtype=torch.long)}
+    aux_input.update(prosody)
+    with torch.inference_mode():
+        outputs = model.inference(x, aux_input=aux_input)
+    y_lengths = outputs["y_lengths"].long().tolist()
+    return [outputs["model_outputs"][i, :frames] for i, frames in enumerate(y_lengths)]
+
+def test_length_scale_only_changes_its_item(fastpitch):
+    base = run(fastpitch, length_scale=torch.ones(3))
+    scaled = run(fastpitch, length_scale=torch.tensor([1.0, 1.5, 1.0]))
+    assert len(scaled[1]) > 1.3 * len(base[1])
+    for i in (0, 2):
+        assert torch.equal(scaled[i], base[i])
+
+def test_pitch_shift_only_changes_its_item(fastpitch):
+    base = run(fastpitch, pitch_shift=torch.zeros(3))
+    shifted = run(fastpitch, pitch_shift=torch.tensor([0.0, 0.8, 0.0]))
+    assert len(shifted[1]) == len(base[1])
+    assert (shifted[1] - base[1]).abs().max() > 1e-3
+    for i in (0, 2):
+        assert torch.equal(shifted[i], base[i])
+
+@pytest.mark.parametrize("lang, speaker, length_scale", [
+    ("te", "female", 1.176),
+    ("te", "male", 1.0),
+    ("mr", "female", 0.87),
+    ("mr", "male", 1.0),
+    ("gu", "female", 0.833),
+    ("gu", "male", 0.833),
+    ("hi", "female", 1.0)
+])
+def test_prosody_table(synthesizer, tmp_path, lang, speaker, length_scale):
+    config_path = tmp_path / "config.json"
+    config_path.write_text("{}")
+    synthesizer.prosody = TTSConfigResolver.load_prosody(lang, str(config_path), settings.TTS_PROSODY_FILE)
+    prosody = synthesizer.get_prosody(speaker)
+    assert prosody["length_scale"] == pytest.approx(length_scale)
+    assert prosody["pitch_shift"] == 0.0
+    assert synthesizer.get_prosody(speaker, speaking_rate=2.0)["length_scale"] == pytest.approx(length_scale / 2)
+
+@pytest.mark.parametrize("path", ["/tts", "/tts/stream"])
+@pytest.mark.parametrize("speaking_rate", ["0.4", "2.5"])
+def test_speaking_rate_out_of_range_is_rejected(path, speaking_rate):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from api.routes import router
+
+    app = FastAPI()
+    app.include_router(router)
+    response = TestClient(app).post(path, data={"text": "hello", "lang": "hi", "speaking_rate": speaking_rate})
+    assert response.status_code == 422
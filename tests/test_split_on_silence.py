@@ -0,0 +1,47 @@
+import sys
+import os
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+from core.audio import split_on_silence
+
+SR = 16000
+MAX_SEGMENT_S = 25.0
+
+def speech_like(seconds: float, seed: int = 0) -> np.ndarray:
+    """Noise bursts of 2-6 s separated by 0.6 s of silence."""
+    rng = np.random.default_rng(seed)
+    parts = []
+    while sum(len(p) for p in parts) < seconds * SR:
+        parts.append(0.1 * rng.standard_normal(int(SR * rng.uniform(2, 6))))
+        parts.append(np.zeros(int(SR * 0.6)))
+    return np.concatenate(parts).astype(np.float32)
+
+def syllable_noise(seconds: float, seed: int = 0) -> np.ndarray:
+    """Continuous noise modulated at a syllable rate, with no pause for the VAD to find."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SR)) / SR
+    return (0.1 * rng.standard_normal(len(t)) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t))).astype(np.float32)
+
+def white_noise(seconds: float, seed: int = 0) -> np.ndarray:
+    return (0.1 * np.random.default_rng(seed).standard_normal(int(seconds * SR))).astype(np.float32)
+
+@pytest.mark.parametrize("audio", [speech_like(140), syllable_noise(120), white_noise(70), np.zeros(60 * SR + 7, dtype=np.float32)])
+def test_segments_cover_the_whole_clip(audio):
+    segments = split_on_silence(audio, SR, MAX_SEGMENT_S)
+    assert segments[0][0] == 0
+    assert segments[-1][1] == len(audio)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(segments, segments[1:]))
+    assert all(0 < end - start <= MAX_SEGMENT_S * SR for start, end in segments)
+
+def test_cuts_fall_in_pauses():
+    audio = speech_like(140)
+    for _, end in split_on_silence(audio, SR, MAX_SEGMENT_S)[:-1]:
+        assert not np.any(audio[end - 160:end + 160])
+
+def test_empty_clip():
+    assert split_on_silence(np.zeros(0, dtype=np.float32), SR) == []
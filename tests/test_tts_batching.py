@@ -0,0 +1,75 @@
+import sys
+import os
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import torch
+
+# Largest allowed difference between a padded batch item and the same item run alone
+MAX_MEL_DIFF = 1e-4
+MAX_WAVEFORM_DIFF = 1e-4
+# HiFi-GAN's receptive field reaches past the replicated frames at the end of a padded item, so its last
+# frames differ from running it alone: by up to 1.6e-4 (about five 16-bit steps) on the random generator
+MAX_VOCODER_DIFF = 2e-4
+
+# Mixed lengths, so most items of a batch are padded
+TEXTS = [
+    "hi.",
+    "this is a much longer sentence to test padding in batches.",
+    "hello world. how are you today?",
+    "one more, of middling length!"
+]
+
+def token_ids(model, texts):
+    ids = [model.tokenizer.text_to_ids(text) for text in texts]
+    x = torch.zeros(len(ids), max(map(len, ids)), dtype=torch.long)
+    for i, seq in enumerate(ids):
+        x[i, :len(seq)] = torch.tensor(seq)
+    return x, torch.tensor([len(seq) for seq in ids])
+
+def test_fastpitch_batch_matches_single(fastpitch):
+    x, x_lengths = token_ids(fastpitch, TEXTS)
+    speaker_ids = torch.ones(len(TEXTS), dtype=torch.long)
+    with torch.inference_mode():
+        batch = fastpitch.inference(x, aux_input={"x_lengths": x_lengths, "speaker_ids": speaker_ids})
+        for i, length in enumerate(x_lengths.tolist()):
+            single = fastpitch.inference(x[i:i + 1, :length], aux_input={"x_lengths": x_lengths[i:i + 1], "speaker_ids": speaker_ids[i:i + 1]})
+            frames = int(single["y_lengths"][0])
+            assert int(batch["y_lengths"][i]) == frames
+            # Frames per token, from the hard alignment
+            assert torch.equal(batch["alignments"][i].sum(0)[:length], single["alignments"][0].sum(0))
+            diff = (batch["model_outputs"][i, :frames] - single["model_outputs"][0]).abs().max()
+            assert diff < MAX_MEL_DIFF
+
+def test_tts_batch_matches_tts(synthesizer):
+    with torch.inference_mode():
+        batch = synthesizer.tts_batch(TEXTS, speaker_name="female")
+        singles = [np.asarray(synthesizer.tts(text, speaker_name="female")) for text in TEXTS]
+    for actual, expected in zip(batch, singles):
+        assert len(actual) == len(expected)
+        assert np.abs(actual - expected).max() < MAX_WAVEFORM_DIFF
+
+def test_hifigan_padded_batch_matches_single(hifigan):
+    hop_length = 256
+    pad = hifigan.inference_padding
+    lengths = [60, 47, 33]
+    torch.manual_seed(0)
+    c = torch.randn(len(lengths), 80, max(lengths))
+    batch = hifigan.inference(c, lengths=lengths)
+    for i, length in enumerate(lengths):
+        single = hifigan.inference(c[i:i + 1, :, :length])
+        samples = slice(pad * hop_length, (pad + length) * hop_length)
+        assert (batch[i, :, samples] - single[0, :, samples]).abs().max() < MAX_VOCODER_DIFF
+
+def test_vocode_batch_matches_single(synthesizer):
+    # Within 10% of each other's length, so _vocode_batch pads them into one batch
+    rng = np.random.default_rng(0)
+    mels = [rng.uniform(-4, 4, (frames, 80)).astype(np.float32) for frames in (90, 84, 82, 88)]
+    with torch.inference_mode():
+        batch = synthesizer._vocode_batch(mels)
+        singles = synthesizer._vocode_batch(mels, max_batch_size=1)
+    for mel, actual, expected in zip(mels, batch, singles):
+        assert actual.shape == expected.shape == (1, len(mel) * synthesizer.vocoder_ap.hop_length)
+        assert np.abs(actual - expected).max() < MAX_VOCODER_DIFF
@@ -0,0 +1,59 @@
+import sys
+import os
+
+# Ensure project root is in path ensuring we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+from tts_engine.internal.src.postprocessor.vad import VoiceActivityDetection
+
+FRAME = 160
+
+def legacy_process(vad: VoiceActivityDetection, data, sc_threshold: int) -> np.ndarray:
+    """The frame-by-frame loop process() replaced, built on the unchanged vad()."""
+    buffer = np.append(np.array([], dtype=np.int16), data)
+    out = np.array([], dtype=np.int16)
+    while len(buffer) >= FRAME:
+        window = buffer[:FRAME]
+        buffer = buffer[FRAME:]
+        if vad.vad(window, sc_threshold):
+            out = np.append(out, window)
+    return out
+
+def speech_like(seconds: float, sr: int = 22050, seed: int = 0) -> np.ndarray:
+    """Bursts of noisy tone separated by near-silent pauses of varying length."""
+    rng = np.random.default_rng(seed)
+    parts = []
+    while sum(len(p) for p in parts) < seconds * sr:
+        n = int(sr * rng.uniform(0.2, 1.5))
+        t = np.arange(n) / sr
+        parts.append(0.3 * np.sin(2 * np.pi * rng.uniform(100, 300) * t) + 0.05 * rng.standard_normal(n))
+        parts.append(1e-3 * rng.standard_normal(int(sr * rng.uniform(0.05, 0.8))))
+    return np.concatenate(parts).astype(np.float32)
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64, np.int16])
+def test_matches_frame_loop(dtype):
+    clips = [speech_like(6, seed=seed) for seed in range(3)] + [np.zeros(5000, dtype=np.float32), speech_like(0.005)]
+    vectorized, legacy = VoiceActivityDetection(), VoiceActivityDetection()
+    # One detector across clips, as PostProcessor uses it: threshold and silence run carry over
+    for clip in clips:
+        clip = (clip * 10000).astype(dtype) if dtype == np.int16 else clip.astype(dtype)
+        expected = legacy_process(legacy, clip, sc_threshold=40)
+        actual = vectorized.process(clip, sc_threshold=40)
+        assert actual.dtype == expected.dtype
+        np.testing.assert_array_equal(actual, expected)
+
+def test_add_samples_and_get_frame():
+    vad = VoiceActivityDetection()
+    assert not vad.add_samples(np.arange(100, dtype=np.int16))
+    assert vad.add_samples(np.arange(100, 400, dtype=np.int16))
+    np.testing.assert_array_equal(vad.get_frame(), np.arange(FRAME))
+    np.testing.assert_array_equal(vad.get_frame(), np.arange(FRAME, 2 * FRAME))
+    assert not vad.add_samples([])
+
+if __name__ == "__main__":
+    for dtype in (np.float32, np.float64, np.int16):
+        test_matches_frame_loop(dtype)
+    print("ok")
@@ -0,0 +1,148 @@
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def make_key(*parts) -> str:
+    """Content address for a cache entry: sha256 over the parts, unambiguously separated."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = str(part).encode("utf-8")
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+def file_digest(paths: Iterable[str], chunk_size: int = 1 << 20) -> str:
+    """sha256 over the contents of the given files (missing files are skipped), so retrained checkpoints get new keys."""
+    digest = hashlib.sha256()
+    for path in paths:
+        if not path or not os.path.isfile(path):
+            continue
+        digest.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(chunk_size), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+class AudioCache:
+    """
+    Two-tier cache of synthesized audio.
+    Entries live in an in-memory LRU bounded by `max_bytes`; with `disk_dir` set they are
+    also written as .npy files there and memory-mapped back on a memory miss, so they
+    survive restarts and evictions without a re-synthesis.
+    Cached arrays are read-only, since every caller shares them.
+    """
+    make_key = staticmethod(make_key)
+
+    def __init__(self, name: str, max_bytes: int, disk_dir: Optional[str] = None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+        # Metrics
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            wav = self._entries.get(key)
+            if wav is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return wav
+
+        wav = self._load(key)
+        with self._lock:
+            if wav is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._insert(key, wav)
+        return wav
+
+    def put(self, key: str, wav: np.ndarray) -> np.ndarray:
+        """Stores `wav` and returns the read-only array that is now cached."""
+        wav = np.array(wav, dtype=np.float32)
+        wav.setflags(write=False)
+        with self._lock:
+            self._insert(key, wav)
+        self._save(key, wav)
+        return wav
+
+    def _insert(self, key: str, wav: np.ndarray):
+        if wav.nbytes > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._entries[key] = wav
+        self._bytes += wav.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key + ".npy")
+
+    def _load(self, key: str) -> Optional[np.ndarray]:
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path, mmap_mode="r")
+        except Exception as e:
+            logger.warning(f"{self.name} cache: unreadable entry {path}: {e}")
+            return None
+
+    def _save(self, key: str, wav: np.ndarray):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename, so concurrent readers never map a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, wav)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"{self.name} cache: failed to write {path}: {e}")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes
+            }
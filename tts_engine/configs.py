@@ -85,3 +85,20 @@ class TTSConfigResolver:
         except Exception as e:
             logger.error(f"Error resolving config config {config_path}: {e}")
             return config_path
+
+    @staticmethod
+    def load_prosody(lang: str, config_path: str, table_path: str) -> Dict[str, Dict[str, float]]:
+        """
+        Speaker -> {"length_scale", "pitch_shift"} for `lang`: the entries of the prosody table
+        at `table_path`, updated with the "prosody" mapping of the checkpoint config, if any.
+        """
+        prosody = {}
+        if table_path and os.path.isfile(table_path):
+            with open(table_path, 'r') as f:
+                prosody.update(json.load(f).get(lang, {}))
+        try:
+            with open(config_path, 'r') as f:
+                prosody.update(json.load(f).get("prosody", {}))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading the prosody of {config_path}: {e}")
+        return prosody
@@ -1,17 +1,24 @@
 import os
+import time
+import threading
 import torch
 import logging
 import numpy as np
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterator
 
 # External dependencies (assumed installed in env)
 from TTS.utils.synthesizer import Synthesizer
+from TTS.utils.io import load_safetensors_metadata
 
 # Internal refactored module
 from tts_engine.internal.src.inference import TextToSpeechEngine as InternalTTSEngine
 from tts_engine.configs import TTSConfigResolver
+from tts_engine.cache import AudioCache, file_digest, make_key
+from tts_engine.onnx_backend import attach_ort, onnx_paths
 from config.settings import settings
 from core.device_manager import device_manager
+from core.model_manager import model_manager
+from core.quantization import quantization_enabled, quantize_model
 
 logger = logging.getLogger(__name__)
 
@@ -21,11 +28,57 @@ class TTSEngine:
         self.engine = None
         self.device = device_manager.get_device()
         self.checkpoint_root = settings.TTS_CHECKPOINTS_DIR
+        self.model_ids = {}
+        self._engine_lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+        self.text_cache = self._make_cache("text", settings.TTS_CACHE_MAX_MB)
+        self.sentence_cache = self._make_cache("sentence", settings.TTS_SENTENCE_CACHE_MAX_MB)
+
+    def _reset_after_fork(self):
+        self._engine_lock = threading.Lock()
+
+    @staticmethod
+    def _make_cache(name: str, max_mb: float) -> Optional[AudioCache]:
+        if max_mb <= 0:
+            return None
+        disk_dir = os.path.join(settings.TTS_CACHE_DIR, name) if settings.TTS_CACHE_DIR else None
+        return AudioCache(f"tts_{name}", int(max_mb * 1024 * 1024), disk_dir)
         
     def load_language(self, lang: str):
-        if lang in self.models:
-            return
+        # Loaded through the model manager so load state and time show up in /healthz, and
+        # so the synthesizer counts against the memory budget. Eviction unregisters it here
+        key = f"tts_{lang}"
+        model_manager.register_eviction_callback(key, lambda: self._unregister(lang))
+        synthesizer = model_manager.load_model(key, self._load_synthesizer, lang)
+        
+        # The internal engine (text normaliser, segmenters, post-processor) is built once;
+        # each language is only registered into it, once even when requests race
+        with self._engine_lock:
+            if self.models.get(lang) is synthesizer:
+                return
+            if self.engine is None:
+                self.engine = InternalTTSEngine(
+                    {},
+                    allow_transliteration=False,
+                    enable_denoiser=False,
+                    text_cache=self.text_cache,
+                    sentence_cache=self.sentence_cache,
+                )
+                logger.info(f"Internal engine initialized.")
+            self.engine.add_model(lang, synthesizer, model_id=self.model_ids.get(lang))
+            self.models[lang] = synthesizer
+        logger.info(f"Registered {lang} with the internal engine.")
 
+    def _unregister(self, lang: str):
+        """Drops every reference to the synthesizer of `lang` after the model manager evicted it."""
+        with self._engine_lock:
+            self.models.pop(lang, None)
+            if self.engine is not None:
+                self.engine.remove_model(lang)
+        logger.info(f"Unregistered {lang} from the internal engine.")
+
+    def _load_synthesizer(self, lang: str) -> Synthesizer:
         lang_path = os.path.join(self.checkpoint_root, lang)
         if not os.path.exists(lang_path):
             logger.error(f"Model for language '{lang}' not found at {lang_path}")
@@ -40,22 +93,101 @@ class TTSEngine:
         vocoder_config = os.path.join(lang_path, "hifigan", "config.json")
         resolved_vocoder_config = TTSConfigResolver.ensure_resolved_config(vocoder_config)
 
-        self.models[lang] = Synthesizer(
-            tts_checkpoint=os.path.join(lang_path, "fastpitch", "best_model.pth"),
+        tts_checkpoint = self._checkpoint_path(os.path.join(lang_path, "fastpitch"))
+        speakers_file = os.path.join(lang_path, "fastpitch", "speakers.pth")
+        vocoder_checkpoint = self._checkpoint_path(os.path.join(lang_path, "hifigan"))
+
+        synthesizer = Synthesizer(
+            tts_checkpoint=tts_checkpoint,
             tts_config_path=resolved_tts_config,
-            tts_speakers_file=os.path.join(lang_path, "fastpitch", "speakers.pth"),
+            tts_speakers_file=speakers_file,
             tts_languages_file=None,
-            vocoder_checkpoint=os.path.join(lang_path, "hifigan", "best_model.pth"),
+            vocoder_checkpoint=vocoder_checkpoint,
             vocoder_config=resolved_vocoder_config,
             encoder_checkpoint="",
             encoder_config="",
             use_cuda=device_manager.is_cuda(),
         )
         logger.info(f"Successfully loaded {lang} Synthesizer.")
-        
-        # Re-initialize the internal engine
-        self.engine = InternalTTSEngine(self.models, allow_transliteration=False, enable_denoiser=False)
-        logger.info(f"Internal engine updated.")
+        # Applied inside FastPitch (durations and pitch) rather than by stretching the audio afterwards
+        synthesizer.prosody = TTSConfigResolver.load_prosody(lang, tts_config, settings.TTS_PROSODY_FILE)
+
+        # Cache entries are keyed on the checkpoint contents, so retrained models never hit stale audio
+        self.model_ids[lang] = make_key(
+            *(self._file_id(path) for path in [tts_checkpoint, tts_config, speakers_file, vocoder_checkpoint, vocoder_config])
+        )
+        if settings.TTS_BACKEND == "ort" and self._attach_ort(synthesizer, lang_path, [tts_checkpoint, vocoder_checkpoint]):
+            # onnxruntime output differs from torch in the last bits; keep the audio caches apart
+            self.model_ids[lang] = make_key(self.model_ids[lang], "ort")
+        elif quantization_enabled("tts"):
+            # The encoder and decoder are the bulk of FastPitch's compute; the duration and
+            # pitch predictors stay float, so timing does not shift more than necessary
+            quantize_model(synthesizer.tts_model, f"tts_{lang}", self.model_ids[lang], submodules=("encoder", "decoder"), convs=True)
+            # Quantized audio must not be served from, or stored under, the float model's cache keys
+            self.model_ids[lang] = make_key(self.model_ids[lang], "int8")
+        return synthesizer
+
+    @staticmethod
+    def _attach_ort(synthesizer: Synthesizer, lang_path: str, checkpoints) -> bool:
+        """Switches `synthesizer` to the exported ONNX graphs of `lang_path` if both exist and are newer than the checkpoints."""
+        graphs = onnx_paths(lang_path)
+        if not all(os.path.isfile(path) for path in graphs):
+            logger.warning(f"No ONNX graphs in {lang_path}; run scripts/export_tts_onnx.py. Using torch")
+            return False
+        if min(os.path.getmtime(path) for path in graphs) < max(os.path.getmtime(path) for path in checkpoints):
+            logger.warning(f"The ONNX graphs in {lang_path} are older than the checkpoints; re-run scripts/export_tts_onnx.py. Using torch")
+            return False
+        try:
+            attach_ort(synthesizer, *graphs)
+        except ValueError as e:
+            logger.warning(f"{e}; re-run scripts/export_tts_onnx.py. Using torch")
+            return False
+        logger.info(f"Running {lang_path} through onnxruntime.")
+        return True
+
+    @staticmethod
+    def _checkpoint_path(model_dir: str) -> str:
+        """The model.safetensors export in `model_dir` when enabled and up to date, else best_model.pth."""
+        checkpoint = os.path.join(model_dir, "best_model.pth")
+        exported = os.path.join(model_dir, "model.safetensors")
+        if not settings.TTS_USE_SAFETENSORS or not os.path.isfile(exported):
+            return checkpoint
+        if os.path.isfile(checkpoint) and os.path.getmtime(exported) < os.path.getmtime(checkpoint):
+            logger.warning(f"{exported} is older than {checkpoint}; loading the checkpoint. Re-run scripts/convert_tts_checkpoints.py")
+            return checkpoint
+        return exported
+
+    @staticmethod
+    def _file_id(path: str) -> str:
+        """
+        Content id of a model file. An export carries the digest of the checkpoint it came
+        from, so it keeps that checkpoint's cache keys without reading its own pages.
+        """
+        if path.endswith(".safetensors"):
+            source_digest = load_safetensors_metadata(path).get("source_sha256")
+            if source_digest:
+                return source_digest
+        return file_digest([path])
+
+    def warmup(self, lang: str):
+        """
+        Loads `lang` (raising on failure) and, with PRELOAD_WARMUP, synthesizes one
+        short sentence to trigger allocator and kernel warm-up. The sentence is built
+        from the model's own character set and bypasses the audio caches.
+        """
+        with model_manager.pinned(f"tts_{lang}"):
+            self.load_language(lang)
+            if not settings.PRELOAD_WARMUP:
+                return
+
+            synthesizer = self.models[lang]
+            characters = getattr(getattr(synthesizer.tts_config, "characters", None), "characters", None) or "a"
+            speaker_manager = getattr(synthesizer.tts_model, "speaker_manager", None)
+            speaker_name = next(iter(getattr(speaker_manager, "name_to_id", None) or {}), "")
+
+            start = time.perf_counter()
+            synthesizer.tts_sentences([characters[:16]], speaker_name=speaker_name)
+            model_manager.record_warmup(f"tts_{lang}", time.perf_counter() - start)
 
     def get_supported_languages(self):
         if not os.path.exists(self.checkpoint_root):
@@ -63,21 +195,52 @@ class TTSEngine:
         return [d for d in os.listdir(self.checkpoint_root) 
                 if os.path.isdir(os.path.join(self.checkpoint_root, d))]
 
-    def synthesize(self, text: str, lang: str, gender: str = "male") -> Optional[np.ndarray]:
+    def synthesize(self, text: str, lang: str, gender: str = "male", speaking_rate: float = 1.0) -> Optional[np.ndarray]:
         try:
-            if lang not in self.models:
+            # Pinned while in use, so the memory budget cannot evict it mid-request
+            with model_manager.pinned(f"tts_{lang}"):
                 self.load_language(lang)
-            
-            if not self.engine:
-                logger.error("Engine not initialized.")
-                return None
+                
+                if not self.engine:
+                    logger.error("Engine not initialized.")
+                    return None
 
-            wav = self.engine.infer_from_text(
-                input_text=text,
-                lang=lang,
-                speaker_name=gender
-            )
+                wav = self.engine.infer_from_text(
+                    input_text=text,
+                    lang=lang,
+                    speaker_name=gender,
+                    speaking_rate=speaking_rate
+                )
             return wav
         except Exception as e:
             logger.error(f"TTS Error for {lang}: {e}")
             return None
+
+    def cache_stats(self) -> Dict:
+        return {
+            "text": self.text_cache.stats() if self.text_cache else None,
+            "sentence": self.sentence_cache.stats() if self.sentence_cache else None
+        }
+
+    @property
+    def sample_rate(self) -> int:
+        """Sample rate of the synthesized audio (after post-processing)."""
+        if not self.engine:
+            raise RuntimeError("Engine not initialized.")
+        return self.engine.target_sr
+
+    def synthesize_stream(self, text: str, lang: str, gender: str = "male", speaking_rate: float = 1.0) -> Iterator[np.ndarray]:
+        """
+        Yields float32 audio one sentence at a time, so playback can start
+        before the whole text is synthesized. Raises on errors instead of
+        returning None, since a stream that already started cannot report them.
+        """
+        with model_manager.pinned(f"tts_{lang}"):
+            self.load_language(lang)
+
+            yield from self.engine.infer_from_text_stream(
+                input_text=text,
+                lang=lang,
+                speaker_name=gender,
+                speaking_rate=speaking_rate
+            )
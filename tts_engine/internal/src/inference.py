@@ -2,7 +2,7 @@ import base64
 import io
 import re
 import traceback
-from typing import Union
+from typing import Iterator, List, Union
 
 import nltk
 import numpy as np
@@ -25,31 +25,24 @@ class TextToSpeechEngine:
         models: dict,
         allow_transliteration: bool = True,
         enable_denoiser: bool = True,
+        text_cache=None,
+        sentence_cache=None,
+        model_ids: dict = None,
     ):
         self.models = models
+        # Optional audio caches (get/put/make_key, see tts_engine.cache.AudioCache):
+        # whole normalised texts, and single sentences for partial hits on long texts.
+        # `model_ids` maps a language to a checksum of its checkpoints, so retrained models get new keys
+        self.text_cache = text_cache
+        self.sentence_cache = sentence_cache
+        self.model_ids = model_ids if model_ids is not None else {}
         # TODO: Ability to instantiate models by accepting standard paths or auto-downloading
 
-        code_mixed_found = False
-        if allow_transliteration:
-            # Initialize Indic-Xlit models for the languages corresponding to TTS models
-            from ai4bharat.transliteration import XlitEngine
-
-            xlit_langs = set()
-
-            for lang in list(models):
-                if lang == "en":
-                    continue  # No need of any Indic-transliteration for English
-
-                if "+" in lang:
-                    # If it's a code-mixed model like Hinglish, we need Hindi Xlit for non-English words
-                    # TODO: Make it mandatory irrespective of `allow_transliteration` boolean
-                    lang = lang.split("+")[1]
-                    code_mixed_found = True
-                xlit_langs.add(lang)
-
-            self.xlit_engine = XlitEngine(xlit_langs, beam_width=6)
-        else:
-            self.xlit_engine = None
+        # Indic-Xlit models are created per language on first use (see `get_xlit_engine`),
+        # so registering a model with `add_model` never reloads the others
+        self.allow_transliteration = allow_transliteration
+        self.xlit_engines = {}
+        self.enchant_dicts = None
 
         self.text_normalizer = TextNormalizer()
         self.paragraph_handler = ParagraphHandler()
@@ -67,8 +60,21 @@ class TextToSpeechEngine:
 
         self.post_processor = PostProcessor(self.target_sr)
 
-        if code_mixed_found:
-            # Dictionary of English words
+        for lang, model in list(models.items()):
+            self.add_model(lang, model)
+
+    def add_model(self, lang: str, model: Synthesizer, model_id: str = None):
+        """
+        Registers the synthesizer for `lang`. The text normaliser, segmenters and
+        post-processor are shared by all languages, so this costs only the checkpoint
+        that was already loaded into `model`.
+        """
+        if model_id is not None:
+            self.model_ids[lang] = model_id
+
+        if self.allow_transliteration and "+" in lang and self.enchant_dicts is None:
+            # Code-mixed models like Hinglish need a dictionary of English words
+            # TODO: Make it mandatory irrespective of `allow_transliteration` boolean
             import enchant
             from enchant.tokenize import get_tokenizer
 
@@ -78,13 +84,28 @@ class TextToSpeechEngine:
             }
             self.enchant_tokenizer = get_tokenizer("en")
 
-    def concatenate_chunks(self, wav: np.ndarray, wav_chunk: np.ndarray):
+        self.models[lang] = model
+
+    def remove_model(self, lang: str):
+        """Unregisters `lang`, dropping this engine's reference to its synthesizer."""
+        self.models.pop(lang, None)
+
+    def get_xlit_engine(self, lang: str):
+        if not self.allow_transliteration or lang == "en":
+            return None  # No need of any Indic-transliteration for English
+
+        if lang not in self.xlit_engines:
+            from ai4bharat.transliteration import XlitEngine
+
+            self.xlit_engines[lang] = XlitEngine({lang}, beam_width=6)
+        return self.xlit_engines[lang]
+
+    def concatenate_chunks(self, wav_chunks: List[np.ndarray]) -> np.ndarray:
         # TODO: Move to utils
-        if type(wav_chunk) != np.ndarray:
-            wav_chunk = np.array(wav_chunk)
-        if wav is None:
-            return wav_chunk
-        return np.concatenate([wav, wav_chunk])
+        if not wav_chunks:
+            return None
+        # Join once; growing the output chunk by chunk copies it again for every chunk
+        return np.concatenate(wav_chunks, dtype=np.float32)
 
     def infer_from_request(
         self, request: TTSRequest, transliterate_roman_to_native: bool = True
@@ -117,8 +138,8 @@ class TextToSpeechEngine:
             # Convert PCM to WAV
             byte_io = io.BytesIO()
             scipy_wav_write(byte_io, self.target_sr, raw_audio)
-            # Encode WAV fileobject as base64 for transmission via JSON
-            encoded_bytes = base64.b64encode(byte_io.read())
+            # Encode WAV fileobject as base64 for transmission via JSON, straight from its buffer
+            encoded_bytes = base64.b64encode(byte_io.getbuffer())
             encoded_string = encoded_bytes.decode()
             speech_response = AudioFile(audioContent=encoded_string)
 
@@ -127,13 +148,16 @@ class TextToSpeechEngine:
         audio_config = AudioConfig(language=Language(sourceLanguage=lang))
         return TTSResponse(audio=output_list, config=audio_config)
 
-    def infer_from_text(
+    def prepare_paragraphs(
         self,
         input_text: str,
         lang: str,
-        speaker_name: str,
         transliterate_roman_to_native: bool = True,
-    ) -> np.ndarray:
+    ):
+        """
+        Normalises and transliterates the input text and splits it into paragraphs.
+        Returns the model language, the primary language, the normalised text and the paragraphs.
+        """
         # If there's no separate English model, use the Hinglish one
         split_lang = lang
         if lang == "en" and lang not in self.models and "en+hi" in self.models:
@@ -144,35 +168,159 @@ class TextToSpeechEngine:
             input_text, lang
         )
 
-        wav = None
         xlit_paragraph = self.handle_transliteration(
             input_text, primary_lang, transliterate_roman_to_native
         )
 
-        paragraphs = self.paragraph_handler.split_text(xlit_paragraph, split_lang)
-        for paragraph in paragraphs:
+        paragraphs = []
+        for paragraph in self.paragraph_handler.split_text(xlit_paragraph, split_lang):
             paras = []
             for sent in self.sent_seg.segment(paragraph):
                 if sent.strip() and not re.match(r"^[_\W]+$", sent.strip()):
                     paras.append(sent.strip())
-            paragraph = " ".join(paras)
+            if paras:
+                paragraphs.append(" ".join(paras))
+        return lang, primary_lang, input_text, paragraphs
+
+    def infer_from_text(
+        self,
+        input_text: str,
+        lang: str,
+        speaker_name: str,
+        transliterate_roman_to_native: bool = True,
+        speaking_rate: float = 1.0,
+    ) -> np.ndarray:
+        lang, primary_lang, normalised_text, paragraphs = self.prepare_paragraphs(
+            input_text, lang, transliterate_roman_to_native
+        )
+
+        cache_key = self.text_cache_key(
+            normalised_text, lang, speaker_name, transliterate_roman_to_native, speaking_rate
+        )
+        if cache_key:
+            wav = self.text_cache.get(cache_key)
+            if wav is not None:
+                return wav
+
+        # Run Inference. The sentences of all paragraphs go through the model as padded batches
+        wav_chunks = self.synthesize_paragraphs(lang, paragraphs, speaker_name, speaking_rate)
+        wav_chunks = [
+            self.postprocess_audio(wav_chunk, primary_lang, speaker_name)
+            for wav_chunk in wav_chunks
+        ]
+
+        # Concatenate all audio outputs
+        wav = self.concatenate_chunks(wav_chunks)
+        if cache_key and wav is not None:
+            wav = self.text_cache.put(cache_key, wav)
+        return wav
+
+    def text_cache_key(
+        self,
+        normalised_text: str,
+        lang: str,
+        speaker_name: str,
+        transliterate_roman_to_native: bool,
+        speaking_rate: float = 1.0,
+    ):
+        if self.text_cache is None:
+            return None
+        return self.text_cache.make_key(
+            "text",
+            normalised_text,
+            lang,
+            speaker_name,
+            self.model_ids.get(lang, ""),
+            transliterate_roman_to_native and self.allow_transliteration,
+            self.enable_denoiser,
+            self.prosody_key(lang, speaker_name, speaking_rate),
+        )
 
-            # Run Inference. TODO: Support for batch inference
-            wav_chunk = self.models[lang].tts(
-                paragraph, 
-                speaker_name=speaker_name, 
+    def prosody_key(self, lang: str, speaker_name: str, speaking_rate: float) -> str:
+        # The resolved values, so editing the prosody table never serves audio made with the old one
+        prosody = self.models[lang].get_prosody(speaker_name, speaking_rate)
+        return ",".join(f"{name}={value:.6g}" for name, value in sorted(prosody.items()))
+
+    def synthesize_paragraphs(
+        self, lang: str, paragraphs: List[str], speaker_name: str, speaking_rate: float = 1.0
+    ) -> List[np.ndarray]:
+        """
+        Synthesizes each paragraph, before post-processing. With a sentence cache,
+        only the sentences not synthesized before go through the model.
+        """
+        synthesizer = self.models[lang]
+        if self.sentence_cache is None:
+            return synthesizer.tts_batch(
+                paragraphs,
+                speaker_name=speaker_name,
                 style_wav="",
-                # Prosody improvements
-                do_trim_silence=False, 
-                pitch_fmin=50,
-                pitch_fmax=300
+                speaking_rate=speaking_rate,
             )
-            wav_chunk = self.postprocess_audio(wav_chunk, primary_lang, speaker_name)
 
-            # Concatenate current chunk with previous audio outputs
-            wav = self.concatenate_chunks(wav, wav_chunk)
+        model_id = self.model_ids.get(lang, "")
+        prosody = self.prosody_key(lang, speaker_name, speaking_rate)
+        sentences = [synthesizer.split_into_sentences(paragraph) for paragraph in paragraphs]
+        keys = {
+            sen: self.sentence_cache.make_key("sentence", sen, lang, speaker_name, model_id, prosody)
+            for sens in sentences
+            for sen in sens
+        }
+        waveforms = {}
+        for sen, key in keys.items():
+            wav = self.sentence_cache.get(key)
+            if wav is not None:
+                waveforms[sen] = wav
+
+        missing = [sen for sen in keys if sen not in waveforms]
+        if missing:
+            new_waveforms = synthesizer.tts_sentences(
+                missing,
+                speaker_name=speaker_name,
+                style_wav="",
+                speaking_rate=speaking_rate,
+            )
+            for sen, wav in zip(missing, new_waveforms):
+                waveforms[sen] = self.sentence_cache.put(keys[sen], wav)
 
-        return wav
+        return [
+            synthesizer.join_waveforms([waveforms[sen] for sen in sens])
+            for sens in sentences
+        ]
+
+    def infer_from_text_stream(
+        self,
+        input_text: str,
+        lang: str,
+        speaker_name: str,
+        transliterate_roman_to_native: bool = True,
+        speaking_rate: float = 1.0,
+    ) -> Iterator[np.ndarray]:
+        """
+        Streaming variant of `infer_from_text`: yields the float32 audio of each
+        sentence, post-processed, as soon as the vocoder has produced it.
+        """
+        lang, primary_lang, normalised_text, paragraphs = self.prepare_paragraphs(
+            input_text, lang, transliterate_roman_to_native
+        )
+
+        cache_key = self.text_cache_key(
+            normalised_text, lang, speaker_name, transliterate_roman_to_native, speaking_rate
+        )
+        if cache_key:
+            wav = self.text_cache.get(cache_key)
+            if wav is not None:
+                yield wav
+                return
+
+        for paragraph in paragraphs:
+            for wav_chunk in self.models[lang].tts_stream(
+                paragraph,
+                speaker_name=speaker_name,
+                style_wav="",
+                speaking_rate=speaking_rate,
+            ):
+                wav_chunk = self.postprocess_audio(wav_chunk, primary_lang, speaker_name)
+                yield np.asarray(wav_chunk, dtype=np.float32)
 
     def parse_langs_normalise_text(
         self, input_text: str, lang: str
@@ -256,10 +404,11 @@ class TextToSpeechEngine:
         return input_text
 
     def transliterate_sentence(self, input_text, lang):
-        if not self.xlit_engine:
-            return input_text
-
         if lang == "raj":
             lang = "hi"  # Approximate
 
-        return self.xlit_engine.translit_sentence(input_text, lang)
+        xlit_engine = self.get_xlit_engine(lang)
+        if not xlit_engine:
+            return input_text
+
+        return xlit_engine.translit_sentence(input_text, lang)
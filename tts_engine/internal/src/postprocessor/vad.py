@@ -26,6 +26,7 @@ SOFTWARE.
 Adapted from https://github.com/mauriciovander/silence-removal/blob/master/vad.py
 '''
 import numpy
+from numpy.lib.stride_tricks import as_strided
 
 class VoiceActivityDetection:
 
@@ -33,7 +34,6 @@ class VoiceActivityDetection:
         self.__step = 160
         self.__buffer_size = 160 
         self.__buffer = numpy.array([],dtype=numpy.int16)
-        self.__out_buffer = numpy.array([],dtype=numpy.int16)
         self.__n = 0
         self.__VADthd = 0.
         self.__VADn = 0.
@@ -61,7 +61,6 @@ class VoiceActivityDetection:
     def add_samples(self, data):
         self.__buffer = numpy.append(self.__buffer, data)
         result = len(self.__buffer) >= self.__buffer_size
-        # print('__buffer size %i'%self.__buffer.size)
         return result
 
     # Pull a portion of the buffer to process
@@ -70,18 +69,56 @@ class VoiceActivityDetection:
     def get_frame(self):
         window = self.__buffer[:self.__buffer_size]
         self.__buffer = self.__buffer[self.__step:]
-        # print('__buffer size %i'%self.__buffer.size)
         return window
 
-    # Adds new audio samples to the internal
-    # buffer and process them
+    # Frames the whole signal at once; same result (and state carried over
+    # to the next call) as feeding every frame from get_frame() to vad() in turn
     def process(self, data, sc_threshold):
         self.__buffer = numpy.array([],dtype=numpy.int16)
-        self.__out_buffer = numpy.array([],dtype=numpy.int16)
-        if self.add_samples(data):
-            while len(self.__buffer) >= self.__buffer_size:
-                # Framing
-                window = self.get_frame()
-                if self.vad(window, sc_threshold):  # speech frame
-                	self.__out_buffer = numpy.append(self.__out_buffer, window)
-        return self.__out_buffer
+        self.add_samples(data)
+        samples = self.__buffer
+        n = (len(samples) - self.__buffer_size) // self.__step + 1 if len(samples) >= self.__buffer_size else 0
+        # What get_frame() would leave behind after pulling all n frames
+        self.__buffer = samples[n * self.__step:]
+        if n == 0:
+            return numpy.array([], dtype=numpy.int16)
+        windows = as_strided(
+            samples, shape=(n, self.__buffer_size),
+            strides=(samples.strides[0] * self.__step, samples.strides[0]), writeable=False
+        )
+
+        frames = windows ** 2.
+        threshold = 0.2
+        # vad() combines numpy scalars, whose promotion rules can differ from arrays'
+        thd_dtype = (frames.dtype.type(0) + frames.dtype.type(0) * threshold).dtype
+        thd = frames.min(axis=1).astype(thd_dtype) + numpy.ptp(frames, axis=1).astype(thd_dtype) * threshold
+        energy = frames.mean(axis=1)
+
+        # The adaptive threshold is the running mean of every frame's thd so far
+        counts = self.__VADn + numpy.arange(1, n + 1)
+        running = (self.__VADn * float(self.__VADthd) + numpy.cumsum(thd, dtype=numpy.float64)) / counts
+        # vad() accumulates it in thd_dtype; frames too close to call are settled that way
+        if numpy.any(numpy.abs(energy - running) <= 1e-4 * numpy.abs(running)):
+            running = numpy.empty(n, dtype=object)
+            vad_thd, vad_n = self.__VADthd, self.__VADn
+            for i, frame_thd in enumerate(thd):
+                vad_thd = (vad_n * vad_thd + frame_thd) / float(vad_n + 1.)
+                vad_n += 1.
+                running[i] = vad_thd
+            silent = numpy.array([e <= t for e, t in zip(energy, running)], dtype=bool)
+            self.__VADthd = vad_thd
+        else:
+            silent = energy <= running
+            self.__VADthd = thd_dtype.type(running[-1])
+        self.__VADn += n
+
+        # Length of the silent run each frame ends, counting the one carried in from the last call
+        index = numpy.arange(n)
+        last_loud = numpy.maximum.accumulate(numpy.where(silent, -1, index))
+        counter = numpy.where(last_loud >= 0, index - last_loud, self.__silence_counter + index + 1)
+        self.__silence_counter = int(counter[-1])
+
+        speech = counter <= sc_threshold
+        if not speech.any():
+            return numpy.array([], dtype=numpy.int16)
+        return windows[speech].reshape(-1)
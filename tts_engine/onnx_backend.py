@@ -0,0 +1,235 @@
+import os
+import math
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+import torch
+
+from config.settings import settings
+from core.device_manager import device_manager
+
+logger = logging.getLogger(__name__)
+
+# Written next to each checkpoint by scripts/export_tts_onnx.py
+ONNX_FILENAME = "model.onnx"
+ONNX_OPSET = 17
+# Per-item prosody inputs of the FastPitch graph (ForwardTTS aux_input)
+PROSODY_INPUTS = ("length_scale", "pitch_shift")
+
+class _ExportAttention(torch.nn.Module):
+    """
+    nn.MultiheadAttention (eval, sequence first) written with shape-agnostic ops.
+    The TorchScript ONNX exporter bakes the traced sequence length into the
+    reshapes of nn.MultiheadAttention, so exported graphs would only accept it.
+    """
+    def __init__(self, attention: torch.nn.MultiheadAttention):
+        super().__init__()
+        self.attention = attention
+
+    def forward(self, query, key, value, attn_mask=None, key_padding_mask=None):
+        attention = self.attention
+        heads = attention.num_heads
+        head_dim = attention.embed_dim // heads
+        q, k, v = torch.nn.functional.linear(query, attention.in_proj_weight, attention.in_proj_bias).chunk(3, dim=-1)
+        # [T, B, E] -> [B, H, T, D]
+        q, k, v = (t.unflatten(-1, (heads, head_dim)).permute(1, 2, 0, 3) for t in (q, k, v))
+        scores = torch.matmul(q, k.transpose(-1, -2)) / math.sqrt(head_dim)
+        if key_padding_mask is not None:
+            scores = scores.masked_fill(key_padding_mask[:, None, None, :], float("-inf"))
+        weights = torch.softmax(scores, dim=-1)
+        # [B, H, T, D] -> [T, B, E]
+        output = torch.matmul(weights, v).permute(2, 0, 1, 3).flatten(2)
+        return attention.out_proj(output), weights.mean(dim=1)
+
+@contextmanager
+def _export_friendly_attention(model: torch.nn.Module):
+    """Swaps every nn.MultiheadAttention in `model` for _ExportAttention (same weights) while the block runs."""
+    swapped = []
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, torch.nn.MultiheadAttention):
+                setattr(parent, name, _ExportAttention(child))
+                swapped.append((parent, name, child))
+    try:
+        yield
+    finally:
+        for parent, name, child in swapped:
+            setattr(parent, name, child)
+
+class _FastPitchGraph(torch.nn.Module):
+    """ForwardTTS.inference with plain tensor inputs and outputs, the form torch.onnx.export traces."""
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, x, x_lengths, length_scale, pitch_shift, speaker_ids=None):
+        aux_input = {
+            "x_lengths": x_lengths,
+            "speaker_ids": speaker_ids,
+            "d_vectors": None,
+            "length_scale": length_scale,
+            "pitch_shift": pitch_shift
+        }
+        outputs = self.model.inference(x, aux_input=aux_input)
+        return outputs["model_outputs"], outputs["y_lengths"]
+
+class _HifiganGraph(torch.nn.Module):
+    def __init__(self, generator):
+        super().__init__()
+        self.generator = generator
+
+    def forward(self, c, lengths):
+        return self.generator.inference(c, lengths=lengths)
+
+def export_fastpitch(model, path: str):
+    """
+    Traces `model.inference` (a ForwardTTS) into ONNX with dynamic batch, text and frame axes.
+    The length scale and pitch shift are inputs, one per batch item, rather than traced constants.
+    Multi-speaker models take a speaker id per batch item; single-speaker graphs ignore it.
+    """
+    x = torch.randint(1, 20, (2, 24))
+    x_lengths = torch.tensor([24, 17])
+    prosody = (torch.tensor([1.0, 1.2]), torch.tensor([0.0, 0.5]))
+    speaker_ids = (torch.zeros(2, dtype=torch.long),) if hasattr(model, "emb_g") else ()
+    inputs = (x, x_lengths) + prosody + speaker_ids
+    input_names = ["x", "x_lengths", *PROSODY_INPUTS] + (["speaker_ids"] if speaker_ids else [])
+    dynamic_axes = {
+        "x": {0: "batch", 1: "text"},
+        "x_lengths": {0: "batch"},
+        "length_scale": {0: "batch"},
+        "pitch_shift": {0: "batch"},
+        "speaker_ids": {0: "batch"},
+        "model_outputs": {0: "batch", 1: "frames"},
+        "y_lengths": {0: "batch"}
+    }
+    with torch.inference_mode(False), torch.no_grad(), _export_friendly_attention(model):
+        torch.onnx.export(
+            _FastPitchGraph(model).eval(), inputs, path,
+            input_names=input_names, output_names=["model_outputs", "y_lengths"],
+            dynamic_axes={k: v for k, v in dynamic_axes.items() if k in input_names or k in ("model_outputs", "y_lengths")},
+            opset_version=ONNX_OPSET, dynamo=False
+        )
+
+def export_hifigan(generator, path: str):
+    """Traces `generator.inference` (a HifiganGenerator, weight norm removed) into ONNX with dynamic batch and frame axes."""
+    c = torch.randn(2, generator.conv_pre.in_channels, 40)
+    lengths = torch.tensor([40, 31])
+    with torch.inference_mode(False), torch.no_grad():
+        torch.onnx.export(
+            _HifiganGraph(generator).eval(), (c, lengths), path,
+            input_names=["c", "lengths"], output_names=["waveform"],
+            dynamic_axes={"c": {0: "batch", 2: "frames"}, "lengths": {0: "batch"}, "waveform": {0: "batch", 2: "samples"}},
+            opset_version=ONNX_OPSET, dynamo=False
+        )
+
+def make_session(path: str):
+    """An onnxruntime session with full graph optimizations and the TTS_ORT_* thread counts."""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    # 0 lets onnxruntime pick (one intra-op thread per physical core)
+    options.intra_op_num_threads = settings.TTS_ORT_INTRA_OP_THREADS
+    options.inter_op_num_threads = settings.TTS_ORT_INTER_OP_THREADS
+    providers = ["CPUExecutionProvider"]
+    if device_manager.is_cuda() and "CUDAExecutionProvider" in ort.get_available_providers():
+        providers.insert(0, "CUDAExecutionProvider")
+    return ort.InferenceSession(path, sess_options=options, providers=providers)
+
+class _OrtGraph:
+    """
+    An exported graph and its onnxruntime session, created on first use.
+    onnxruntime's thread pools do not survive a fork, so inference worker processes
+    forked after preloading drop the inherited session and build their own.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._session = make_session(path)
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = make_session(self.path)
+        return self._session
+
+def _per_item(value, batch_size: int) -> np.ndarray:
+    """A float, or a tensor of one value or one per item, as a float32 array of one value per item."""
+    value = value.cpu().numpy() if torch.is_tensor(value) else np.asarray(value)
+    return np.broadcast_to(value.astype(np.float32).reshape(-1), (batch_size,)).copy()
+
+class OrtFastPitch(_OrtGraph):
+    """Stands in for ForwardTTS.inference, returning the outputs the Synthesizer reads as torch tensors."""
+    def __init__(self, path: str, length_scale: float = 1.0):
+        super().__init__(path)
+        self.input_names = {i.name for i in self._session.get_inputs()}
+        # What ForwardTTS.inference uses when aux_input has no length scale
+        self.length_scale = length_scale
+
+    def __call__(self, x, aux_input: Optional[Dict] = None) -> Dict:
+        aux_input = aux_input or {}
+        x_lengths = aux_input.get("x_lengths")
+        if x_lengths is None or x_lengths.numel() != x.shape[0]:
+            x_lengths = torch.tensor(x.shape[1:2])
+        feeds = {"x": x.cpu().numpy(), "x_lengths": x_lengths.cpu().numpy()}
+        defaults = {"length_scale": self.length_scale, "pitch_shift": 0.0}
+        for name in PROSODY_INPUTS:
+            if name in self.input_names:
+                value = aux_input.get(name)
+                feeds[name] = _per_item(defaults[name] if value is None else value, x.shape[0])
+        if "speaker_ids" in self.input_names:
+            speaker_ids = aux_input.get("speaker_ids")
+            speaker_ids = torch.zeros(1, dtype=torch.long) if speaker_ids is None else speaker_ids.reshape(-1)
+            feeds["speaker_ids"] = np.broadcast_to(speaker_ids.cpu().numpy(), (x.shape[0],)).copy()
+        model_outputs, y_lengths = self.session.run(None, feeds)
+        return {
+            "model_outputs": torch.from_numpy(model_outputs),
+            "y_lengths": torch.from_numpy(y_lengths),
+            "alignments": None,
+            "pitch": None,
+            "energy": None,
+            "durations_log": None
+        }
+
+class OrtHifigan(_OrtGraph):
+    """Stands in for HifiganGenerator.inference."""
+    def __call__(self, c, lengths=None):
+        if lengths is None:
+            lengths = [c.shape[2]] * c.shape[0]
+        feeds = {"c": c.cpu().numpy().astype(np.float32), "lengths": np.asarray(lengths, dtype=np.int64)}
+        return torch.from_numpy(self.session.run(None, feeds)[0])
+
+def onnx_paths(lang_path: str):
+    return (
+        os.path.join(lang_path, "fastpitch", ONNX_FILENAME),
+        os.path.join(lang_path, "hifigan", ONNX_FILENAME)
+    )
+
+def attach_ort(synthesizer, fastpitch_path: str, hifigan_path: str):
+    """
+    Routes the Synthesizer's acoustic model and vocoder passes through onnxruntime.
+    The rest of the Synthesizer (tokenizer, speakers, batching, audio processing) is
+    unchanged, so TextToSpeechEngine uses it as before. The torch weights stay loaded
+    but unused; with safetensors checkpoints they are memory-mapped and never paged in.
+    Raises ValueError for FastPitch graphs exported without the prosody inputs.
+    """
+    fastpitch = OrtFastPitch(fastpitch_path, synthesizer.tts_model.length_scale)
+    missing = [name for name in PROSODY_INPUTS if name not in fastpitch.input_names]
+    if missing:
+        raise ValueError(f"{fastpitch_path} was exported without the prosody inputs {missing}")
+    generator = getattr(synthesizer.vocoder_model, "model_g", synthesizer.vocoder_model)
+    synthesizer.tts_model.inference = fastpitch
+    generator.inference = OrtHifigan(hifigan_path)
+    return synthesizer